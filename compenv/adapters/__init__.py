@@ -1,18 +1,19 @@
 """This package contains adapters adapting between external systems and the domain/service layers."""
 from __future__ import annotations
 
+import atexit
 import dataclasses
 from collections.abc import Callable
-from typing import Any
+from typing import Any, Optional
 
 from ..service import SERVICE_CLASSES, initialize_services
 from .abstract import AbstractConnection, AbstractTable
 from .controller import DJController
-from .distribution import DistributionConverter
+from .distribution import DistributionConverter, default_persistent_cache
 from .entity import DJComputationRecord
-from .presenter import PrintingPresenter
-from .repository import DJRepository
-from .translator import DJTranslator, blake2b
+from .presenter import CollectingPresenter, PrintingPresenter
+from .repository import BufferedDJRepository, DJRepository, WriteBehindDJRepository, flush_at_exit
+from .translator import DJTranslator, TableLookup, blake2b
 from .unit_of_work import DJUnitOfWork
 
 
@@ -23,21 +24,83 @@ class DJAdapters:
     translator: DJTranslator
     controller: DJController
     presenter: PrintingPresenter
+    collector: CollectingPresenter
     repo: DJRepository
 
 
-def create_dj_adapters(table: AbstractTable[DJComputationRecord], connection: AbstractConnection) -> DJAdapters:
-    """Create a set of DataJoint adapters using the given table and connection."""
-    translator = DJTranslator(blake2b)
+def create_dj_adapters(
+    table: AbstractTable[DJComputationRecord],
+    connection: AbstractConnection,
+    *,
+    buffer_records: int = 0,
+    buffer_seconds: float = 10.0,
+    write_behind: int = 0,
+    writer_table: Optional[AbstractTable[DJComputationRecord]] = None,
+    writer_connection: Optional[AbstractConnection] = None,
+    translation_cache_size: int = 100_000,
+) -> DJAdapters:
+    """Create a set of DataJoint adapters using the given table and connection.
+
+    Records are buffered and written in batches of up to buffer_records records if it is positive (see
+    BufferedDJRepository). Full buffers, records that have been buffered for buffer_seconds and records still buffered
+    when the process exits are flushed in their own unit of work.
+
+    Records are written by a background thread using the writer table and connection if write_behind is positive (see
+    WriteBehindDJRepository). At most write_behind records wait to be written. The writer thread finishes writing them
+    when the process exits.
+
+    The primary keys of the last translation_cache_size translated keys are cached. Evicted primary keys are looked up
+    in the table (see DJTranslator). Buffered records are not in the table yet, therefore the cache must be able to hold
+    at least buffer_records primary keys. Records waiting to be written behind are translated before they are queued.
+    """
+    if buffer_records > 0 and write_behind > 0:
+        raise ValueError("Buffering and write-behind can not be combined!")
+    if translation_cache_size < max(buffer_records, 1):
+        raise ValueError("translation_cache_size must be at least one and not less than buffer_records!")
+    translator = DJTranslator(
+        blake2b, capacity=translation_cache_size, fallback=TableLookup(table, connection, blake2b)
+    )
     presenter = PrintingPresenter(print_=print)
-    repo = DJRepository(table=table, translator=translator)
+    collector = CollectingPresenter(translator=translator)
+    repo: DJRepository
+    if buffer_records > 0:
+        repo = BufferedDJRepository(
+            table=table,
+            translator=translator,
+            connection=connection,
+            max_records=buffer_records,
+            max_seconds=buffer_seconds,
+        )
+    elif write_behind > 0:
+        if writer_table is None or writer_connection is None:
+            raise ValueError("Write-behind needs a writer table and connection!")
+        writer = DJUnitOfWork(
+            connection=writer_connection, records=DJRepository(table=writer_table, translator=translator)
+        )
+        repo = WriteBehindDJRepository(
+            table=table, translator=translator, writer=writer, connection=connection, max_pending=write_behind
+        )
+    else:
+        repo = DJRepository(table=table, translator=translator, connection=connection)
     uow = DJUnitOfWork(connection=connection, records=repo)
-    output_ports: dict[str, Callable[[Any], None]] = {"record": presenter.record, "diff": presenter.diff}
-    dependencies = {"uow": uow, "distribution_finder": DistributionConverter()}
+    if isinstance(repo, BufferedDJRepository):
+        atexit.register(flush_at_exit, uow, repo)
+    elif isinstance(repo, WriteBehindDJRepository):
+        atexit.register(repo.close)
+    output_ports: dict[str, Callable[[Any], None]] = {
+        "record": presenter.record,
+        "diff": presenter.diff,
+        "query": collector.query,
+        "diff_matrix": collector.diff_matrix,
+    }
+    dependencies = {
+        "uow": uow,
+        "distribution_finder": DistributionConverter(persistent_cache=default_persistent_cache()),
+    }
     services = initialize_services(
         SERVICE_CLASSES,
         output_ports=output_ports,
         dependencies=dependencies,
     )
     controller = DJController(services=services, translator=translator)
-    return DJAdapters(translator=translator, presenter=presenter, repo=repo, controller=controller)
+    return DJAdapters(translator=translator, presenter=presenter, collector=collector, repo=repo, controller=controller)
@@ -3,9 +3,24 @@ from __future__ import annotations
 
 import dataclasses
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Any, ClassVar, Generic, Iterator, Mapping, Type, TypeVar
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+    Type,
+    TypeVar,
+    cast,
+)
 
 if TYPE_CHECKING:
+    from ..model.record import Identifier
     from ..types import PrimaryKey
 
 
@@ -32,7 +47,22 @@ class PartEntity:  # pylint: disable=too-few-public-methods
         """Create an instance of the part entity from the given mapping."""
 
 
+def _equal(value: Any, other: Any) -> bool:
+    if isinstance(value, str) and isinstance(other, str):
+        return value.lower() == other.lower()
+    return bool(value == other)
+
+
+def matches(part_entity: PartEntity, restrictions: Sequence[Mapping[str, Any]]) -> bool:
+    """Return whether the attributes of the part entity match at least one of the restrictions.
+
+    Strings are compared case-insensitively like the database does.
+    """
+    return any(all(_equal(getattr(part_entity, k), v) for k, v in r.items()) for r in restrictions)
+
+
 _T = TypeVar("_T", bound=MasterEntity)
+_V = TypeVar("_V")
 
 
 class AbstractTable(ABC, Generic[_T]):
@@ -46,6 +76,17 @@ class AbstractTable(ABC, Generic[_T]):
             ValueError: The primary key already exists.
         """
 
+    def add_many(self, master_entities: Sequence[_T]) -> None:
+        """Insert the given entities into the table if none of them already exists.
+
+        Implementations should insert the entities with as few round-trips as possible.
+
+        Raises:
+            ValueError: One of the primary keys already exists.
+        """
+        for master_entity in master_entities:
+            self.add(master_entity)
+
     @abstractmethod
     def get(self, primary: PrimaryKey) -> _T:
         """Fetch the entity matching the given primary key from the table if it exists.
@@ -54,6 +95,49 @@ class AbstractTable(ABC, Generic[_T]):
             KeyError: No entity matching the given key exists.
         """
 
+    def get_many(self, primaries: Iterable[PrimaryKey], chunk_size: int = 1000) -> Iterator[_T]:
+        """Fetch the entities matching the given primary keys from the table in the given order.
+
+        Implementations should fetch the entities in chunks of chunk_size primary keys with as few round-trips per
+        chunk as possible.
+
+        Raises:
+            KeyError: No entity matching one of the given keys exists.
+        """
+        return (self.get(p) for p in primaries)
+
+    def find(
+        self, restrictions: Sequence[Mapping[str, Any]], predicate: Callable[[PartEntity], bool]
+    ) -> Iterator[PrimaryKey]:
+        """Iterate over the primary keys of all entities having a part entity that satisfies the predicate.
+
+        Only part entities whose attributes match at least one of the restrictions are passed to the predicate.
+        Implementations should apply the restrictions in the database.
+        """
+        for master_entity in self.get_many(iter(self)):
+            part_entities = (e for p in master_entity.parts for e in getattr(master_entity, p.master_attr))
+            if any(matches(e, restrictions) and predicate(e) for e in part_entities):
+                yield master_entity.primary
+
+    def get_primaries(self, identifiers: Iterable[Identifier], chunk_size: int = 1000) -> Dict[Identifier, PrimaryKey]:
+        """Look up the primary keys of the entities stored with the given identifiers.
+
+        Identifiers of entities that do not exist or that were stored without their identifier are missing from the
+        returned mapping. Tables that do not store identifiers return an empty mapping.
+        """
+        return {}
+
+    def __contains__(self, primary: object) -> bool:
+        """Return True if an entity matching the given primary key exists in the table, False otherwise.
+
+        Implementations should check this without fetching the entity's parts.
+        """
+        try:
+            self.get(cast("PrimaryKey", primary))
+        except KeyError:
+            return False
+        return True
+
     @abstractmethod
     def __iter__(self) -> Iterator[PrimaryKey]:
         """Iterate over the primary keys of all entities in the table."""
@@ -70,6 +154,11 @@ class AbstractConnection(ABC):
     def transaction(self) -> AbstractTransaction:
         """Return the transaction."""
 
+    @property
+    @abstractmethod
+    def is_open(self) -> bool:
+        """Return True if the connection is open, False otherwise."""
+
     @abstractmethod
     def open(self) -> None:
         """Open a new connection."""
@@ -78,6 +167,14 @@ class AbstractConnection(ABC):
     def close(self) -> None:
         """Close the connection."""
 
+    def shared(self, function: Callable[[], _V]) -> Callable[[], _V]:
+        """Return a function that calls the given function using the connection opened in the calling thread.
+
+        The returned function can be called from another thread, e.g. to fetch data ahead, while the calling thread
+        does not use the connection.
+        """
+        return function
+
 
 class AbstractTransaction(ABC):
     """Defines the interface for all transactions."""
@@ -3,8 +3,9 @@ from __future__ import annotations
 
 import functools
 from collections.abc import Mapping
-from typing import TYPE_CHECKING, Any, Callable, Protocol, Type, TypeVar
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional, Protocol, Type, TypeVar
 
+from ..model.record import Requirement
 from ..service.abstract import Request
 from .translator import Translator
 
@@ -49,6 +50,17 @@ class DJController:
         request = self.services["diff"].create_request(*idents)
         self.services["diff"](request)
 
+    def where(self, *requirements: str) -> None:
+        """Execute the query service with the given requirements, e.g. "numpy<1.24" or "torch==2.1.0"."""
+        request = self.services["query"].create_request(tuple(Requirement.from_string(r) for r in requirements))
+        self.services["query"](request)
+
+    def diff_matrix(self, keys: Optional[Iterable[PrimaryKey]] = None) -> None:
+        """Execute the diff matrix service with the given keys or with all records if no keys are given."""
+        idents = None if keys is None else tuple(self.translator.to_internal(k) for k in keys)
+        request = self.services["diff_matrix"].create_request(idents)
+        self.services["diff_matrix"](request)
+
     def __repr__(self) -> str:
         """Return a string representation of the controller."""
         return f"{self.__class__.__name__}(services={repr(self.services)}," f" translator={repr(self.translator)})"
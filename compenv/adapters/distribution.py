@@ -1,10 +1,36 @@
 """Contains code related to getting information about installed distributions."""
 from __future__ import annotations
 
+import contextlib
+import email
+import hashlib
+import json
+import os
+import stat
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from importlib import metadata
 from os import PathLike
 from pathlib import Path
-from typing import Callable, Iterable, Literal, Optional, Protocol, Set, Type
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Generator,
+    Hashable,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
 from ..model.record import Distribution
 from ..service.abstract import DistributionFinder
@@ -53,27 +79,354 @@ class _MetadataDistribution(Protocol):
         """Return the distribution's metadata."""
 
 
-class DistributionConverter(DistributionFinder):
-    """Converts distribution objects into distribution objects from the model."""
+Fingerprint = Tuple[Tuple[str, Optional[int]], ...]
+
+
+def path_fingerprint(paths: Optional[Sequence[str]] = None) -> Fingerprint:
+    """Return a cheap fingerprint of the given paths (defaults to sys.path) and their modification times.
+
+    Installing or removing a distribution adds or removes a metadata directory inside one of the paths which changes
+    the modification time of that path and thus the fingerprint.
+    """
+    if paths is None:
+        paths = sys.path
+    fingerprint = []
+    for path in paths:
+        path = os.path.abspath(path or ".")
+        try:
+            mtime: Optional[int] = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+        fingerprint.append((path, mtime))
+    return tuple(fingerprint)
+
+
+class SnapshotCache:
+    """Thread-safe cache holding the most recent distribution snapshot of each distribution source."""
+
+    def __init__(self) -> None:
+        """Initialize the snapshot cache."""
+        self._lock = threading.Lock()
+        self._snapshots: Dict[Hashable, Tuple[Hashable, frozenset[Distribution]]] = {}
+
+    def get(self, source: Hashable, fingerprint: Hashable) -> Optional[frozenset[Distribution]]:
+        """Return the snapshot of the source if it was taken with the given fingerprint, None otherwise."""
+        with self._lock:
+            try:
+                cached_fingerprint, snapshot = self._snapshots[source]
+            except KeyError:
+                return None
+        if cached_fingerprint != fingerprint:
+            return None
+        return snapshot
+
+    def put(self, source: Hashable, fingerprint: Hashable, snapshot: frozenset[Distribution]) -> None:
+        """Store the snapshot of the source taken with the given fingerprint."""
+        with self._lock:
+            self._snapshots[source] = (fingerprint, snapshot)
+
+    def clear(self) -> None:
+        """Remove all snapshots from the cache."""
+        with self._lock:
+            self._snapshots.clear()
+
+    def __repr__(self) -> str:
+        """Return a string representation of the snapshot cache."""
+        return f"{self.__class__.__name__}()"
+
+
+SNAPSHOT_CACHE = SnapshotCache()
+
+
+CACHE_DIR_VARIABLE = "COMPENV_CACHE_DIR"
+
+
+class PersistentSnapshotCache:
+    """Cache storing distribution snapshots as files in a directory so that they can be shared between processes.
+
+    Snapshots are keyed by the interpreter, its prefix and the fingerprint of the environment. Files are written
+    atomically by renaming a temporary file so that concurrently started processes never read partial snapshots.
+    Unreadable or unwritable cache files are treated like missing ones.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Initialize the persistent snapshot cache."""
+        self.directory = directory
+
+    def _key(self, fingerprint: Hashable) -> str:
+        return repr((sys.executable, sys.prefix, fingerprint))
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.blake2b(key.encode()).hexdigest() + ".json")
+
+    def get(self, fingerprint: Hashable) -> Optional[frozenset[Distribution]]:
+        """Return the snapshot taken with the given fingerprint if it exists, None otherwise."""
+        key = self._key(fingerprint)
+        try:
+            with open(self._file(key), encoding="utf-8") as file:
+                content = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(content, dict) or content.get("key") != key:
+            return None
+        return frozenset(Distribution(name, version) for name, version in content["distributions"])
+
+    def put(self, fingerprint: Hashable, snapshot: frozenset[Distribution]) -> None:
+        """Store the snapshot taken with the given fingerprint."""
+        key = self._key(fingerprint)
+        content = {"key": key, "distributions": sorted([d.name, d.version] for d in snapshot)}
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            descriptor, temp_file = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        except OSError:
+            return
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                json.dump(content, file)
+            os.replace(temp_file, self._file(key))
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_file)
+
+    def __repr__(self) -> str:
+        """Return a string representation of the persistent snapshot cache."""
+        return f"{self.__class__.__name__}(directory={self.directory!r})"
+
+
+def default_persistent_cache() -> Optional[PersistentSnapshotCache]:
+    """Return a persistent cache in the directory set via the environment variable if it is set, None otherwise."""
+    directory = os.environ.get(CACHE_DIR_VARIABLE)
+    if not directory:
+        return None
+    return PersistentSnapshotCache(directory)
+
+
+METADATA_SUFFIXES = (".dist-info", ".egg-info")
+
+
+EGG_METADATA_DIR = "EGG-INFO"
+
+
+METADATA_FILES = ("METADATA", "PKG-INFO")
+
+
+def parse_distribution(path: str) -> Distribution:
+    """Parse the complete metadata of the distribution described by the given metadata directory or file."""
+    if os.path.isdir(path):
+        dist_metadata = metadata.PathDistribution(Path(path)).metadata
+        return Distribution(dist_metadata["Name"], dist_metadata["Version"])
+    with open(path, encoding="utf-8") as file:
+        message = email.message_from_file(file)
+    return Distribution(message["Name"], message["Version"])
+
+
+def _locate_metadata_file(path: str) -> Optional[str]:
+    if not os.path.isdir(path):
+        return path
+    for name in METADATA_FILES:
+        file = os.path.join(path, name)
+        if os.path.isfile(file):
+            return file
+    return None
+
+
+def read_headers(file: str) -> Optional[Distribution]:
+    """Read the name and version from the header block of the given metadata file.
+
+    The file is read line by line and reading stops as soon as both headers were found or the header block ended. None
+    is returned if the headers are missing or malformed.
+    """
+    headers: Dict[str, str] = {}
+    last_key = None
+    with open(file, encoding="utf-8") as lines:
+        for line in lines:
+            if line[:1] in (" ", "\t"):
+                if last_key in ("name", "version"):
+                    return None
+                continue
+            if len(headers) == 2 or not line.strip():
+                break
+            key, separator, value = line.partition(":")
+            if not separator:
+                return None
+            last_key = key.strip().lower()
+            if last_key in ("name", "version"):
+                headers.setdefault(last_key, value.strip())
+    if not headers.get("name") or not headers.get("version"):
+        return None
+    return Distribution(headers["name"], headers["version"])
+
+
+def read_distribution(path: str) -> Distribution:
+    """Read the distribution described by the given metadata directory or file.
+
+    Only the header block of the metadata file is read. The complete metadata is parsed if the header block is
+    malformed.
+    """
+    file = _locate_metadata_file(path)
+    if file is not None:
+        try:
+            distribution = read_headers(file)
+        except (OSError, UnicodeDecodeError):
+            distribution = None
+        if distribution is not None:
+            return distribution
+    return parse_distribution(path)
+
+
+def _convert_distributions(orig_dists: Iterable[_MetadataDistribution]) -> frozenset[Distribution]:
+    return frozenset(Distribution(d.metadata["Name"], d.metadata["Version"]) for d in orig_dists)
+
+
+_A = TypeVar("_A")
+_B = TypeVar("_B")
+
+
+_IndexedMetadata = Dict[str, Tuple[Optional[int], Optional[FrozenSet[Distribution]]]]
+
+
+@contextmanager
+def _executor(max_workers: int) -> Generator[Optional[ThreadPoolExecutor], None, None]:
+    if max_workers <= 1:
+        yield None
+        return
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        yield executor
+
+
+def _map(func: Callable[[_A], _B], items: Sequence[_A], executor: Optional[ThreadPoolExecutor]) -> List[_B]:
+    if executor is None:
+        return [func(i) for i in items]
+    return list(executor.map(func, items))
+
+
+class MetadataIndex:
+    """Index of the distribution metadata found in the entries of sys.path.
+
+    The index remembers the modification time of every path entry and of every metadata directory within it. Scanning
+    the index again only lists path entries that were modified and only reads metadata directories that were added or
+    modified since the last scan. The metadata of an unzipped egg on the path is found in its EGG-INFO directory. Path
+    entries that are not directories (e.g. zip files or zipped eggs) are handed to importlib.
+
+    Listing the path entries and reading the metadata directories can be spread over a bounded pool of threads, which
+    pays off on file systems where the scan is dominated by I/O latency.
+    """
 
     def __init__(
+        self,
+        get_paths: Callable[[], Sequence[str]] = lambda: sys.path,
+        read: Callable[[str], Distribution] = read_distribution,
+    ) -> None:
+        """Initialize the metadata index."""
+        self._get_paths = get_paths
+        self._read = read
+        self._lock = threading.Lock()
+        self._indexed_paths: Dict[str, Tuple[Optional[int], _IndexedMetadata]] = {}
+
+    def __call__(self, max_workers: int = 1) -> frozenset[Distribution]:
+        """Scan all modified path entries and return the distributions found in all path entries.
+
+        The scan uses a pool of at most max_workers threads if max_workers is greater than one.
+        """
+        with self._lock, _executor(max_workers) as executor:
+            paths = list(dict.fromkeys(os.path.abspath(p or ".") for p in self._get_paths()))
+            indexed_paths = dict(zip(paths, _map(self._scan_path, paths, executor)))
+            unread = [m for _, indexed in indexed_paths.values() for m, (_, d) in indexed.items() if d is None]
+            read = dict(zip(unread, _map(self._read, unread, executor)))
+            for _, indexed in indexed_paths.values():
+                for metadata_path, (mtime, dists) in indexed.items():
+                    if dists is None:
+                        indexed[metadata_path] = (mtime, frozenset([read[metadata_path]]))
+            self._indexed_paths = indexed_paths
+        return frozenset(
+            d for _, indexed in indexed_paths.values() for _, dists in indexed.values() if dists for d in dists
+        )
+
+    def _scan_path(self, path: str) -> Tuple[Optional[int], _IndexedMetadata]:
+        """Index the given path entry leaving the distributions of metadata directories that need to be read unset."""
+        try:
+            path_stat = os.stat(path)
+        except OSError:
+            return None, {}
+        previous_mtime, previous = self._indexed_paths.get(path, (None, {}))
+        if previous_mtime == path_stat.st_mtime_ns:
+            return previous_mtime, previous
+        if not stat.S_ISDIR(path_stat.st_mode):
+            return path_stat.st_mtime_ns, {path: (None, _convert_distributions(metadata.distributions(path=[path])))}
+        indexed: _IndexedMetadata = {}
+        is_egg = path.lower().endswith(".egg")
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if not (entry.name.lower().endswith(METADATA_SUFFIXES) or is_egg and entry.name == EGG_METADATA_DIR):
+                    continue
+                try:
+                    mtime: Optional[int] = entry.stat().st_mtime_ns
+                except OSError:
+                    continue
+                if entry.path in previous and previous[entry.path][0] == mtime:
+                    indexed[entry.path] = previous[entry.path]
+                else:
+                    indexed[entry.path] = (mtime, None)
+        return path_stat.st_mtime_ns, indexed
+
+    def __repr__(self) -> str:
+        """Return a string representation of the metadata index."""
+        return f"{self.__class__.__name__}()"
+
+
+METADATA_INDEX = MetadataIndex()
+
+
+class DistributionConverter(DistributionFinder):
+    """Converts distribution objects into distribution objects from the model.
+
+    By default the distributions are taken from the process-wide metadata index. If a callable returning distribution
+    objects is given instead all of them are converted. In both cases the result is cached process-wide and only
+    determined again if the fingerprint of the environment changes. Setting max_workers to a value greater than one
+    scans the metadata index in parallel. Snapshots of the metadata index are additionally stored in the persistent
+    cache if one is given so that other processes can load them instead of scanning the environment.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
         self,
         path_cls: Type[_ExistenceCheckablePath] = Path,
-        get_distributions: Callable[[], Iterable[_MetadataDistribution]] = metadata.distributions,
+        get_distributions: Optional[Callable[[], Iterable[_MetadataDistribution]]] = None,
+        get_fingerprint: Callable[[], Hashable] = path_fingerprint,
+        cache: SnapshotCache = SNAPSHOT_CACHE,
+        index: MetadataIndex = METADATA_INDEX,
+        max_workers: int = 1,
+        persistent_cache: Optional[PersistentSnapshotCache] = None,
     ) -> None:
         """Initialize the distribution converter."""
         self._path_cls = path_cls
         self._get_distributions = get_distributions
+        self._get_fingerprint = get_fingerprint
+        self._cache = cache
+        self._index = index
+        self._max_workers = max_workers
+        self._persistent_cache = persistent_cache
 
     def __call__(self) -> frozenset[Distribution]:
         """Return a dictionary containing all distributions."""
-        conv_dists: Set[Distribution] = set()
-        for orig_dist in self._get_distributions():
-            conv_dists.add(self._convert_distribution(orig_dist))
-        return frozenset(conv_dists)
+        source: Hashable = self._get_distributions if self._get_distributions else self._index
+        fingerprint = self._get_fingerprint()
+        snapshot = self._cache.get(source, fingerprint)
+        if snapshot is None:
+            if self._get_distributions:
+                snapshot = _convert_distributions(self._get_distributions())
+            else:
+                snapshot = self._scan_index(fingerprint)
+            self._cache.put(source, fingerprint, snapshot)
+        return snapshot
 
-    def _convert_distribution(self, orig_dist: _MetadataDistribution) -> Distribution:
-        return Distribution(orig_dist.metadata["Name"], orig_dist.metadata["Version"])
+    def _scan_index(self, fingerprint: Hashable) -> frozenset[Distribution]:
+        if self._persistent_cache is None:
+            return self._index(max_workers=self._max_workers)
+        snapshot = self._persistent_cache.get(fingerprint)
+        if snapshot is None:
+            snapshot = self._index(max_workers=self._max_workers)
+            self._persistent_cache.put(fingerprint, snapshot)
+        return snapshot
 
     def __repr__(self) -> str:
         """Return a string representation of the translator."""
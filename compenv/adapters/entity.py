@@ -2,8 +2,9 @@
 from __future__ import annotations
 
 import dataclasses
-from typing import Any, ClassVar, FrozenSet, List, Mapping, Type
+from typing import Any, ClassVar, FrozenSet, List, Mapping, Optional, Type
 
+from ..model.record import Identifier
 from .abstract import MasterEntity, PartEntity
 
 
@@ -17,6 +18,14 @@ class Distribution(PartEntity):
     -> master
     distribution_name: varchar(64)
     distribution_version: varchar(128)
+    index (distribution_name, distribution_version)
+    """
+
+    interned_definition: ClassVar[
+        str
+    ] = """
+    -> master
+    -> InternedDistribution
     """
 
     distribution_name: str
@@ -31,13 +40,69 @@ class Distribution(PartEntity):
 DJDistribution = Distribution
 
 
+@dataclasses.dataclass(frozen=True)
+class InternedDistribution:
+    """DataJoint entity representing a distribution in the lookup table referenced by interned distributions."""
+
+    definition: ClassVar[
+        str
+    ] = """
+    distribution_id: bigint
+    ---
+    distribution_name: varchar(64)
+    distribution_version: varchar(128)
+    unique index (distribution_name, distribution_version)
+    """
+
+    distribution_id: int
+    distribution_name: str
+    distribution_version: str
+
+
+DJInternedDistribution = InternedDistribution
+
+
+@dataclasses.dataclass(frozen=True)
+class DistributionBlob:
+    """DataJoint entity representing the encoded distributions of a computation record stored in a single blob.
+
+    It is declared as a part of the record table so that it can be added to record tables declared without it.
+    """
+
+    definition: ClassVar[
+        str
+    ] = """
+    -> master
+    ---
+    distributions: longblob
+    """
+
+    distributions: bytes
+
+
+DJDistributionBlob = DistributionBlob
+
+
 @dataclasses.dataclass(frozen=True)
 class ComputationRecord(MasterEntity):
-    """DataJoint entity representing a computation record."""
+    """DataJoint entity representing a computation record.
+
+    The identifier is stored alongside the primary key so that the primary key can be looked up by its identifier. It
+    does not take part in comparisons.
+    """
 
     parts: ClassVar[List[Type[PartEntity]]] = [Distribution]
 
+    identifier_attr: ClassVar[str] = "record_identifier"
+    identifier_definition: ClassVar[
+        str
+    ] = """
+    record_identifier = null: char(128)
+    index (record_identifier)
+    """
+
     distributions: FrozenSet[Distribution]
+    identifier: Optional[Identifier] = dataclasses.field(default=None, compare=False)
 
 
 DJComputationRecord = ComputationRecord
@@ -1,12 +1,22 @@
 """Contains the presenter."""
 from __future__ import annotations
 
+import itertools
+import threading
 from collections.abc import Callable
-from typing import Protocol
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Protocol, cast
 
 from compenv.service.diff import DiffResponse
 
+from ..model.record import DiffMatrix
+from ..service.matrix import DiffMatrixResponse
+from ..service.query import QueryResponse
 from ..service.record import RecordResponse
+from .translator import Translator
+
+if TYPE_CHECKING:
+    from ..types import PrimaryKey
 
 
 class Presenter(Protocol):  # pylint: disable=too-few-public-methods
@@ -30,9 +40,61 @@ class PrintingPresenter:
         """Print information contained withing the diff service's response."""
         if response.differ:
             self.print("The computation records differ")
+            self.print(str(response.diff))
         else:
             self.print("The computation records do not differ")
 
     def __repr__(self) -> str:
         """Return a string representation of the presenter."""
         return f"{self.__class__.__name__}(print={repr(self.print)})"
+
+
+@dataclass(frozen=True)
+class EnvironmentMatrix:
+    """Contains the primary keys of records grouped by their environment and the differences between the environments.
+
+    The entry (i, j) of the matrix contains the differences of the j-th environment compared to the i-th one.
+    """
+
+    environments: list[list[PrimaryKey]]
+    matrix: DiffMatrix
+
+
+class CollectingPresenter:
+    """Collects the primary keys of the computation records contained within query service responses.
+
+    The collected results are kept per thread, so that services executed concurrently by different threads do not
+    overwrite each other's results.
+    """
+
+    def __init__(self, translator: Translator[PrimaryKey]) -> None:
+        """Initialize the presenter."""
+        self.translator = translator
+        self._local = threading.local()
+
+    @property
+    def primaries(self) -> list[PrimaryKey]:
+        """Return the primary keys collected from the last query service response presented in this thread."""
+        return cast("list[PrimaryKey]", getattr(self._local, "primaries", []))
+
+    @property
+    def matrix(self) -> EnvironmentMatrix:
+        """Return the environment matrix collected from the last diff matrix service response presented in this thread."""
+        return cast(
+            EnvironmentMatrix,
+            getattr(self._local, "matrix", EnvironmentMatrix(environments=[], matrix=DiffMatrix())),
+        )
+
+    def query(self, response: QueryResponse) -> None:
+        """Collect the primary keys of the computation records contained within the query service's response."""
+        self._local.primaries = self.translator.to_external_many(response.identifiers)
+
+    def diff_matrix(self, response: DiffMatrixResponse) -> None:
+        """Collect the primary keys of the grouped computation records and the diff matrix of their environments."""
+        primaries = iter(self.translator.to_external_many([i for e in response.environments for i in e.identifiers]))
+        environments = [list(itertools.islice(primaries, len(e.identifiers))) for e in response.environments]
+        self._local.matrix = EnvironmentMatrix(environments=environments, matrix=response.matrix)
+
+    def __repr__(self) -> str:
+        """Return a string representation of the presenter."""
+        return f"{self.__class__.__name__}(translator={repr(self.translator)})"
@@ -1,40 +1,62 @@
 """Contains the DataJoint implementation of the computation record repository."""
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Generator, Iterable, Iterator
+import collections
+import dataclasses
+import functools
+import itertools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, Generator, Iterable, Iterator, List, Optional, cast
 
-from ..model.record import ComputationRecord, Distribution, Identifier
-from ..service.abstract import Repository
-from .abstract import AbstractTable
+from ..model.record import ComputationRecord, Distribution, Identifier, Requirement, normalize_name
+from ..service.abstract import Repository, UnitOfWork
+from .abstract import AbstractConnection, AbstractTable, PartEntity
 from .entity import DJComputationRecord, DJDistribution
 from .translator import Translator
+from .unit_of_work import DJUnitOfWork
 
 if TYPE_CHECKING:
     from ..types import PrimaryKey
 
 
+logger = logging.getLogger(__name__)
+
+
 class DJRepository(Repository):
     """Repository that uses DataJoint tables to persist computation records."""
 
-    def __init__(self, translator: Translator[PrimaryKey], table: AbstractTable[DJComputationRecord]) -> None:
-        """Initialize the computation record repository."""
+    def __init__(
+        self,
+        translator: Translator[PrimaryKey],
+        table: AbstractTable[DJComputationRecord],
+        connection: Optional[AbstractConnection] = None,
+    ) -> None:
+        """Initialize the computation record repository.
+
+        The connection is shared with the thread fetching records ahead during iteration if it is given.
+        """
         self.translator = translator
         self.table = table
+        self.connection = connection
 
     def add(self, comp_rec: ComputationRecord) -> None:
         """Add the given computation record to the repository if it does not already exist."""
-        primary = self.translator.to_external(comp_rec.identifier)
-
         try:
-            self.table.add(
-                DJComputationRecord(
-                    primary=primary,
-                    distributions=frozenset(self._persist_dists(comp_rec.distributions)),
-                ),
-            )
+            self.table.add(self._persist_comp_rec(comp_rec))
         except ValueError as error:
             raise ValueError(f"Record with identifier '{comp_rec.identifier}' already exists!") from error
 
+    def _persist_comp_rec(self, comp_rec: ComputationRecord) -> DJComputationRecord:
+        return DJComputationRecord(
+            primary=self.translator.to_external(comp_rec.identifier),
+            distributions=frozenset(self._persist_dists(comp_rec.distributions)),
+            identifier=comp_rec.identifier,
+        )
+
     @staticmethod
     def _persist_dists(dists: Iterable[Distribution]) -> Generator[DJDistribution, None, None]:
         for dist in dists:
@@ -54,6 +76,72 @@ class DJRepository(Repository):
             distributions=self._reconstitue_distributions(dj_comp_rec),
         )
 
+    def get_many(self, identifiers: Iterable[Identifier], chunk_size: int = 1000) -> Iterator[ComputationRecord]:
+        """Get the computation records matching the given identifiers in the given order.
+
+        The records are fetched in chunks of chunk_size records to bound memory usage.
+        """
+        iterator = iter(identifiers)
+        for chunk in iter(lambda: list(itertools.islice(iterator, chunk_size)), []):
+            yield from self._get_chunk(chunk)
+
+    def iter_records(self, batch_size: int = 1000, prefetch: int = 1) -> Iterator[ComputationRecord]:
+        """Iterate over all computation records fetching batch_size records at a time.
+
+        Up to prefetch batches are fetched ahead on a background thread while the current batch is consumed. That
+        thread uses the connection opened in the iterating thread (see AbstractConnection.shared), so the connection
+        must not be used otherwise during iteration. Batches are only fetched ahead if the repository has a connection.
+        """
+        identifiers = iter(self)
+        batches = (self._get_chunk(c) for c in iter(lambda: list(itertools.islice(identifiers, batch_size)), []))
+        if not prefetch or self.connection is None:
+            yield from itertools.chain.from_iterable(batches)
+            return
+        fetch = self.connection.shared(functools.partial(next, batches, None))
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = collections.deque(executor.submit(fetch) for _ in range(prefetch + 1))
+            while True:
+                batch = pending.popleft().result()
+                if batch is None:
+                    return
+                pending.append(executor.submit(fetch))
+                yield from batch
+
+    def _get_chunk(self, identifiers: List[Identifier]) -> List[ComputationRecord]:
+        primaries = self.translator.to_external_many(identifiers)
+        try:
+            dj_comp_recs = list(self.table.get_many(primaries, chunk_size=len(primaries)))
+        except KeyError as error:
+            raise KeyError(f"One of the records with identifiers {identifiers} does not exist!") from error
+        return [
+            ComputationRecord(identifier=i, distributions=self._reconstitue_distributions(r))
+            for i, r in zip(identifiers, dj_comp_recs)
+        ]
+
+    def find(self, requirements: Iterable[Requirement]) -> Iterator[Identifier]:
+        """Iterate over the identifiers of all computation records with a distribution satisfying any requirement.
+
+        The tables are restricted to the names of the required distributions in the database. Since the database
+        compares names case-insensitively, a restriction for every spelling of a normalized name that only differs in
+        its separators is enough. Versions are compared afterwards because the database can not order version strings
+        correctly.
+        """
+        requirements = list(requirements)
+        names = dict.fromkeys(s for q in requirements for s in _spellings(q.name))
+        restrictions = [{"distribution_name": n} for n in names]
+
+        def predicate(part_entity: PartEntity) -> bool:
+            dist = self._reconstitue_dist(cast(DJDistribution, part_entity))
+            return any(q.is_satisfied_by(dist) for q in requirements)
+
+        return (self.translator.to_internal(p) for p in self.table.find(restrictions, predicate))
+
+    @staticmethod
+    def _satisfying(comp_recs: Iterable[ComputationRecord], requirements: List[Requirement]) -> List[Identifier]:
+        return [
+            r.identifier for r in comp_recs if any(q.is_satisfied_by(d) for q in requirements for d in r.distributions)
+        ]
+
     def _reconstitue_distributions(self, dj_comp_rec: DJComputationRecord) -> frozenset[Distribution]:
         return frozenset(self._reconstitue_dist(d) for d in dj_comp_rec.distributions)
 
@@ -73,4 +161,393 @@ class DJRepository(Repository):
 
     def __repr__(self) -> str:
         """Return a string representation of the computation record repository."""
-        return f"{self.__class__.__name__}(translator={self.translator}, table={self.table})"
+        return (
+            f"{self.__class__.__name__}(translator={self.translator}, table={self.table}, "
+            f"connection={self.connection})"
+        )
+
+
+def _spellings(name: str) -> Iterator[str]:
+    """Yield all spellings of the normalized name that use hyphens, underscores or periods as separators."""
+    parts = normalize_name(name).split("-")
+    for separators in itertools.product("-_.", repeat=len(parts) - 1):
+        yield parts[0] + "".join(s + p for s, p in zip(separators, parts[1:]))
+
+
+class BufferedDJRepository(DJRepository):
+    """Repository that buffers computation records and writes them to the tables in batches.
+
+    Added records are staged until the unit of work they were added in commits and discarded if it rolls back instead.
+    Committed records are buffered and flushed with one insert per table once the buffer holds max_records records or
+    its oldest record is older than max_seconds. The flush happens in its own unit of work on a background thread if
+    the repository has a connection, so that a failing flush does not affect the unit of work that filled the buffer.
+    The buffer is also flushed on a timer once its oldest record has been buffered for max_seconds. Without a
+    connection the buffer is flushed in the committing thread after its unit of work committed. Records that are
+    still buffered when the process exits are flushed by flush_at_exit if it was registered.
+
+    Records are removed from the buffer once the unit of work that flushed them commits. If it rolls back or the insert
+    fails, they stay buffered and are written by the next flush. Records that already exist in the table are discarded.
+
+    Durability: A record is only persisted once it has been flushed and the unit of work that flushed it has been
+    committed. Records that are still buffered when the process crashes are lost even though the computations they
+    describe may already have been committed.
+    """
+
+    def __init__(
+        self,
+        translator: Translator[PrimaryKey],
+        table: AbstractTable[DJComputationRecord],
+        connection: Optional[AbstractConnection] = None,
+        *,
+        max_records: int = 100,
+        max_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the buffered computation record repository."""
+        if max_records < 1:
+            raise ValueError("max_records must be at least one!")
+        super().__init__(translator, table, connection)
+        self.max_records = max_records
+        self.max_seconds = max_seconds
+        self.clock = clock
+        self._buffer: Dict[Identifier, DJComputationRecord] = {}
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._timer: Optional[threading.Timer] = None
+
+    @property
+    def _staged(self) -> Dict[Identifier, DJComputationRecord]:
+        if not hasattr(self._local, "staged"):
+            self._local.staged = {}
+        return cast(Dict[Identifier, DJComputationRecord], self._local.staged)
+
+    @property
+    def _flushed(self) -> Dict[Identifier, DJComputationRecord]:
+        if not hasattr(self._local, "flushed"):
+            self._local.flushed = {}
+        return cast(Dict[Identifier, DJComputationRecord], self._local.flushed)
+
+    @property
+    def pending(self) -> int:
+        """Return the number of buffered computation records."""
+        return len(self._buffer)
+
+    def add(self, comp_rec: ComputationRecord) -> None:
+        """Stage the given computation record until the current unit of work commits.
+
+        Raises:
+            ValueError: A record with the same identifier was already added or exists in the table.
+        """
+        dj_comp_rec = self._persist_comp_rec(comp_rec)
+        with self._lock:
+            known = comp_rec.identifier in self._buffer
+        if known or comp_rec.identifier in self._staged or dj_comp_rec.primary in self.table:
+            raise ValueError(f"Record with identifier '{comp_rec.identifier}' already exists!")
+        self._staged[comp_rec.identifier] = dj_comp_rec
+
+    def on_commit(self) -> None:
+        """Buffer the records staged in the committed unit of work and flush the buffer if it is full or too old.
+
+        Records flushed within the committed unit of work are persisted now.
+        """
+        self._flushed.clear()
+        with self._lock:
+            self._buffer.update(self._staged)
+            self._staged.clear()
+            self._track_oldest()
+            due = len(self._buffer) >= self.max_records or (
+                self._oldest is not None and self.clock() - self._oldest >= self.max_seconds
+            )
+        if not due:
+            return
+        if self.connection is None:
+            self._flush_logging_errors()
+            self._flushed.clear()
+        else:
+            threading.Thread(target=self._flush_in_own_unit_of_work, name="compenv-flush", daemon=True).start()
+
+    def on_rollback(self) -> None:
+        """Discard the records staged in the rolled back unit of work and buffer the records it flushed again."""
+        self._staged.clear()
+        with self._lock:
+            self._buffer.update(self._flushed)
+            self._flushed.clear()
+            self._track_oldest()
+
+    def _track_oldest(self) -> None:
+        if not self._buffer:
+            self._oldest = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        elif self._oldest is None:
+            self._oldest = self.clock()
+            if self.connection is not None:
+                self._timer = threading.Timer(self.max_seconds, self._flush_in_own_unit_of_work)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush_in_own_unit_of_work(self) -> None:
+        with self._lock:
+            self._timer = None
+        try:
+            flush_at_exit(DJUnitOfWork(cast(AbstractConnection, self.connection), self), self)
+        except Exception as error:  # pylint: disable=broad-except
+            logger.error("Failed to flush buffered records", exc_info=error)
+            with self._lock:
+                if self._timer is None:
+                    self._oldest = None
+                    self._track_oldest()
+
+    def _flush_logging_errors(self) -> None:
+        try:
+            self.flush()
+        except Exception as error:  # pylint: disable=broad-except
+            logger.error("Failed to flush buffered records", exc_info=error)
+
+    def flush(self) -> None:
+        """Write all buffered computation records to the tables within the current unit of work.
+
+        The records are removed from the buffer once they have been written. They are buffered again if the unit of
+        work rolls back instead of committing.
+
+        Raises:
+            ValueError: One of the buffered records already exists. Buffered records that already exist are discarded,
+                the others stay buffered.
+        """
+        with self._lock:
+            batch = dict(self._buffer)
+            if not batch:
+                return
+            try:
+                self.table.add_many(list(batch.values()))
+            except ValueError as error:
+                existing = [i for i, r in batch.items() if r.primary in self.table]
+                for identifier in existing:
+                    del self._buffer[identifier]
+                if existing:
+                    logger.error("Discarded buffered records with identifiers %s that already exist", existing)
+                self._track_oldest()
+                raise ValueError(f"One of {len(batch)} buffered records already exists!") from error
+            for identifier in batch:
+                del self._buffer[identifier]
+            self._flushed.update(batch)
+            self._track_oldest()
+
+    def get(self, identifier: Identifier) -> ComputationRecord:
+        """Get the computation record matching the given identifier from the buffer or the repository."""
+        with self._lock:
+            dj_comp_rec = self._buffer.get(identifier)
+        if dj_comp_rec is None:
+            return super().get(identifier)
+        return ComputationRecord(identifier=identifier, distributions=self._reconstitue_distributions(dj_comp_rec))
+
+    def _get_chunk(self, identifiers: List[Identifier]) -> List[ComputationRecord]:
+        with self._lock:
+            buffered = {i: self._buffer[i] for i in identifiers if i in self._buffer}
+        persisted = [i for i in identifiers if i not in buffered]
+        comp_recs = dict(zip(persisted, super()._get_chunk(persisted))) if persisted else {}
+        for identifier, dj_comp_rec in buffered.items():
+            comp_recs[identifier] = ComputationRecord(identifier, self._reconstitue_distributions(dj_comp_rec))
+        return [comp_recs[i] for i in identifiers]
+
+    def find(self, requirements: Iterable[Requirement]) -> Iterator[Identifier]:
+        """Iterate over the identifiers of all persisted and buffered computation records satisfying any requirement."""
+        requirements = list(requirements)
+        with self._lock:
+            buffered = [ComputationRecord(i, self._reconstitue_distributions(r)) for i, r in self._buffer.items()]
+        return itertools.chain(super().find(requirements), self._satisfying(buffered, requirements))
+
+    def __iter__(self) -> Iterator[Identifier]:
+        """Iterate over the identifiers of all persisted and buffered computation records."""
+        with self._lock:
+            buffered = list(self._buffer)
+        return itertools.chain(super().__iter__(), buffered)
+
+    def __len__(self) -> int:
+        """Return the number of persisted and buffered computation records."""
+        return super().__len__() + self.pending
+
+    def __repr__(self) -> str:
+        """Return a string representation of the buffered computation record repository."""
+        return (
+            f"{self.__class__.__name__}(translator={self.translator}, table={self.table}, "
+            f"connection={self.connection}, max_records={self.max_records}, max_seconds={self.max_seconds})"
+        )
+
+
+def flush_at_exit(uow: UnitOfWork, repo: BufferedDJRepository) -> None:
+    """Flush the records still buffered in the repository within its own unit of work."""
+    if not repo.pending:
+        return
+    with uow:
+        repo.flush()
+        uow.commit()
+
+
+@dataclasses.dataclass(frozen=True)
+class FailedRecord:
+    """A computation record that the writer thread failed to persist."""
+
+    identifier: Identifier
+    error: Exception
+
+
+class WriteBehindDJRepository(DJRepository):
+    """Repository that hands computation records to a background writer thread instead of persisting them directly.
+
+    Records are translated when they are added, so the translator does not need to hold the primary keys of queued
+    records. They are only queued once the unit of work they were added in commits and discarded if it rolls back. The writer thread adds the translated records to the table of the writer unit of work's repository, which
+    must be a DataJoint repository, and commits every record in its own unit of work. The writer unit of work must use
+    its own connection. At most max_pending records wait to be written; adding another record blocks until the writer
+    caught up. Records that failed to persist are logged and collected in failed.
+
+    Durability: A record is only persisted once the writer committed it. Records still waiting to be written are lost
+    if the process crashes even though the computations they describe may already have been committed. Call close
+    (registered at exit by create_dj_adapters) to wait for all pending records before the process exits.
+    """
+
+    _stop = object()
+
+    def __init__(
+        self,
+        translator: Translator[PrimaryKey],
+        table: AbstractTable[DJComputationRecord],
+        writer: UnitOfWork,
+        connection: Optional[AbstractConnection] = None,
+        *,
+        max_pending: int = 1000,
+    ) -> None:
+        """Initialize the write-behind computation record repository."""
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least one!")
+        super().__init__(translator, table, connection)
+        self.writer = writer
+        self.max_pending = max_pending
+        self.failed: List[FailedRecord] = []
+        self._queue: queue.Queue[object] = queue.Queue(maxsize=max_pending)
+        self._pending: Dict[Identifier, DJComputationRecord] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        """Return the number of computation records waiting to be written."""
+        return len(self._pending)
+
+    @property
+    def _staged(self) -> Dict[Identifier, DJComputationRecord]:
+        if not hasattr(self._local, "staged"):
+            self._local.staged = {}
+        return cast(Dict[Identifier, DJComputationRecord], self._local.staged)
+
+    def add(self, comp_rec: ComputationRecord) -> None:
+        """Translate the given computation record and stage it until the current unit of work commits.
+
+        Raises:
+            ValueError: A record with the same identifier was already added.
+        """
+        dj_comp_rec = self._persist_comp_rec(comp_rec)
+        with self._lock:
+            known = comp_rec.identifier in self._pending
+        if known or comp_rec.identifier in self._staged:
+            raise ValueError(f"Record with identifier '{comp_rec.identifier}' already exists!")
+        self._staged[comp_rec.identifier] = dj_comp_rec
+
+    def on_commit(self) -> None:
+        """Queue the records staged in the committed unit of work for writing, blocking while the queue is full."""
+        staged = list(self._staged.items())
+        self._staged.clear()
+        for identifier, dj_comp_rec in staged:
+            with self._lock:
+                self._pending[identifier] = dj_comp_rec
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._write, name="compenv-writer", daemon=True)
+                    self._thread.start()
+            self._queue.put(dj_comp_rec)
+
+    def on_rollback(self) -> None:
+        """Discard the records staged in the rolled back unit of work."""
+        self._staged.clear()
+
+    def _write(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is self._stop:
+                    return
+                self._write_one(cast(DJComputationRecord, item))
+            finally:
+                self._queue.task_done()
+
+    def _write_one(self, dj_comp_rec: DJComputationRecord) -> None:
+        identifier = cast(Identifier, dj_comp_rec.identifier)
+        try:
+            with self.writer:
+                cast(DJRepository, self.writer.records).table.add(dj_comp_rec)
+                self.writer.commit()
+        except Exception as error:  # pylint: disable=broad-except
+            logger.error("Failed to persist record with identifier '%s'", identifier, exc_info=error)
+            self.failed.append(FailedRecord(identifier, error))
+        finally:
+            with self._lock:
+                del self._pending[identifier]
+
+    def flush(self) -> None:
+        """Wait until all queued computation records have been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write all queued computation records and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(self._stop)
+        thread.join()
+
+    def get(self, identifier: Identifier) -> ComputationRecord:
+        """Get the computation record matching the given identifier from the queue or the repository."""
+        with self._lock:
+            dj_comp_rec = self._pending.get(identifier)
+        if dj_comp_rec is None:
+            return super().get(identifier)
+        return ComputationRecord(identifier=identifier, distributions=self._reconstitue_distributions(dj_comp_rec))
+
+    def _get_chunk(self, identifiers: List[Identifier]) -> List[ComputationRecord]:
+        with self._lock:
+            pending = {i: self._pending[i] for i in identifiers if i in self._pending}
+        persisted = [i for i in identifiers if i not in pending]
+        comp_recs = dict(zip(persisted, super()._get_chunk(persisted))) if persisted else {}
+        for identifier, dj_comp_rec in pending.items():
+            comp_recs[identifier] = ComputationRecord(identifier, self._reconstitue_distributions(dj_comp_rec))
+        return [comp_recs[i] for i in identifiers]
+
+    def find(self, requirements: Iterable[Requirement]) -> Iterator[Identifier]:
+        """Iterate over the identifiers of all persisted and queued computation records satisfying any requirement."""
+        requirements = list(requirements)
+        with self._lock:
+            pending = [ComputationRecord(i, self._reconstitue_distributions(r)) for i, r in self._pending.items()]
+        queued = {r.identifier for r in pending}
+        written = (i for i in super().find(requirements) if i not in queued)
+        return itertools.chain(written, self._satisfying(pending, requirements))
+
+    def __iter__(self) -> Iterator[Identifier]:
+        """Iterate over the identifiers of all persisted and queued computation records."""
+        with self._lock:
+            pending = dict.fromkeys(self._pending)
+        written = (i for i in super().__iter__() if i not in pending)
+        return itertools.chain(written, pending)
+
+    def __len__(self) -> int:
+        """Return the number of persisted and queued computation records."""
+        return super().__len__() + self.pending
+
+    def __repr__(self) -> str:
+        """Return a string representation of the write-behind computation record repository."""
+        return (
+            f"{self.__class__.__name__}(translator={self.translator}, table={self.table}, writer={self.writer}, "
+            f"connection={self.connection}, max_pending={self.max_pending})"
+        )
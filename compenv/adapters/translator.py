@@ -1,11 +1,32 @@
 """Contains code used for translation between external and internal data."""
 from __future__ import annotations
 
+import dataclasses
+import functools
 import hashlib
 import json
-from typing import TYPE_CHECKING, Callable, Dict, Protocol, TypeVar
+import json.encoder
+import math
+import threading
+from collections import OrderedDict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    TypeVar,
+    cast,
+)
 
 from ..model.record import Identifier
+from .abstract import AbstractConnection, AbstractTable
 
 if TYPE_CHECKING:
     from ..types import PrimaryKey
@@ -23,30 +44,207 @@ class Translator(Protocol[_T]):
     def to_external(self, identifier: Identifier) -> _T:
         """Translate the primary key into its corresponding identifier."""
 
+    def to_external_many(self, identifiers: Iterable[Identifier]) -> List[_T]:
+        """Translate the identifiers into their corresponding primary keys in the given order."""
+
+
+@dataclasses.dataclass
+class TranslatorStats:
+    """Statistics about the reverse translations performed by a translator."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the fraction of reverse translations that were answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
 
 class DJTranslator:
     """Translator used to translate between DataJoint-specific primary keys and domain-model-specific identifiers.
 
-    Translations from identifier to primary key are only possible if the same primary key was previously translated into
-    its corresponding identifier.
+    The primary keys of the last capacity translations into identifiers are cached for translations in the opposite
+    direction. Primary keys that are not cached, e.g. because they were evicted or translated by another process, are
+    looked up in batches using the fallback if one is given. Otherwise translations from identifier to primary key are
+    only possible if the primary key is still cached.
     """
 
-    def __init__(self, to_identifier: Callable[[PrimaryKey], Identifier]) -> None:
+    def __init__(
+        self,
+        to_identifier: Callable[[PrimaryKey], Identifier],
+        *,
+        capacity: int = 100_000,
+        fallback: Optional[Callable[[Sequence[Identifier]], Mapping[Identifier, PrimaryKey]]] = None,
+    ) -> None:
         """Initialize the translator."""
+        if capacity < 1:
+            raise ValueError("capacity must be at least one!")
         self._to_identifier = to_identifier
-        self._reverse_translations: Dict[Identifier, PrimaryKey] = {}
+        self.capacity = capacity
+        self.fallback = fallback
+        self.stats = TranslatorStats()
+        self._reverse_translations: OrderedDict[Identifier, PrimaryKey] = OrderedDict()
+        self._lock = threading.Lock()
 
     def to_internal(self, primary: PrimaryKey) -> Identifier:
         """Translate the identifier to its corresponding primary key."""
         identifier = self._to_identifier(primary)
-        self._reverse_translations[identifier] = dict(primary).copy()
+        self._cache({identifier: dict(primary).copy()})
         return identifier
 
     def to_external(self, identifier: Identifier) -> PrimaryKey:
         """Translate the primary key into its corresponding identifier."""
-        return self._reverse_translations[identifier]
+        return self.to_external_many([identifier])[0]
+
+    def to_external_many(self, identifiers: Iterable[Identifier]) -> List[PrimaryKey]:
+        """Translate the identifiers into their corresponding primary keys in the given order.
+
+        All identifiers that are not cached are passed to a single call of the fallback.
+
+        Raises:
+            KeyError: One of the identifiers can not be translated.
+        """
+        identifiers = list(identifiers)
+        primaries: Dict[Identifier, PrimaryKey] = {}
+        with self._lock:
+            for identifier in identifiers:
+                primary = self._reverse_translations.get(identifier)
+                if primary is None:
+                    self.stats.misses += 1
+                    continue
+                self._reverse_translations.move_to_end(identifier)
+                self.stats.hits += 1
+                primaries[identifier] = primary
+        missing = [i for i in dict.fromkeys(identifiers) if i not in primaries]
+        if missing and self.fallback is not None:
+            found = self.fallback(missing)
+            self._cache(found)
+            primaries.update(found)
+        for identifier in identifiers:
+            if identifier not in primaries:
+                raise KeyError(identifier)
+        return [primaries[i] for i in identifiers]
+
+    def _cache(self, primaries: Mapping[Identifier, PrimaryKey]) -> None:
+        with self._lock:
+            for identifier, primary in primaries.items():
+                self._reverse_translations[identifier] = primary
+                self._reverse_translations.move_to_end(identifier)
+            while len(self._reverse_translations) > self.capacity:
+                self._reverse_translations.popitem(last=False)
+                self.stats.evictions += 1
+
+    def __repr__(self) -> str:
+        """Return a string representation of the translator."""
+        return (
+            f"{self.__class__.__name__}(to_identifier={self._to_identifier!r}, capacity={self.capacity}, "
+            f"fallback={self.fallback!r})"
+        )
+
+
+class TableLookup:
+    """Looks up the primary keys corresponding to identifiers in a table.
+
+    The identifiers are looked up in the identifier column of the table first. Records stored without their identifier
+    are only found by scanning the primary keys of the whole table, which is done if any identifier is left over. The
+    connection is opened for the duration of the lookup unless it is already open, e.g. within a unit of work.
+    """
+
+    def __init__(
+        self,
+        table: AbstractTable[Any],
+        connection: AbstractConnection,
+        to_identifier: Callable[[PrimaryKey], Identifier],
+    ) -> None:
+        """Initialize the lookup."""
+        self.table = table
+        self.connection = connection
+        self._to_identifier = to_identifier
+
+    def __call__(self, identifiers: Sequence[Identifier]) -> Dict[Identifier, PrimaryKey]:
+        """Return the primary keys corresponding to the identifiers that were found."""
+        if self.connection.is_open:
+            return self._lookup(identifiers)
+        self.connection.open()
+        try:
+            return self._lookup(identifiers)
+        finally:
+            self.connection.close()
+
+    def _lookup(self, identifiers: Sequence[Identifier]) -> Dict[Identifier, PrimaryKey]:
+        primaries = self.table.get_primaries(identifiers)
+        missing = set(identifiers) - primaries.keys()
+        for primary in self.table if missing else []:
+            identifier = self._to_identifier(primary)
+            if identifier in missing:
+                primaries[identifier] = dict(primary)
+                missing.remove(identifier)
+                if not missing:
+                    break
+        return primaries
+
+    def __repr__(self) -> str:
+        """Return a string representation of the lookup."""
+        return (
+            f"{self.__class__.__name__}(table={self.table!r}, connection={self.connection!r}, "
+            f"to_identifier={self._to_identifier!r})"
+        )
+
+
+_encode_string = json.encoder.encode_basestring_ascii
+
+_Layout = Optional[List[Tuple[str, str]]]
+
+
+@functools.lru_cache(maxsize=128)
+def _layout(names: Tuple[Any, ...]) -> _Layout:
+    if not all(type(n) is str for n in names):  # pylint: disable=unidiomatic-typecheck
+        return None
+    return [(("{" if i == 0 else ", ") + _encode_string(n) + ": ", n) for i, n in enumerate(sorted(names))]
+
+
+def _encode_value(value: object) -> Optional[str]:
+    kind = type(value)
+    if kind is str:
+        return _encode_string(cast(str, value))
+    if kind is int:
+        return int.__repr__(cast(int, value))
+    if kind is float and math.isfinite(cast(float, value)):
+        return float.__repr__(cast(float, value))
+    return None
+
+
+def _encode(primary: PrimaryKey, layout: _Layout) -> str:
+    if layout is None:
+        return json.dumps(primary, sort_keys=True)
+    parts = []
+    for prefix, name in layout:
+        encoded = _encode_value(primary[name])
+        if encoded is None:
+            return json.dumps(primary, sort_keys=True)
+        parts.append(prefix)
+        parts.append(encoded)
+    return "".join(parts) + "}" if parts else "{}"
+
+
+def canonical_json(primary: PrimaryKey) -> str:
+    """Encode the flat primary key exactly like json.dumps(primary, sort_keys=True) does.
+
+    Strings, integers and finite floats are encoded directly. Primary keys containing other values are passed on to
+    json.dumps. The sorted and encoded attribute names are cached for the most recently seen sets of attribute names.
+    """
+    return _encode(primary, _layout(tuple(primary)))
 
 
 def blake2b(primary: PrimaryKey) -> Identifier:
     """Convert the primary key into an identifier using the blake2b hashing algorithm."""
-    return Identifier(hashlib.blake2b(json.dumps(primary, sort_keys=True).encode()).hexdigest())
+    return Identifier(hashlib.blake2b(canonical_json(primary).encode()).hexdigest())
+
+
+def blake2b_many(primaries: Iterable[PrimaryKey]) -> List[Identifier]:
+    """Convert the primary keys into identifiers like blake2b does in a single pass without its per-key call overhead."""
+    layout, encode, new = _layout, _encode, hashlib.blake2b
+    return cast(List[Identifier], [new(encode(p, layout(tuple(p))).encode()).hexdigest() for p in primaries])
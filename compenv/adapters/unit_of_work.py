@@ -26,10 +26,12 @@ class DJUnitOfWork(UnitOfWork):
     def commit(self) -> None:
         """Commit the unit of work."""
         self.connection.transaction.commit()
+        self._records.on_commit()
 
     def rollback(self) -> None:
         """Rollback the unit of work."""
         self.connection.transaction.rollback()
+        self._records.on_rollback()
 
     def __exit__(
         self, exc_type: Optional[Type[BaseException]], exc: Optional[BaseException], traceback: Optional[TracebackType]
@@ -1,9 +1,11 @@
 """Contains setup code for the backend."""
 import dataclasses
+import threading
+from typing import Callable, Optional
 
 from .adapters import DJAdapters, create_dj_adapters
 from .infrastructure import DJInfrastructure, create_dj_infrastructure
-from .infrastructure.types import Schema
+from .infrastructure.types import ConnectionFactory, Schema
 
 
 @dataclasses.dataclass(frozen=True)
@@ -14,8 +16,83 @@ class DJBackend:
     adapters: DJAdapters
 
 
-def create_dj_backend(schema: Schema, table_name: str) -> DJBackend:
-    """Create backend made up of all the DataJoint specific parts."""
-    infra = create_dj_infrastructure(schema, table_name)
-    adapters = create_dj_adapters(infra.table, infra.connection)
+def create_dj_backend(  # pylint: disable=too-many-arguments
+    schema: Schema,
+    table_name: str,
+    layout: str = "parts",
+    *,
+    buffer_records: int = 0,
+    buffer_seconds: float = 10.0,
+    write_behind: int = 0,
+    fast_insert: bool = False,
+    pool_size: int = 0,
+    shared_connection: Optional[ConnectionFactory] = None,
+    translation_cache_size: int = 100_000,
+) -> DJBackend:
+    """Create backend made up of all the DataJoint specific parts.
+
+    The writer thread used if write_behind is positive gets its own set of infrastructure objects and therefore its
+    own connection. Records are written using the connection produced by shared_connection if it is given (see
+    create_dj_infrastructure). This can not be combined with write-behind or buffering, because buffered records are
+    also flushed outside of make calls on a timer thread and at exit, where the shared connection must not be used.
+    """
+    if shared_connection and write_behind > 0:
+        raise ValueError("A shared connection can not be combined with write-behind!")
+    if shared_connection and buffer_records > 0:
+        raise ValueError("A shared connection can not be combined with buffering!")
+    infra = create_dj_infrastructure(
+        schema,
+        table_name,
+        layout=layout,
+        fast_insert=fast_insert,
+        pool_size=pool_size,
+        shared_connection=shared_connection,
+    )
+    writer_infra = (
+        create_dj_infrastructure(schema, table_name, layout=layout, fast_insert=fast_insert, pool_size=pool_size)
+        if write_behind > 0
+        else None
+    )
+    adapters = create_dj_adapters(
+        infra.table,
+        infra.connection,
+        buffer_records=buffer_records,
+        buffer_seconds=buffer_seconds,
+        write_behind=write_behind,
+        writer_table=writer_infra.table if writer_infra else None,
+        writer_connection=writer_infra.connection if writer_infra else None,
+        translation_cache_size=translation_cache_size,
+    )
     return DJBackend(infra=infra, adapters=adapters)
+
+
+class LazyBackend:
+    """Creates a backend on first use.
+
+    The backend is created at most once even if it is first used by several threads at the same time.
+    """
+
+    def __init__(self, create: Callable[[], DJBackend]) -> None:
+        """Initialize the lazy backend."""
+        self.create = create
+        self._backend: Optional[DJBackend] = None
+        self._lock = threading.Lock()
+
+    @property
+    def created(self) -> bool:
+        """Return True if the backend was already created, False otherwise."""
+        return self._backend is not None
+
+    def __call__(self) -> DJBackend:
+        """Return the backend creating it if this is the first call."""
+        backend = self._backend
+        if backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = self.create()
+                backend = self._backend
+        return backend
+
+    def __repr__(self) -> str:
+        """Return a string representation of the lazy backend."""
+        return f"{self.__class__.__name__}(create={repr(self.create)})"
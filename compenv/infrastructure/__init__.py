@@ -1,10 +1,20 @@
 """This package contains the infrastructure layer."""
 import dataclasses
+from typing import Optional
 
-from .connection import Connection, DJConnectionFactory
+from .connection import Connection, ConnectionPool, DJConnectionFactory, JoinedConnection, PooledConnection
 from .schema import SchemaFactory
-from .table import Table, TableFactory
-from .types import Schema
+from .table import (
+    BlobTable,
+    BlobTableFactory,
+    InternedTable,
+    InternedTableFactory,
+    SnapshotTable,
+    SnapshotTableFactory,
+    Table,
+    TableFactory,
+)
+from .types import ConnectionFactory, Schema
 
 
 @dataclasses.dataclass(frozen=True)
@@ -16,14 +26,66 @@ class DJInfrastructure:
     connection: Connection
 
 
-def create_dj_infrastructure(schema: Schema, table_name: str) -> DJInfrastructure:
-    """Create a set of DataJoint infrastructure objects."""
+LAYOUTS = ("parts", "snapshot", "interned", "blob")
+
+
+def create_dj_infrastructure(
+    schema: Schema,
+    table_name: str,
+    layout: str = "parts",
+    *,
+    fast_insert: bool = False,
+    pool_size: int = 0,
+    shared_connection: Optional[ConnectionFactory] = None,
+) -> DJInfrastructure:
+    """Create a set of DataJoint infrastructure objects.
+
+    The layout determines how records are stored. With the "parts" layout every record stores its distributions in
+    its own part rows. With the "snapshot" layout every distinct set of distributions is stored only once and records
+    reference it by its content hash. The "interned" layout is like the "parts" layout but the part rows reference
+    distribution names and versions stored once in a lookup table by a compact integer ID. The "blob" layout stores
+    the distributions of a record compressed in a single row of a part of the record table.
+
+    If fast_insert is True rows are inserted with one raw SQL statement per table bypassing DataJoint's per-row
+    validation (see insert_rows).
+
+    If pool_size is positive connections are checked out of a pool of at most pool_size connections and reused across
+    units of work instead of being opened and closed for each of them (see ConnectionPool).
+
+    If shared_connection is given the connection it produces is used instead of a connection of our own and a
+    transaction already in progress on it is joined (see JoinedConnection).
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout '{layout}', expected one of {LAYOUTS}!")
+    if shared_connection and pool_size > 0:
+        raise ValueError("A shared connection can not be pooled!")
     connection_info = schema.connection.conn_info
     connection_factory = DJConnectionFactory(
         connection_info["host"], connection_info["user"], connection_info["passwd"]
     )
-    connection = Connection(connection_factory)
+    connection: Connection
+    if shared_connection:
+        connection = JoinedConnection(shared_connection)
+    elif pool_size > 0:
+        connection = PooledConnection(ConnectionPool(connection_factory, max_size=pool_size))
+    else:
+        connection = Connection(connection_factory)
     schema_factory = SchemaFactory(schema.database, connection=connection)
-    table_factory = TableFactory(schema_factory, parent=table_name)
-    table = Table(factory=table_factory)
+    table_factory: TableFactory
+    table: Table
+    if layout == "snapshot":
+        snapshot_table_factory = SnapshotTableFactory(schema_factory, parent=table_name)
+        table_factory = snapshot_table_factory
+        table = SnapshotTable(factory=snapshot_table_factory, fast_insert=fast_insert)
+    elif layout == "interned":
+        interned_table_factory = InternedTableFactory(schema_factory, parent=table_name)
+        table_factory = interned_table_factory
+        table = InternedTable(factory=interned_table_factory, fast_insert=fast_insert)
+    elif layout == "blob":
+        blob_table_factory = BlobTableFactory(schema_factory, parent=table_name)
+        table_factory = blob_table_factory
+        table = BlobTable(factory=blob_table_factory, fast_insert=fast_insert)
+    else:
+        table_factory = TableFactory(schema_factory, parent=table_name)
+        table = Table(factory=table_factory, fast_insert=fast_insert)
     return DJInfrastructure(factory=table_factory, table=table, connection=connection)
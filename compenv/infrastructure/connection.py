@@ -1,27 +1,43 @@
 """Contains code related to DataJoint's connection object."""
 from __future__ import annotations
 
+import dataclasses
 import io
+import threading
+import time
 from collections.abc import Callable
 from contextlib import redirect_stdout
 from types import TracebackType
-from typing import Optional, Type, TypedDict
+from typing import List, Optional, Tuple, Type, TypedDict, TypeVar, cast
 
 from datajoint.connection import Connection as DJConnection
 
 from ..adapters.abstract import AbstractConnection, AbstractTransaction
 from . import types
 
+_T = TypeVar("_T")
+
 
 class Connection(AbstractConnection):
-    """Represents a facade around the connection specific parts of DataJoint's connection object."""
+    """Represents a facade around the connection specific parts of DataJoint's connection object.
+
+    Every thread opens and closes its own DataJoint connection so that the facade can be shared between threads.
+    """
 
     def __init__(self, factory: types.ConnectionFactory) -> None:
         """Initialize the connection."""
         self._factory = factory
-        self._dj_connection: Optional[types.Connection] = None
+        self._local = threading.local()
         self._transaction = _Transaction(self)
 
+    @property
+    def _dj_connection(self) -> Optional[types.Connection]:
+        return cast(Optional[types.Connection], getattr(self._local, "dj_connection", None))
+
+    @_dj_connection.setter
+    def _dj_connection(self, dj_connection: Optional[types.Connection]) -> None:
+        self._local.dj_connection = dj_connection
+
     @property
     def transaction(self) -> _Transaction:
         """Return the transaction."""
@@ -34,6 +50,11 @@ class Connection(AbstractConnection):
             raise RuntimeError("Not connected")
         return self._dj_connection
 
+    @property
+    def is_open(self) -> bool:
+        """Return True if the connection is open in the current thread, False otherwise."""
+        return self._dj_connection is not None
+
     def open(self) -> None:
         """Open a new connection."""
         self._dj_connection = self._factory()
@@ -43,6 +64,22 @@ class Connection(AbstractConnection):
         self.dj_connection.close()
         self._dj_connection = None
 
+    def shared(self, function: Callable[[], _T]) -> Callable[[], _T]:
+        """Return a function that calls the given function using the DataJoint connection of the calling thread.
+
+        The DataJoint connection is only used by the thread calling the returned function while the function runs.
+        """
+        dj_connection = self.dj_connection
+
+        def call() -> _T:
+            previous, self._dj_connection = self._dj_connection, dj_connection
+            try:
+                return function()
+            finally:
+                self._dj_connection = previous
+
+        return call
+
     def __enter__(self) -> None:
         """Open a new connection on entering the context."""
         self.open()
@@ -58,6 +95,191 @@ class Connection(AbstractConnection):
         return f"{self.__class__.__name__}(factory={repr(self._factory)})"
 
 
+@dataclasses.dataclass
+class PoolStats:
+    """Statistics about the connections handed out by a connection pool."""
+
+    checkouts: int = 0
+    handshakes: int = 0
+    discarded: int = 0
+
+    @property
+    def saved_handshakes(self) -> int:
+        """Return the number of checkouts that reused an open connection instead of opening a new one."""
+        return self.checkouts - self.handshakes
+
+
+class ConnectionPool:
+    """A thread-safe pool of DataJoint connections that are reused instead of being opened for every checkout.
+
+    At most max_size connections are checked out at a time; further checkouts block until a connection is returned.
+    Returned connections that stay idle for longer than idle_timeout seconds are closed unless that would leave fewer
+    than min_size idle connections. The first checkout opens min_size connections up front, so that later checkouts do
+    not pay for the handshake. Idle connections are checked for liveness on checkout and replaced if they are dead.
+    """
+
+    def __init__(
+        self,
+        factory: types.ConnectionFactory,
+        *,
+        min_size: int = 0,
+        max_size: int = 4,
+        idle_timeout: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the connection pool."""
+        if max_size < 1:
+            raise ValueError("max_size must be at least one!")
+        if not 0 <= min_size <= max_size:
+            raise ValueError("min_size must be between zero and max_size!")
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self.stats = PoolStats()
+        self._idle: List[Tuple[types.Connection, float]] = []
+        self._checked_out = 0
+        self._filled = False
+        self._condition = threading.Condition()
+
+    def acquire(self) -> types.Connection:
+        """Check out a live connection, opening a new one if no idle connection is available."""
+        self._fill()
+        with self._condition:
+            while self._checked_out >= self.max_size:
+                self._condition.wait()
+            self._checked_out += 1
+            self.stats.checkouts += 1
+            expired = self._evict_expired()
+            idle = self._idle.pop()[0] if self._idle else None
+        for dj_connection in expired:
+            self._discard(dj_connection)
+        if idle is not None and idle.is_connected:
+            return idle
+        try:
+            if idle is not None:
+                self._discard(idle)
+            dj_connection = self.factory()
+        except BaseException:
+            self._checked_in()
+            raise
+        with self._condition:
+            self.stats.handshakes += 1
+        return dj_connection
+
+    def release(self, dj_connection: types.Connection) -> None:
+        """Return a checked out connection to the pool, cancelling its transaction if one is still in progress."""
+        try:
+            if dj_connection.in_transaction:
+                dj_connection.cancel_transaction()
+        except Exception:  # pylint: disable=broad-except
+            self._discard(dj_connection)
+        else:
+            with self._condition:
+                self._idle.append((dj_connection, self.clock()))
+                expired = self._evict_expired()
+            for expired_connection in expired:
+                self._discard(expired_connection)
+        finally:
+            self._checked_in()
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._condition:
+            idle, self._idle = self._idle, []
+        for dj_connection, _ in idle:
+            self._discard(dj_connection)
+
+    def _checked_in(self) -> None:
+        with self._condition:
+            self._checked_out -= 1
+            self._condition.notify()
+
+    def _fill(self) -> None:
+        """Open min_size idle connections unless they were opened before."""
+        with self._condition:
+            if self._filled:
+                return
+            self._filled = True
+        opened = []
+        try:
+            for _ in range(self.min_size):
+                opened.append(self.factory())
+        except BaseException:
+            with self._condition:
+                self._filled = False
+            for dj_connection in opened:
+                self._discard(dj_connection)
+            raise
+        with self._condition:
+            self.stats.handshakes += len(opened)
+            self._idle.extend((c, self.clock()) for c in opened)
+
+    def _evict_expired(self) -> List[types.Connection]:
+        """Remove the idle connections that expired and return them so that they can be closed outside the lock."""
+        now = self.clock()
+        expired = []
+        while len(self._idle) > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+            expired.append(self._idle.pop(0)[0])
+        return expired
+
+    def _discard(self, dj_connection: types.Connection) -> None:
+        with self._condition:
+            self.stats.discarded += 1
+        try:
+            dj_connection.close()
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    def __repr__(self) -> str:
+        """Return a string representation of the connection pool."""
+        return (
+            f"{self.__class__.__name__}(factory={repr(self.factory)}, min_size={self.min_size}, "
+            f"max_size={self.max_size}, idle_timeout={self.idle_timeout})"
+        )
+
+
+class PooledConnection(Connection):
+    """Connection facade that checks connections out of a pool on opening and returns them on closing."""
+
+    def __init__(self, pool: ConnectionPool) -> None:
+        """Initialize the pooled connection."""
+        super().__init__(pool.factory)
+        self.pool = pool
+
+    def open(self) -> None:
+        """Check out a connection from the pool."""
+        self._dj_connection = self.pool.acquire()
+
+    def close(self) -> None:
+        """Return the connection to the pool."""
+        self.pool.release(self.dj_connection)
+        self._dj_connection = None
+
+    def __repr__(self) -> str:
+        """Return a string representation of the pooled connection facade."""
+        return f"{self.__class__.__name__}(pool={repr(self.pool)})"
+
+
+class JoinedConnection(Connection):
+    """Connection facade that uses a connection owned by someone else and joins its active transaction.
+
+    Opening the facade obtains the connection from the factory, e.g. the connection of the populated table, and closing
+    it leaves the connection open. If a transaction is already in progress on the connection when the facade's
+    transaction is started, committing and rolling back are left to the owner of that transaction.
+    """
+
+    def __init__(self, factory: types.ConnectionFactory) -> None:
+        """Initialize the joined connection."""
+        super().__init__(factory)
+        self._transaction = _JoinedTransaction(self)
+
+    def close(self) -> None:
+        """Release the connection without closing it."""
+        self._dj_connection = None
+
+
 class _Transaction(AbstractTransaction):
     """Represents a facade around the transaction specific parts of DataJoint's connection object."""
 
@@ -78,6 +300,39 @@ class _Transaction(AbstractTransaction):
         self._connection.dj_connection.cancel_transaction()
 
 
+class _JoinedTransaction(_Transaction):
+    """Represents a transaction that joins a transaction already in progress if there is one."""
+
+    def __init__(self, connection: Connection) -> None:
+        """Initialize the transaction."""
+        super().__init__(connection)
+        self._local = threading.local()
+
+    @property
+    def _joined(self) -> bool:
+        return cast(bool, getattr(self._local, "joined", False))
+
+    @_joined.setter
+    def _joined(self, joined: bool) -> None:
+        self._local.joined = joined
+
+    def start(self) -> None:
+        """Join the transaction in progress or start a new one."""
+        self._joined = self._connection.dj_connection.in_transaction
+        if not self._joined:
+            super().start()
+
+    def commit(self) -> None:
+        """Commit the transaction unless it was joined."""
+        if not self._joined:
+            super().commit()
+
+    def rollback(self) -> None:
+        """Rollback the transaction unless it was joined."""
+        if not self._joined:
+            super().rollback()
+
+
 class ConnectionOptionsDict(TypedDict):
     """A dictionary containing optional arguments for DataJoint's connection object."""
 
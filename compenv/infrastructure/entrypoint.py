@@ -1,29 +1,55 @@
 """Contains entrypoints to the application."""
 from __future__ import annotations
 
+import copy
+import functools
 import inspect
 from collections.abc import Generator
 from contextlib import contextmanager
-from typing import Callable, Mapping, Optional, Type, TypeVar
+from typing import Any, Callable, Mapping, Optional, Type, TypeVar
 
-from ..adapters.controller import DJController
-from ..backend import create_dj_backend
+from ..adapters.presenter import EnvironmentMatrix
+from ..backend import DJBackend, LazyBackend, create_dj_backend
 from ..types import PrimaryKey
 from . import types
-from .connection import Connection
 from .hook import hook_into_make_method
 
 
 class Entrypoint:  # pylint: disable=too-few-public-methods
     """Entrypoint to most services."""
 
-    def __init__(self, controller: DJController):
+    def __init__(self, backend: Callable[[], DJBackend]):
         """Initialize the entrypoint."""
-        self.controller = controller
+        self.backend = backend
 
     def diff(self, key1: PrimaryKey, key2: PrimaryKey) -> None:
         """Show a diff between two records."""
-        self.controller.diff(key1, key2)
+        self.backend().adapters.controller.diff(key1, key2)
+
+    def where(self, *requirements: str) -> list[PrimaryKey]:
+        """Return the primary keys of all records with a distribution satisfying any of the requirements.
+
+        Requirements consist of a distribution name optionally followed by a comparison operator and a version, e.g.
+        "numpy<1.24" or "torch==2.1.0".
+        """
+        adapters = self.backend().adapters
+        adapters.controller.where(*requirements)
+        return adapters.collector.primaries
+
+    def diff_matrix(self, restriction: Optional[types.Restriction] = None) -> EnvironmentMatrix:
+        """Group the records by their environment and return the differences between the distinct environments.
+
+        Only the records matching the restriction, e.g. a list of primary keys, are grouped if one is given. Records
+        with identical distributions are grouped together and only one record of every group is compared with the
+        others.
+        """
+        backend = self.backend()
+        keys = None
+        if restriction is not None:
+            with backend.infra.connection:
+                keys = list(backend.infra.table.iter_primaries(restriction=restriction))
+        backend.adapters.controller.diff_matrix(keys)
+        return backend.adapters.collector.matrix
 
 
 _T = TypeVar("_T", bound=types.AutopopulatedTable)
@@ -46,14 +72,14 @@ def determine_context(context: Mapping[str, object], current_frame: Optional[typ
 
 @contextmanager
 def replaced_connection_table(table: _T, replacement_connection: types.Connection) -> Generator[_T, None, None]:
-    """Replace the connection of the given table with the given connection within the context."""
-    table_cls = table.__class__
-    original_connection = table_cls.connection
-    table_cls.connection = replacement_connection
-    try:
-        yield table_cls()
-    finally:
-        table_cls.connection = original_connection
+    """Provide a copy of the given table that uses the given connection within the context.
+
+    The connection is only overridden on the copy so that neither the table nor other instances of its class, e.g. ones
+    used by other threads, are affected.
+    """
+    replaced = copy.copy(table)
+    replaced.connection = replacement_connection
+    yield replaced
 
 
 class EnvironmentRecorder:  # pylint: disable=too-few-public-methods
@@ -63,28 +89,88 @@ class EnvironmentRecorder:  # pylint: disable=too-few-public-methods
         """Initialize the environment recorder."""
         self.get_current_frame = get_current_frame
 
-    def __call__(self, schema: types.Schema) -> Callable[[Type[_T]], Type[_T]]:
-        """Record the environment during executions of the table's make method."""
+    def __call__(
+        self,
+        schema: types.Schema,
+        *,
+        layout: str = "parts",
+        buffer_records: int = 0,
+        buffer_seconds: float = 10.0,
+        write_behind: int = 0,
+        fast_insert: bool = False,
+        pool_size: int = 0,
+        join_transaction: bool = False,
+        translation_cache_size: int = 100_000,
+    ) -> Callable[[Type[_T]], Type[_T]]:
+        """Record the environment during executions of the table's make method.
+
+        The layout determines how the records are stored (see create_dj_infrastructure). If buffer_records is positive
+        records are written in batches of up to that many records or at least every buffer_seconds seconds (see
+        BufferedDJRepository for the durability implications). If write_behind is positive records are written by a
+        background thread and at most that many records wait to be written (see WriteBehindDJRepository). If
+        fast_insert is True records are inserted with raw SQL statements bypassing DataJoint's per-row validation. If
+        pool_size is positive connections are reused across make calls (see ConnectionPool). If join_transaction is True
+        records are written on the table's own connection within the transaction populate runs make in, so that a
+        record is committed atomically with the computed rows (see JoinedConnection). At most translation_cache_size
+        primary keys are cached for translating identifiers back into primary keys (see DJTranslator).
+
+        The backend is created and the record tables are declared when the table is populated, its make method is
+        called or its records are accessed for the first time, not when the table is decorated.
+        """
 
         def _record_environment(table_cls: Type[_T]) -> Type[_T]:
             schema.context = determine_context(schema.context, self.get_current_frame())
             table_cls = schema(table_cls)
-            backend = create_dj_backend(schema, table_cls.__name__)
-            with backend.infra.connection:
-                backend.infra.factory()
-            self._modify_table(table_cls, backend.adapters.controller, backend.infra.connection)
+            shared_connection = self._shared_connection(table_cls) if join_transaction else None
+
+            def create_backend() -> DJBackend:
+                backend = create_dj_backend(
+                    schema,
+                    table_cls.__name__,
+                    layout=layout,
+                    buffer_records=buffer_records,
+                    buffer_seconds=buffer_seconds,
+                    write_behind=write_behind,
+                    fast_insert=fast_insert,
+                    pool_size=pool_size,
+                    shared_connection=shared_connection,
+                    translation_cache_size=translation_cache_size,
+                )
+                with backend.infra.connection:
+                    backend.infra.factory()
+                return backend
+
+            self._modify_table(table_cls, LazyBackend(create_backend))
             return table_cls
 
         return _record_environment
 
     @staticmethod
-    def _modify_table(table_cls: Type[_T], controller: DJController, connection: Connection) -> None:
+    def _shared_connection(table_cls: Type[_T]) -> types.ConnectionFactory:
+        def get_connection() -> types.Connection:
+            return table_cls.connection
+
+        return get_connection
+
+    @staticmethod
+    def _modify_table(table_cls: Type[_T], backend: LazyBackend) -> None:
         def hook(make: Callable[[_T, types.Entity], None], table: _T, key: types.Entity) -> None:
+            connection = backend().infra.connection
+
             def replaced_connection_make(key: types.Entity) -> None:
-                with replaced_connection_table(table, connection.dj_connection):
-                    return make(table, key)
+                with replaced_connection_table(table, connection.dj_connection) as replaced:
+                    return make(replaced, key)
+
+            backend().adapters.controller.record(key, replaced_connection_make)
+
+        original_populate = getattr(table_cls, "populate")
 
-            controller.record(key, replaced_connection_make)
+        @functools.wraps(original_populate)
+        def populate(self: _T, *args: Any, **kwargs: Any) -> Any:
+            # Tables can not be declared within the transaction populate runs make in.
+            backend()
+            return original_populate(self, *args, **kwargs)
 
         table_cls = hook_into_make_method(hook)(table_cls)
-        setattr(table_cls, "records", Entrypoint(controller))
+        setattr(table_cls, "populate", populate)
+        setattr(table_cls, "records", Entrypoint(backend))
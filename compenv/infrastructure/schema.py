@@ -1,6 +1,7 @@
 """Contains code related to DataJoint's schema object."""
 from datajoint.schemas import Schema
 
+from . import types
 from .connection import Connection
 
 
@@ -12,6 +13,11 @@ class SchemaFactory:
         self._name = name
         self._connection = connection
 
+    @property
+    def connection(self) -> types.Connection:
+        """Return the DataJoint connection used by the produced schemas."""
+        return self._connection.dj_connection
+
     def __call__(self) -> Schema:
         """Produce a new schema."""
         return Schema(self._name, connection=self._connection.dj_connection)
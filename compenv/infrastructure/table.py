@@ -2,37 +2,159 @@
 from __future__ import annotations
 
 import dataclasses
-import functools
-from collections.abc import Callable, Iterator
-from typing import Dict, Type, TypeVar
+import datetime
+import hashlib
+import itertools
+import json
+import threading
+import uuid
+import zlib
+from collections.abc import Callable, Container, Iterable, Iterator
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple, Type, TypeVar, cast
 
-from datajoint import Lookup, Part
+import numpy
+from datajoint import Lookup, Part, blob
 from datajoint.errors import DuplicateError
+from pymysql.converters import escape_item
 
-from ..adapters.abstract import AbstractTable, PartEntity
-from ..adapters.entity import DJComputationRecord
+from ..adapters.abstract import AbstractTable, PartEntity, matches
+from ..adapters.entity import DJComputationRecord, DJDistribution, DJDistributionBlob, DJInternedDistribution
+from ..model.record import Identifier
 from ..types import PrimaryKey
-from .types import Factory, SchemaFactory
+from . import types
+from .types import Entity, Factory, InternedFactory, SchemaFactory, SnapshotFactory
 
 _T = TypeVar("_T")
 
+_Key = Tuple[Any, ...]
 
-def _check_primary(func: Callable[[Table, PrimaryKey], _T]) -> Callable[[Table, PrimaryKey], _T]:
-    @functools.wraps(func)
-    def wrapper(self: Table, primary: PrimaryKey) -> _T:
-        if primary not in self.factory():
-            raise KeyError(f"Computation record with primary key '{primary}' does not exist!")
-        return func(self, primary)
 
-    return wrapper
+def _chunked(items: Iterable[_T], size: int) -> Iterator[List[_T]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _key(entity: Entity, names: Sequence[str]) -> _Key:
+    return tuple(entity[n] for n in names)
+
+
+def _group(rows: Iterable[Entity], names: Sequence[str]) -> Dict[_Key, List[Entity]]:
+    grouped: Dict[_Key, List[Entity]] = {}
+    for row in rows:
+        grouped.setdefault(_key(row, names), []).append(row)
+    return grouped
+
+
+def _raise_for_missing(primaries: Iterable[PrimaryKey], found: Container[_Key], names: Sequence[str]) -> None:
+    missing = [p for p in primaries if _key(p, names) not in found]
+    if missing:
+        raise KeyError(f"Computation records with primary keys {missing} do not exist!")
+
+
+def _to_sql_value(attribute: types.Attribute, value: Any) -> Any:
+    """Convert the value of the attribute into a query argument the way DataJoint's insert does."""
+    if attribute.uuid:
+        return (value if isinstance(value, uuid.UUID) else uuid.UUID(value)).bytes
+    if attribute.is_blob:
+        return blob.pack(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, numpy.generic):
+        return value.item()
+    return value
+
+
+def _after(heading: types.Heading, names: Sequence[str], entity: Entity) -> str:
+    """Return a SQL condition matching all rows whose values of the named attributes come after the entity's values.
+
+    The values are converted like query arguments, i.e. as by insert_rows, and escaped by the MySQL client library.
+    """
+    columns = ",".join(f"`{n}`" for n in names)
+    values = ",".join(escape_item(_to_sql_value(heading[n], entity[n]), "utf8") for n in names)
+    return f"({columns}) > ({values})"
+
+
+def _iter_pages(restrict: Callable[[], types.Table], page_size: int) -> Iterator[Entity]:
+    """Iterate over the rows of the restricted table in primary key order fetching page_size rows at a time.
+
+    Pages are fetched with keyset pagination, i.e. each page is restricted to the rows following the last row of the
+    previous page. Only a single page is held in memory at a time.
+    """
+    last: Optional[Entity] = None
+    while True:
+        table = restrict()
+        names = table.primary_key
+        if last is not None:
+            table = table & _after(table.heading, names, last)
+        page = table.fetch(as_dict=True, order_by=names, limit=page_size)
+        yield from page
+        if len(page) < page_size:
+            return
+        last = page[-1]
+
+
+def _distinct_primaries(rows: Iterable[Entity], names: Sequence[str]) -> Iterator[PrimaryKey]:
+    """Yield the primary keys of the rows skipping rows with the same primary key as the preceding row."""
+    last: Optional[_Key] = None
+    for row in rows:
+        key = _key(row, names)
+        if key != last:
+            yield {n: row[n] for n in names}
+            last = key
+
+
+def insert_rows(table: types.Table, rows: Sequence[Entity], skip_duplicates: bool = False) -> None:
+    """Insert the rows with a single parameterized multi-row INSERT statement on the table's connection.
+
+    Unlike DataJoint's insert the rows are not validated. All rows must have the same attributes as the first one.
+    Values are converted as by DataJoint's insert based on the table's heading: UUIDs are stored as bytes, blobs are
+    packed with DataJoint's blob serialization, dates and times are passed as ISO strings and missing values (None)
+    are replaced by the attribute's default.
+
+    Raises:
+        DuplicateError: One of the rows already exists and skip_duplicates is False.
+    """
+    if not rows:
+        return
+    names = list(rows[0])
+    heading = table.heading
+    attributes = [heading[n] for n in names]
+    placeholders: List[str] = []
+    args: List[Any] = []
+    for row in rows:
+        values = [row[n] for n in names]
+        placeholders.append("(" + ",".join("DEFAULT" if v is None else "%s" for v in values) + ")")
+        args.extend(_to_sql_value(a, v) for a, v in zip(attributes, values) if v is not None)
+    query = "INSERT INTO {table}({columns}) VALUES {rows}{duplicate}".format(
+        table=table.full_table_name,
+        columns=",".join(f"`{n}`" for n in names),
+        rows=",".join(placeholders),
+        duplicate=f" ON DUPLICATE KEY UPDATE `{names[0]}`=`{names[0]}`" if skip_duplicates else "",
+    )
+    table.connection.query(query, args=args)
+
+
+def _from_part_rows(primary: PrimaryKey, rows: Mapping[Type[PartEntity], Iterable[Entity]]) -> DJComputationRecord:
+    entities: Dict[str, Any] = {
+        part.master_attr: frozenset(part.from_mapping(r) for r in part_rows) for part, part_rows in rows.items()
+    }
+    return DJComputationRecord(primary=primary, **entities)
 
 
 class Table(AbstractTable[DJComputationRecord]):
     """Facade around a DataJoint table that stores computation records."""
 
-    def __init__(self, factory: Factory) -> None:
-        """Initialize the record table facade."""
+    def __init__(self, factory: Factory, *, fast_insert: bool = False) -> None:
+        """Initialize the record table facade.
+
+        If fast_insert is True rows are inserted with insert_rows instead of DataJoint's insert.
+        """
         self.factory = factory
+        self.fast_insert = fast_insert
 
     def add(self, master_entity: DJComputationRecord) -> None:
         """Insert the record into the record table and its parts.
@@ -40,35 +162,160 @@ class Table(AbstractTable[DJComputationRecord]):
         Raises:
             ValueError: Record already exists.
         """
-        try:
-            self.factory().insert1(master_entity.primary)
-        except DuplicateError as error:
-            raise ValueError(
-                f"Computation record with primary key '{master_entity.primary}' already exists!"
-            ) from error
+        self.add_many([master_entity])
+
+    def add_many(self, master_entities: Sequence[DJComputationRecord]) -> None:
+        """Insert the records into the record table and their parts using one insert per table.
+
+        Raises:
+            ValueError: One of the records already exists.
+        """
+        self._insert_masters([e.primary for e in master_entities], master_entities)
         for part in DJComputationRecord.parts:
-            getattr(self.factory(), part.__name__)().insert(
-                [{**master_entity.primary, **dataclasses.asdict(e)} for e in getattr(master_entity, part.master_attr)]
+            self._insert(
+                getattr(self.factory(), part.__name__)(),
+                [
+                    {**master_entity.primary, **dataclasses.asdict(e)}
+                    for master_entity in master_entities
+                    for e in getattr(master_entity, part.master_attr)
+                ],
             )
 
-    @_check_primary
+    def _insert(self, table: types.Table, rows: Sequence[Entity], skip_duplicates: bool = False) -> None:
+        if self.fast_insert:
+            insert_rows(table, rows, skip_duplicates=skip_duplicates)
+        else:
+            table.insert(rows, skip_duplicates=skip_duplicates)
+
+    def _insert_masters(self, rows: Sequence[Entity], master_entities: Sequence[DJComputationRecord]) -> None:
+        if self._stores_identifiers():
+            attr = DJComputationRecord.identifier_attr
+            rows = [{**r, attr: e.identifier} if e.identifier else r for r, e in zip(rows, master_entities)]
+        try:
+            self._insert(self.factory(), rows)
+        except DuplicateError as error:
+            if len(master_entities) == 1:
+                message = f"Computation record with primary key '{master_entities[0].primary}' already exists!"
+            else:
+                primaries = [e.primary for e in master_entities]
+                message = f"One of the computation records with primary keys {primaries} already exists!"
+            raise ValueError(message) from error
+
     def get(self, primary: PrimaryKey) -> DJComputationRecord:
-        """Fetch the record matching the given primary key from the record table and its parts.
+        """Fetch the record matching the given primary key from its parts.
+
+        The record table itself is only queried to check whether the record exists if no part rows were found.
 
         Raises:
             KeyError: No record matching the given primary key exists.
         """
-        entities = {}
-        for part in DJComputationRecord.parts:
-            part_entities = (getattr(self.factory(), part.__name__)() & primary).fetch(as_dict=True)
-            part_entities = [dict(e.items() - primary.items()) for e in part_entities]
-            part_entities = [part.from_mapping(e) for e in part_entities]
-            entities[part.master_attr] = frozenset(part_entities)
-        return DJComputationRecord(primary=primary, **entities)
+        return self._check_found(self._fetch_parts(primary))
+
+    def _fetch_parts(self, primary: PrimaryKey) -> DJComputationRecord:
+        rows = {
+            p: (getattr(self.factory(), p.__name__)() & primary).fetch(as_dict=True) for p in DJComputationRecord.parts
+        }
+        return _from_part_rows(primary, rows)
+
+    def _check_found(self, master_entity: DJComputationRecord) -> DJComputationRecord:
+        if not self._has_parts(master_entity) and master_entity.primary not in self.factory():
+            raise KeyError(f"Computation record with primary key '{master_entity.primary}' does not exist!")
+        return master_entity
+
+    @staticmethod
+    def _has_parts(master_entity: DJComputationRecord) -> bool:
+        return any(getattr(master_entity, p.master_attr) for p in DJComputationRecord.parts)
+
+    def get_many(self, primaries: Iterable[PrimaryKey], chunk_size: int = 1000) -> Iterator[DJComputationRecord]:
+        """Fetch the records matching the given primary keys in chunks of chunk_size records.
+
+        Each chunk is fetched with one query per part. The record table is only queried for records without part rows.
+
+        Raises:
+            KeyError: No record matching one of the given primary keys exists.
+        """
+        for chunk in _chunked(primaries, chunk_size):
+            yield from self._get_chunk(chunk)
+
+    def _get_chunk(self, primaries: List[PrimaryKey]) -> List[DJComputationRecord]:
+        names = sorted(primaries[0])
+        grouped = {
+            p: _group((getattr(self.factory(), p.__name__)() & primaries).fetch(as_dict=True), names)
+            for p in DJComputationRecord.parts
+        }
+        master_entities = [
+            _from_part_rows(primary, {p: grouped[p].get(_key(primary, names), []) for p in grouped})
+            for primary in primaries
+        ]
+        self._check_found_many(master_entities, names)
+        return master_entities
+
+    def _check_found_many(self, master_entities: Iterable[DJComputationRecord], names: Sequence[str]) -> None:
+        without_parts = [e.primary for e in master_entities if not self._has_parts(e)]
+        if without_parts:
+            found = {_key(r, names) for r in (self.factory() & without_parts).proj().fetch(as_dict=True)}
+            _raise_for_missing(without_parts, found, names)
 
     def __iter__(self) -> Iterator[PrimaryKey]:
-        """Iterate over the primary keys of all the records in the table."""
-        return iter(self.factory())
+        """Iterate over the primary keys of all the records in the table in pages."""
+        return self.iter_primaries()
+
+    def iter_primaries(
+        self, page_size: int = 10000, restriction: Optional[types.Restriction] = None
+    ) -> Iterator[PrimaryKey]:
+        """Iterate over the primary keys of all the records in primary key order fetching page_size keys at a time.
+
+        Pages are fetched with keyset pagination, i.e. each page is restricted to the keys following the last key of the
+        previous page. Only a single page is held in memory at a time. If a restriction is given only the keys of the
+        records matching it are iterated over.
+        """
+        if restriction is None:
+            return _iter_pages(lambda: self.factory().proj(), page_size)
+        return _iter_pages(lambda: (self.factory() & restriction).proj(), page_size)
+
+    def find(
+        self,
+        restrictions: Sequence[Mapping[str, Any]],
+        predicate: Callable[[DJDistribution], bool],
+        page_size: int = 10000,
+    ) -> Iterator[PrimaryKey]:
+        """Iterate over the primary keys of all records having a distribution that satisfies the predicate.
+
+        The distribution part is restricted in the database and its matching rows are streamed in pages of page_size
+        rows. Only the rows matching one of the restrictions are passed to the predicate.
+        """
+        if not restrictions:
+            return iter([])
+        part = getattr(self.factory(), DJDistribution.__name__)
+        rows = _iter_pages(lambda: part() & restrictions, page_size)
+        matching = (r for r in rows if predicate(DJDistribution.from_mapping(r)))
+        return _distinct_primaries(matching, self._master_primary_key())
+
+    def get_primaries(self, identifiers: Iterable[Identifier], chunk_size: int = 1000) -> Dict[Identifier, PrimaryKey]:
+        """Look up the primary keys of the records with the given identifiers using one query per chunk.
+
+        Identifiers of records that do not exist or that were added without their identifier are missing from the
+        returned mapping. The mapping is empty if the record table was declared without an identifier column.
+        """
+        if not self._stores_identifiers():
+            return {}
+        attr = DJComputationRecord.identifier_attr
+        names = self._master_primary_key()
+        primaries: Dict[Identifier, PrimaryKey] = {}
+        for chunk in _chunked(identifiers, chunk_size):
+            for row in (self.factory() & [{attr: i} for i in chunk]).proj(attr).fetch(as_dict=True):
+                primaries[Identifier(str(row[attr]))] = {n: row[n] for n in names}
+        return primaries
+
+    def _stores_identifiers(self) -> bool:
+        return DJComputationRecord.identifier_attr in self.factory().heading.names
+
+    def _master_primary_key(self) -> List[str]:
+        return list(self.factory().primary_key)
+
+    def __contains__(self, primary: object) -> bool:
+        """Return True if a record matching the given primary key exists in the record table, False otherwise."""
+        return primary in self.factory()
 
     def __len__(self) -> int:
         """Return the number of records in the table."""
@@ -76,34 +323,478 @@ class Table(AbstractTable[DJComputationRecord]):
 
     def __repr__(self) -> str:
         """Return a string representation of the record table facade."""
-        return f"{self.__class__.__name__}(factory={repr(self.factory)})"
+        return f"{self.__class__.__name__}(factory={repr(self.factory)}, fast_insert={self.fast_insert})"
+
+
+def snapshot_hash(master_entity: DJComputationRecord) -> str:
+    """Return a hash of the content of the given record's parts that does not depend on its primary key."""
+    content = [
+        [part.__name__, sorted(dataclasses.astuple(e) for e in getattr(master_entity, part.master_attr))]
+        for part in DJComputationRecord.parts
+    ]
+    return hashlib.blake2b(json.dumps(content).encode(), digest_size=16).hexdigest()
+
+
+class SnapshotTable(Table):
+    """Facade around DataJoint tables that store each distinct set of part entities only once.
+
+    The part entities of a record are stored in a snapshot table keyed by a hash of their content. The record table
+    itself only references that hash. Adding a record whose snapshot was already seen inserts a single row.
+    """
+
+    def __init__(self, factory: SnapshotFactory, *, fast_insert: bool = False) -> None:
+        """Initialize the snapshot table facade."""
+        super().__init__(factory, fast_insert=fast_insert)
+        self.factory: SnapshotFactory = factory
+        self._known_hashes: Set[str] = set()
+
+    def add_many(self, master_entities: Sequence[DJComputationRecord]) -> None:
+        """Insert the records into the record table and their snapshots into the snapshot table if they are new.
+
+        Raises:
+            ValueError: One of the records already exists.
+        """
+        content_hashes = [snapshot_hash(e) for e in master_entities]
+        for content_hash, master_entity in dict(zip(content_hashes, master_entities)).items():
+            self._add_snapshot(content_hash, master_entity)
+        self._insert_masters(
+            [{**e.primary, "snapshot_hash": h} for e, h in zip(master_entities, content_hashes)], master_entities
+        )
+
+    def _add_snapshot(self, content_hash: str, master_entity: DJComputationRecord) -> None:
+        if content_hash in self._known_hashes:
+            return
+        snapshot_primary = {"snapshot_hash": content_hash}
+        snapshots = self.factory.snapshots()
+        if snapshot_primary in snapshots:
+            self._known_hashes.add(content_hash)
+            return
+        self._insert(snapshots, [snapshot_primary], skip_duplicates=True)
+        for part in DJComputationRecord.parts:
+            self._insert(
+                getattr(snapshots, part.__name__)(),
+                [{**snapshot_primary, **dataclasses.asdict(e)} for e in getattr(master_entity, part.master_attr)],
+                skip_duplicates=True,
+            )
+
+    def get(self, primary: PrimaryKey) -> DJComputationRecord:
+        """Fetch the record matching the given primary key joined with the parts of its snapshot.
+
+        Raises:
+            KeyError: No record matching the given primary key exists.
+        """
+        snapshots = self.factory.snapshots()
+        rows = {
+            p: ((self.factory() & primary) * getattr(snapshots, p.__name__)()).fetch(as_dict=True)
+            for p in DJComputationRecord.parts
+        }
+        return self._check_found(_from_part_rows(primary, rows))
+
+    def _get_chunk(self, primaries: List[PrimaryKey]) -> List[DJComputationRecord]:
+        names = sorted(primaries[0])
+        content_hashes = {_key(r, names): r["snapshot_hash"] for r in (self.factory() & primaries).fetch(as_dict=True)}
+        _raise_for_missing(primaries, content_hashes, names)
+        snapshot_primaries = [{"snapshot_hash": h} for h in set(content_hashes.values())]
+        snapshots = self.factory.snapshots()
+        grouped = {
+            p: _group((getattr(snapshots, p.__name__)() & snapshot_primaries).fetch(as_dict=True), ["snapshot_hash"])
+            for p in DJComputationRecord.parts
+        }
+        return [
+            _from_part_rows(primary, {p: grouped[p].get((content_hashes[_key(primary, names)],), []) for p in grouped})
+            for primary in primaries
+        ]
+
+    def find(
+        self,
+        restrictions: Sequence[Mapping[str, Any]],
+        predicate: Callable[[DJDistribution], bool],
+        page_size: int = 10000,
+    ) -> Iterator[PrimaryKey]:
+        """Iterate over the primary keys of all records whose snapshot has a distribution that satisfies the predicate.
+
+        The matching snapshots are looked up first. The records referencing them are streamed in pages of page_size
+        records.
+        """
+        if not restrictions:
+            return iter([])
+        part = getattr(self.factory.snapshots(), DJDistribution.__name__)()
+        snapshot_primaries = [
+            {"snapshot_hash": h}
+            for h in {
+                r["snapshot_hash"]
+                for r in (part & restrictions).fetch(as_dict=True)
+                if predicate(DJDistribution.from_mapping(r))
+            }
+        ]
+        if not snapshot_primaries:
+            return iter([])
+        return _iter_pages(lambda: (self.factory() & snapshot_primaries).proj(), page_size)
+
+
+def distribution_id(distribution: DJDistribution) -> int:
+    """Return a 64-bit integer ID that is derived from the distribution's name and version."""
+    content = distribution.distribution_name + "\0" + distribution.distribution_version
+    return int.from_bytes(hashlib.blake2b(content.encode(), digest_size=8).digest(), "big", signed=True)
+
+
+class InternedTable(Table):
+    """Facade around DataJoint tables that store the distributions of records as references to a lookup table.
+
+    Each distinct name and version pair is stored once in the lookup table under an integer ID derived from its
+    content. The facade caches the pairs it has seen in the lookup table so that adding and getting records usually
+    does not query the lookup table.
+    """
+
+    def __init__(self, factory: InternedFactory, *, fast_insert: bool = False) -> None:
+        """Initialize the interned table facade."""
+        super().__init__(factory, fast_insert=fast_insert)
+        self.factory: InternedFactory = factory
+        self._interned: Dict[int, DJDistribution] = {}
+
+    def add_many(self, master_entities: Sequence[DJComputationRecord]) -> None:
+        """Insert the records into the record table and their unknown distributions into the lookup table.
+
+        Raises:
+            ValueError: One of the records already exists.
+        """
+        distribution_ids = [{distribution_id(d): d for d in e.distributions} for e in master_entities]
+        self._add_distributions({i: d for ids in distribution_ids for i, d in ids.items()})
+        self._insert_masters([e.primary for e in master_entities], master_entities)
+        self._insert(
+            getattr(self.factory(), DJDistribution.__name__)(),
+            [{**e.primary, "distribution_id": i} for e, ids in zip(master_entities, distribution_ids) for i in ids],
+        )
+
+    def _add_distributions(self, distributions: Mapping[int, DJDistribution]) -> None:
+        self._fetch_distributions(distributions)
+        missing = [i for i in distributions if i not in self._interned]
+        if missing:
+            self._insert(
+                self.factory.distribution_ids(),
+                [{"distribution_id": i, **dataclasses.asdict(distributions[i])} for i in missing],
+                skip_duplicates=True,
+            )
+
+    def _fetch_distributions(self, distribution_ids: Iterable[int]) -> None:
+        unknown = [{"distribution_id": i} for i in distribution_ids if i not in self._interned]
+        if not unknown:
+            return
+        for row in (self.factory.distribution_ids() & unknown).fetch(as_dict=True):
+            self._interned[int(row["distribution_id"])] = DJDistribution.from_mapping(row)
+
+    def get(self, primary: PrimaryKey) -> DJComputationRecord:
+        """Fetch the record matching the given primary key and resolve its distributions via the lookup table.
+
+        Raises:
+            KeyError: No record matching the given primary key exists.
+        """
+        rows = (getattr(self.factory(), DJDistribution.__name__)() & primary).fetch(as_dict=True)
+        distribution_ids = [int(r["distribution_id"]) for r in rows]
+        self._fetch_distributions(distribution_ids)
+        return self._check_found(
+            DJComputationRecord(primary=primary, distributions=frozenset(self._interned[i] for i in distribution_ids))
+        )
+
+    def _get_chunk(self, primaries: List[PrimaryKey]) -> List[DJComputationRecord]:
+        names = sorted(primaries[0])
+        rows = (getattr(self.factory(), DJDistribution.__name__)() & primaries).fetch(as_dict=True)
+        grouped = _group(rows, names)
+        self._fetch_distributions({int(r["distribution_id"]) for r in rows})
+        master_entities = [
+            DJComputationRecord(
+                primary=primary,
+                distributions=frozenset(
+                    self._interned[int(r["distribution_id"])] for r in grouped.get(_key(primary, names), [])
+                ),
+            )
+            for primary in primaries
+        ]
+        self._check_found_many(master_entities, names)
+        return master_entities
+
+    def find(
+        self,
+        restrictions: Sequence[Mapping[str, Any]],
+        predicate: Callable[[DJDistribution], bool],
+        page_size: int = 10000,
+    ) -> Iterator[PrimaryKey]:
+        """Iterate over the primary keys of all records having a distribution that satisfies the predicate.
+
+        The matching distributions are looked up in the lookup table first. The part rows referencing them are streamed
+        in pages of page_size rows.
+        """
+        if not restrictions:
+            return iter([])
+        matching = []
+        for row in (self.factory.distribution_ids() & restrictions).fetch(as_dict=True):
+            distribution = DJDistribution.from_mapping(row)
+            self._interned[int(row["distribution_id"])] = distribution
+            if predicate(distribution):
+                matching.append({"distribution_id": row["distribution_id"]})
+        if not matching:
+            return iter([])
+        part = getattr(self.factory(), DJDistribution.__name__)
+        return _distinct_primaries(_iter_pages(lambda: part() & matching, page_size), self._master_primary_key())
+
+
+def _same_server(connection: Optional[types.Connection], other: types.Connection) -> bool:
+    if connection is None:
+        return False
+    if connection is other:
+        return True
+    return (connection.conn_info["host"], connection.conn_info["user"]) == (
+        other.conn_info["host"],
+        other.conn_info["user"],
+    )
+
+
+def encode_distributions(distributions: Iterable[DJDistribution]) -> bytes:
+    """Encode the distributions as compressed JSON array of name and version pairs sorted by name and version."""
+    content = sorted([d.distribution_name, d.distribution_version] for d in distributions)
+    return zlib.compress(json.dumps(content, separators=(",", ":")).encode())
+
+
+def decode_distributions(blob: bytes) -> frozenset[DJDistribution]:
+    """Decode distributions encoded with encode_distributions."""
+    return frozenset(DJDistribution(name, version) for name, version in json.loads(zlib.decompress(blob)))
+
+
+def _to_blob(content: bytes) -> numpy.ndarray[Any, numpy.dtype[numpy.uint8]]:
+    # DataJoint 0.12 only serializes bytes if python-native blobs are enabled, numeric arrays are always supported.
+    return numpy.frombuffer(content, dtype=numpy.uint8)
+
+
+def _from_blob(row: Entity) -> bytes:
+    return cast(numpy.ndarray[Any, numpy.dtype[numpy.uint8]], row["distributions"]).tobytes()
+
+
+class BlobTable(Table):
+    """Facade around DataJoint tables that store the distributions of a record in a single compressed blob.
+
+    The blob is stored in a part of the record table, so adding a record inserts one row into the record table and one
+    into the blob part and fetching a record takes a single query. Records without a blob, i.e. records added by the
+    parts layout facade, are read from the distribution part.
+    """
+
+    def _blobs(self) -> types.Table:
+        return cast(types.Table, getattr(self.factory(), DJDistributionBlob.__name__)())
+
+    def add_many(self, master_entities: Sequence[DJComputationRecord]) -> None:
+        """Insert the records into the record table and their encoded distributions into the blob part.
+
+        Raises:
+            ValueError: One of the records already exists.
+        """
+        self._insert_masters([e.primary for e in master_entities], master_entities)
+        rows = [
+            {**e.primary, "distributions": _to_blob(encode_distributions(e.distributions))} for e in master_entities
+        ]
+        self._insert(self._blobs(), cast(List[Entity], rows))
+
+    def get(self, primary: PrimaryKey) -> DJComputationRecord:
+        """Fetch the record matching the given primary key and decode its distributions.
+
+        Raises:
+            KeyError: No record matching the given primary key exists.
+        """
+        rows = (self._blobs() & primary).fetch(as_dict=True)
+        if not rows:
+            return super().get(primary)
+        return DJComputationRecord(primary=primary, distributions=decode_distributions(_from_blob(rows[0])))
+
+    def _get_chunk(self, primaries: List[PrimaryKey]) -> List[DJComputationRecord]:
+        names = sorted(primaries[0])
+        blobs = {_key(r, names): _from_blob(r) for r in (self._blobs() & primaries).fetch(as_dict=True)}
+        without_blob = [p for p in primaries if _key(p, names) not in blobs]
+        master_entities = {_key(e.primary, names): e for e in super()._get_chunk(without_blob)} if without_blob else {}
+        for primary in primaries:
+            key = _key(primary, names)
+            if key in blobs:
+                master_entities[key] = DJComputationRecord(
+                    primary=primary, distributions=decode_distributions(blobs[key])
+                )
+        return [master_entities[_key(p, names)] for p in primaries]
+
+    def find(
+        self,
+        restrictions: Sequence[Mapping[str, Any]],
+        predicate: Callable[[DJDistribution], bool],
+        page_size: int = 10000,
+    ) -> Iterator[PrimaryKey]:
+        """Iterate over the primary keys of all records having a distribution that satisfies the predicate.
+
+        Blobs can not be restricted in the database. The blob part is therefore streamed in pages of page_size rows and
+        each blob is decoded and checked. Records stored in the distribution part are looked up as in the parts layout.
+        """
+        if not restrictions:
+            return iter([])
+        names = self._master_primary_key()
+        from_blobs = (
+            {n: r[n] for n in names}
+            for r in _iter_pages(self._blobs, page_size)
+            if any(matches(d, restrictions) and predicate(d) for d in decode_distributions(_from_blob(r)))
+        )
+        return itertools.chain(super().find(restrictions, predicate, page_size), from_blobs)
 
 
 class TableFactory:
-    """A factory producing tables."""
+    """A factory producing tables.
+
+    Tables are declared once and the declared classes are reused afterwards. After a reconnect to the same server, or
+    if another thread uses its own connection, subclasses of the cached classes bound to the current connection are
+    produced without introspecting the schema again. The declared classes themselves are never rebound, so that tables
+    produced for one thread keep using that thread's connection. The tables are declared again if the factory connects
+    to a different server, if their definition changes or after invalidate was called.
+
+    The records table is named after the parent table followed by record_suffix. Layouts whose records table is not
+    compatible with the default layout use their own suffix, so that switching to them declares a new records table
+    instead of reusing an existing table with a different definition.
+    """
+
+    record_suffix = "Record"
 
     def __init__(self, schema_factory: SchemaFactory, parent: str) -> None:
         """Initialize the factory."""
         self.schema_factory = schema_factory
         self.parent = parent
+        self._declared: Dict[str, Tuple[Type[Lookup], str, Mapping[str, str]]] = {}
+        self._local = threading.local()
+
+    @property
+    def _bound(self) -> Dict[str, Tuple[Type[Lookup], types.Connection, Type[Lookup]]]:
+        if not hasattr(self._local, "bound"):
+            self._local.bound = {}
+        return cast(Dict[str, Tuple[Type[Lookup], types.Connection, Type[Lookup]]], self._local.bound)
 
     def __call__(self) -> Lookup:
         """Produce a record table instance."""
-        master_cls: Type[Lookup] = type(self.parent + "Record", (Lookup,), {"definition": "-> " + self.parent})
-        for part_cls in PartEntity.__subclasses__():
-            setattr(
-                master_cls,
-                part_cls.__name__,
-                type(part_cls.__name__, (Part,), {"definition": part_cls.definition}),
-            )
+        return self._declare(
+            self.parent + self.record_suffix,
+            "-> " + self.parent + "\n---" + DJComputationRecord.identifier_definition,
+            parts={p.__name__: p.definition for p in PartEntity.__subclasses__()},
+        )
+
+    def invalidate(self) -> None:
+        """Forget all declared tables so that they are declared again when they are produced the next time."""
+        self._declared.clear()
+
+    def _declare(
+        self,
+        name: str,
+        definition: str,
+        parts: Optional[Mapping[str, str]] = None,
+        context: Optional[Mapping[str, object]] = None,
+    ) -> Lookup:
+        parts = parts or {}
+        connection = self.schema_factory.connection
+        cached = self._declared.get(name)
+        if cached and cached[1:] == (definition, parts) and _same_server(cached[0].connection, connection):
+            return self._bind(name, cached[0], parts, connection)()
+        master_cls = self._declare_class(name, definition, parts, context)
+        self._declared[name] = (master_cls, definition, parts)
+        return master_cls()
+
+    def _bind(
+        self, name: str, master_cls: Type[Lookup], parts: Mapping[str, str], connection: types.Connection
+    ) -> Type[Lookup]:
+        """Return a subclass of the declared class and its parts bound to the connection unless it is already bound.
+
+        The subclass bound last is cached per thread so that it is only created once per connection.
+        """
+        if master_cls.connection is connection:
+            return master_cls
+        bound = self._bound.get(name)
+        if bound and bound[0] is master_cls and bound[1] is connection:
+            return bound[2]
+        namespace: Dict[str, object] = {"connection": connection}
+        for part_name in parts:
+            part_cls = getattr(master_cls, part_name)
+            namespace[part_name] = type(part_name, (part_cls,), {"connection": connection})
+        bound_cls: Type[Lookup] = type(master_cls.__name__, (master_cls,), namespace)
+        self._bound[name] = (master_cls, connection, bound_cls)
+        return bound_cls
+
+    def _declare_class(
+        self, name: str, definition: str, parts: Mapping[str, str], context: Optional[Mapping[str, object]]
+    ) -> Type[Lookup]:
+        master_cls: Type[Lookup] = type(name, (Lookup,), {"definition": definition})
+        for part_name, part_definition in parts.items():
+            setattr(master_cls, part_name, type(part_name, (Part,), {"definition": part_definition}))
         schema_tables: Dict[str, object] = {}
         schema = self.schema_factory()
         schema.spawn_missing_classes(schema_tables)
-        context: dict[str, object] = {self.parent: schema_tables[self.parent]}
+        full_context: dict[str, object] = {self.parent: schema_tables[self.parent]}
+        if context:
+            full_context.update(context)
         if schema.context:
-            context.update(schema.context)
-        return schema(master_cls, context=context)()
+            full_context.update(schema.context)
+        return schema(master_cls, context=full_context)
 
     def __repr__(self) -> str:
         """Create a string representation of the factory."""
         return f"{self.__class__.__name__}(schema_factory={repr(self.schema_factory)}, parent={repr(self.parent)})"
+
+
+class SnapshotTableFactory(TableFactory):
+    """A factory producing record tables that reference their snapshots in a separate snapshot table."""
+
+    record_suffix = "SnapshotRecord"
+
+    def snapshots(self) -> Lookup:
+        """Produce a snapshot table instance."""
+        return self._declare(
+            self.parent + "Snapshot",
+            "snapshot_hash: char(32)",
+            parts={p.__name__: p.definition for p in PartEntity.__subclasses__()},
+        )
+
+    def __call__(self) -> Lookup:
+        """Produce a record table instance."""
+        snapshot_name = self.parent + "Snapshot"
+        context = {snapshot_name: self.snapshots().__class__}
+        return self._declare(
+            self.parent + self.record_suffix,
+            "-> " + self.parent + "\n---\n-> " + snapshot_name + DJComputationRecord.identifier_definition,
+            context=context,
+        )
+
+
+class InternedTableFactory(TableFactory):
+    """A factory producing record tables whose distribution parts reference a shared distribution lookup table."""
+
+    record_suffix = "InternedRecord"
+
+    def distribution_ids(self) -> Lookup:
+        """Produce an instance of the lookup table mapping distribution IDs to names and versions."""
+        return self._declare(DJInternedDistribution.__name__, DJInternedDistribution.definition)
+
+    def __call__(self) -> Lookup:
+        """Produce a record table instance."""
+        context = {DJInternedDistribution.__name__: self.distribution_ids().__class__}
+        return self._declare(
+            self.parent + self.record_suffix,
+            "-> " + self.parent + "\n---" + DJComputationRecord.identifier_definition,
+            parts={DJDistribution.__name__: DJDistribution.interned_definition},
+            context=context,
+        )
+
+
+class BlobTableFactory(TableFactory):
+    """A factory producing record tables that store the distributions of a record in a blob part.
+
+    The record table and its part tables are declared as in the parts layout, so that records stored in them can still
+    be read. The blob part is declared in addition. DataJoint declares missing parts of existing record tables, so record
+    tables declared by the parts layout gain the blob part without being altered.
+    """
+
+    def __call__(self) -> Lookup:
+        """Produce a record table instance."""
+        return self._declare(
+            self.parent + self.record_suffix,
+            "-> " + self.parent + "\n---" + DJComputationRecord.identifier_definition,
+            parts={
+                **{p.__name__: p.definition for p in PartEntity.__subclasses__()},
+                DJDistributionBlob.__name__: DJDistributionBlob.definition,
+            },
+        )
@@ -10,6 +10,7 @@ from typing import (
     MutableMapping,
     Optional,
     Protocol,
+    Sequence,
     Sized,
     Type,
     TypedDict,
@@ -20,6 +21,7 @@ from typing import (
 from ..types import PrimaryKey
 
 Entity = Mapping[str, Union[str, float, int]]
+Restriction = Union[str, Entity, Sequence[Entity]]
 
 
 class Table(
@@ -31,9 +33,64 @@ class Table(
     database: str
     connection: Connection
 
-    def insert1(self, row: Entity) -> None:
+    @property
+    def primary_key(self) -> list[str]:
+        """Return the names of the primary key attributes."""
+
+    @property
+    def full_table_name(self) -> str:
+        """Return the quoted name of the table including the name of its database."""
+
+    @property
+    def heading(self) -> Heading:
+        """Return the heading of the table."""
+
+    def insert1(self, row: Entity, skip_duplicates: bool = False) -> None:
         """Insert a row into the table."""
 
+    def insert(self, rows: Iterable[Entity], skip_duplicates: bool = False) -> None:
+        """Insert rows into the table."""
+
+    def fetch(
+        self, as_dict: bool = False, order_by: Optional[Sequence[str]] = None, limit: Optional[int] = None
+    ) -> list[Entity]:
+        """Fetch all rows of the table or the first limit rows in the given order."""
+
+    def fetch1(self) -> Entity:
+        """Fetch the only row of the table."""
+
+    def proj(self, *attributes: str) -> Table:
+        """Project the table onto its primary key and the given attributes."""
+
+    def __and__(self, restriction: Restriction) -> Table:
+        """Restrict the table."""
+
+    def __mul__(self, other: Any) -> Table:
+        """Join the table with the other table."""
+
+
+class Attribute(Protocol):  # pylint: disable=too-few-public-methods
+    """Datajoint attribute protocol."""
+
+    @property
+    def uuid(self) -> bool:
+        """Return True if the attribute stores UUIDs, False otherwise."""
+
+    @property
+    def is_blob(self) -> bool:
+        """Return True if the attribute stores serialized blobs, False otherwise."""
+
+
+class Heading(Protocol):  # pylint: disable=too-few-public-methods
+    """Datajoint table heading protocol."""
+
+    @property
+    def names(self) -> list[str]:
+        """Return the names of all attributes."""
+
+    def __getitem__(self, name: str) -> Attribute:
+        """Return the attribute with the given name."""
+
 
 class ConnInfoDict(TypedDict):
     """Dictionary containing connection information."""
@@ -61,9 +118,16 @@ class Connection(Protocol):
     def in_transaction(self) -> bool:
         """Return True if we are in a transaction, False otherwise."""
 
+    @property
+    def is_connected(self) -> bool:
+        """Return True if the connection is alive, False otherwise."""
+
     def close(self) -> None:
         """Close the connection."""
 
+    def query(self, query: str, args: Sequence[Any] = ()) -> Any:
+        """Execute the parameterized query."""
+
 
 class ConnectionFactory(Protocol):  # pylint: disable=too-few-public-methods
     """Protocol representing a factory producing DataJoint connections."""
@@ -86,6 +150,20 @@ class Factory(Protocol):  # pylint: disable=too-few-public-methods
         """Return a object that supports the table protocol."""
 
 
+class SnapshotFactory(Factory, Protocol):  # pylint: disable=too-few-public-methods
+    """Datajoint table factory protocol for factories that also produce snapshot tables."""
+
+    def snapshots(self) -> Table:
+        """Return a object that supports the table protocol and contains the snapshots."""
+
+
+class InternedFactory(Factory, Protocol):  # pylint: disable=too-few-public-methods
+    """Datajoint table factory protocol for factories that also produce distribution lookup tables."""
+
+    def distribution_ids(self) -> Table:
+        """Return a object that supports the table protocol and maps distribution IDs to names and versions."""
+
+
 Context = MutableMapping[str, object]
 _T = TypeVar("_T", bound=Table)
 
@@ -110,6 +188,10 @@ class Schema(Protocol):
 class SchemaFactory(Protocol):  # pylint: disable=too-few-public-methods
     """A factory producing schemas."""
 
+    @property
+    def connection(self) -> Connection:
+        """Return the connection used by the produced schemas."""
+
     def __call__(self) -> Schema:
         """Produce a new schema."""
 
@@ -1,9 +1,13 @@
 """Contains the record class and its constituents."""
 from __future__ import annotations
 
+import hashlib
+import itertools
+import operator
+import re
 import textwrap
 from dataclasses import dataclass
-from typing import NewType
+from typing import Any, Callable, Iterable, List, NewType, Optional, Sequence, Tuple
 
 Identifier = NewType("Identifier", str)
 
@@ -25,6 +29,15 @@ class ComputationRecord:
         distributions_string = "Distributions:" + "\n" + textwrap.indent("\n".join(sorted(lines)), INDENT)
         return f"Computation Record:\n{textwrap.indent(distributions_string, INDENT)}"
 
+    @property
+    def fingerprint(self) -> str:
+        """Return a fingerprint of the record's distributions that is equal for records with equal distributions."""
+        return fingerprint(self.distributions)
+
+    def diff(self, other: ComputationRecord) -> DistributionDiff:
+        """Return the distributions added, removed and changed in the other record compared to this one."""
+        return diff_distributions(self.distributions, other.distributions)
+
 
 @dataclass(frozen=True)
 class Distribution:
@@ -42,3 +55,251 @@ class Distribution:
                 version: {self.version}
             """
         ).strip()
+
+
+@dataclass(frozen=True)
+class VersionChange:
+    """Represents a distribution whose version changed from one record to another."""
+
+    name: str
+    version1: str
+    version2: str
+
+
+@dataclass(frozen=True)
+class DistributionDiff:
+    """Represents the differences between the distributions of two records.
+
+    Added distributions are only contained in the second record, removed ones only in the first record. Distributions
+    are sorted by name and version.
+    """
+
+    added: tuple[Distribution, ...] = ()
+    removed: tuple[Distribution, ...] = ()
+    changed: tuple[VersionChange, ...] = ()
+
+    @property
+    def differ(self) -> bool:
+        """Return True if the distributions differ, False otherwise."""
+        return bool(self.added or self.removed or self.changed)
+
+    def inverted(self) -> DistributionDiff:
+        """Return the differences of the first record compared to the second one."""
+        return DistributionDiff(
+            added=self.removed,
+            removed=self.added,
+            changed=tuple(VersionChange(c.name, c.version2, c.version1) for c in self.changed),
+        )
+
+    def __str__(self) -> str:
+        """Return a human-readable representation of the differences."""
+        sections = {
+            "Added": [(d.name, f"({d.version})") for d in self.added],
+            "Removed": [(d.name, f"({d.version})") for d in self.removed],
+            "Changed": [(c.name, f"({c.version1} -> {c.version2})") for c in self.changed],
+        }
+        max_name_length = max((len(n) for lines in sections.values() for n, _ in lines), default=0)
+        return "\n".join(
+            f"{title}:\n" + textwrap.indent("\n".join(f"{n:<{max_name_length}} {v}" for n, v in lines), INDENT)
+            for title, lines in sections.items()
+            if lines
+        )
+
+
+def fingerprint(distributions: Iterable[Distribution]) -> str:
+    """Return a hex digest of the sorted names and versions of the distributions."""
+    content = "\n".join(sorted(f"{d.name}=={d.version}" for d in distributions))
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+_Groups = List[Tuple[str, List[str]]]
+
+
+def _group_by_name(distributions: Iterable[Distribution]) -> _Groups:
+    ordered = sorted(distributions, key=lambda d: (d.name, d.version))
+    return [(n, [d.version for d in g]) for n, g in itertools.groupby(ordered, key=lambda d: d.name)]
+
+
+def diff_distributions(
+    distributions1: Iterable[Distribution], distributions2: Iterable[Distribution]
+) -> DistributionDiff:
+    """Return the distributions added, removed and changed in the second collection compared to the first one.
+
+    Both collections are sorted by name and compared in a single merge pass. A distribution is changed if each
+    collection contains exactly one version of it and the versions differ. Otherwise its versions that are only
+    contained in one of the collections are added or removed.
+    """
+    return _diff_groups(_group_by_name(distributions1), _group_by_name(distributions2))
+
+
+def _diff_groups(groups1: _Groups, groups2: _Groups) -> DistributionDiff:
+    added: list[Distribution] = []
+    removed: list[Distribution] = []
+    changed: list[VersionChange] = []
+    i = j = 0
+    while i < len(groups1) and j < len(groups2):
+        (name1, versions1), (name2, versions2) = groups1[i], groups2[j]
+        if name1 < name2:
+            removed.extend(Distribution(name1, v) for v in versions1)
+            i += 1
+        elif name1 > name2:
+            added.extend(Distribution(name2, v) for v in versions2)
+            j += 1
+        else:
+            if len(versions1) == len(versions2) == 1:
+                if versions1 != versions2:
+                    changed.append(VersionChange(name1, versions1[0], versions2[0]))
+            else:
+                removed.extend(Distribution(name1, v) for v in versions1 if v not in versions2)
+                added.extend(Distribution(name2, v) for v in versions2 if v not in versions1)
+            i += 1
+            j += 1
+    removed.extend(Distribution(n, v) for n, versions in groups1[i:] for v in versions)
+    added.extend(Distribution(n, v) for n, versions in groups2[j:] for v in versions)
+    return DistributionDiff(tuple(added), tuple(removed), tuple(changed))
+
+
+@dataclass(frozen=True)
+class DiffMatrix:
+    """Represents the differences between every pair of a sequence of distribution collections.
+
+    Only the differences of every collection to the collections following it are stored. The differences to the
+    preceding collections are derived from them.
+    """
+
+    diffs: tuple[tuple[DistributionDiff, ...], ...] = ()
+
+    def diff(self, index1: int, index2: int) -> DistributionDiff:
+        """Return the distributions added, removed and changed in the second collection compared to the first one."""
+        if not 0 <= index1 < len(self) or not 0 <= index2 < len(self):
+            raise IndexError(f"Diff matrix has no entry ({index1}, {index2})!")
+        if index1 == index2:
+            return DistributionDiff()
+        if index1 > index2:
+            return self.diff(index2, index1).inverted()
+        return self.diffs[index1][index2 - index1 - 1]
+
+    def __len__(self) -> int:
+        """Return the number of compared distribution collections."""
+        return len(self.diffs)
+
+
+def diff_matrix(distributions: Sequence[Iterable[Distribution]]) -> DiffMatrix:
+    """Return the differences between every pair of the distribution collections.
+
+    Every collection is sorted once and each pair is compared in a single merge pass (see diff_distributions).
+    """
+    groups = [_group_by_name(d) for d in distributions]
+    return DiffMatrix(tuple(tuple(_diff_groups(g1, g2) for g2 in groups[i + 1 :]) for i, g1 in enumerate(groups)))
+
+
+_REQUIREMENT_PATTERN = re.compile(r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:(==|!=|<=|>=|<|>)\s*(\S+))?\s*")
+
+_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+_VERSION_PATTERN = re.compile(
+    r"""
+    v?
+    (?:(?P<epoch>[0-9]+)!)?
+    (?P<release>[0-9]+(?:\.[0-9]+)*)
+    (?P<pre>[-_.]?(?P<pre_label>alpha|a|beta|b|preview|pre|c|rc)[-_.]?(?P<pre_number>[0-9]+)?)?
+    (?P<post>-(?P<implicit_post_number>[0-9]+)|[-_.]?(?:post|rev|r)[-_.]?(?P<post_number>[0-9]+)?)?
+    (?P<dev>[-_.]?dev[-_.]?(?P<dev_number>[0-9]+)?)?
+    (?:\+(?P<local>[a-z0-9]+(?:[-_.][a-z0-9]+)*))?
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+
+_PRE_RELEASE_RANKS = {"a": 0, "alpha": 0, "b": 1, "beta": 1, "c": 2, "rc": 2, "pre": 2, "preview": 2}
+
+
+def version_key(version: str) -> tuple[Any, ...]:
+    """Return a key that orders versions as specified by PEP 440.
+
+    Trailing zero release segments are ignored so that e.g. "1.24" and "1.24.0" are equal. Development and
+    pre-releases come before their release and post-releases after it. A version with a local label, e.g.
+    "2.1.0+cu121", comes after the same version without one. Versions not following PEP 440 come before all others and
+    are ordered by their dot-separated segments comparing numeric segments as numbers.
+    """
+    match = _VERSION_PATTERN.fullmatch(version.strip())
+    if not match:
+        return (-1, tuple((0, int(s)) if s.isdigit() else (1, s) for s in version.split(".")))
+    release = tuple(int(s) for s in match["release"].split("."))
+    while release and release[-1] == 0:
+        release = release[:-1]
+    if match["pre"]:
+        pre: tuple[int, ...] = (0, _PRE_RELEASE_RANKS[match["pre_label"].lower()], int(match["pre_number"] or 0))
+    else:
+        pre = (-1,) if match["dev"] and not match["post"] else (1,)
+    post = (0, int(match["implicit_post_number"] or match["post_number"] or 0)) if match["post"] else (-1,)
+    dev = (0, int(match["dev_number"] or 0)) if match["dev"] else (1,)
+    local = tuple(
+        (1, int(s), "") if s.isdigit() else (0, 0, s.lower()) for s in re.split(r"[-_.]", match["local"] or "") if s
+    )
+    return (0, int(match["epoch"] or 0), release, pre, post, dev, local)
+
+
+def _is_pre_release(key: tuple[Any, ...]) -> bool:
+    """Return True if the version with the given PEP 440 key is a pre- or development release, False otherwise."""
+    return bool(key[3][0] == 0 or key[5][0] == 0)
+
+
+def _is_post_release(key: tuple[Any, ...]) -> bool:
+    """Return True if the version with the given PEP 440 key is a post-release, False otherwise."""
+    return bool(key[4][0] == 0)
+
+
+def normalize_name(name: str) -> str:
+    """Return the name of a distribution normalized as specified by PEP 503, e.g. "typing-extensions"."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+@dataclass(frozen=True)
+class Requirement:
+    """Represents a requirement on the name and optionally the version of a distribution, e.g. "numpy<1.24"."""
+
+    name: str
+    operator: Optional[str] = None
+    version: Optional[str] = None
+
+    @classmethod
+    def from_string(cls, string: str) -> Requirement:
+        """Parse a requirement like "numpy", "torch==2.1.0" or "numpy<1.24"."""
+        match = _REQUIREMENT_PATTERN.fullmatch(string)
+        if not match:
+            raise ValueError(f"Invalid requirement '{string}'!")
+        return cls(*match.groups())
+
+    def is_satisfied_by(self, distribution: Distribution) -> bool:
+        """Return True if the distribution satisfies the requirement, False otherwise.
+
+        Names are compared after normalizing them. The local label of the distribution's version is ignored unless the
+        required version has one, so that e.g. "torch==2.1.0" is satisfied by "2.1.0+cu121". As specified by PEP 440,
+        "<1.24" is not satisfied by pre-releases of 1.24 (e.g. "1.24.0rc1") and ">1.24" is not satisfied by its
+        post-releases (e.g. "1.24.post1") unless the required version is itself a pre- or post-release respectively.
+        """
+        if normalize_name(distribution.name) != normalize_name(self.name):
+            return False
+        if self.operator is None or self.version is None:
+            return True
+        version = distribution.version if "+" in self.version else distribution.version.split("+", 1)[0]
+        key, required = version_key(version), version_key(self.version)
+        if not _OPERATORS[self.operator](key, required):
+            return False
+        if self.operator not in ("<", ">") or key[0] < 0 or required[0] < 0 or key[1:3] != required[1:3]:
+            return True
+        if self.operator == "<":
+            return _is_pre_release(required) or not _is_pre_release(key)
+        return _is_post_release(required) or not _is_post_release(key)
+
+    def __str__(self) -> str:
+        """Return the requirement in the form it can be parsed from."""
+        return self.name + (self.operator or "") + (self.version or "")
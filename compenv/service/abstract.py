@@ -2,11 +2,12 @@
 from __future__ import annotations
 
 import inspect
+import threading
 from abc import ABC, abstractmethod
 from types import TracebackType
-from typing import Callable, ClassVar, Generic, Iterator, Optional, Type, TypeVar
+from typing import Callable, ClassVar, Generic, Iterable, Iterator, Optional, Type, TypeVar, cast
 
-from ..model.record import ComputationRecord, Distribution, Identifier
+from ..model.record import ComputationRecord, Distribution, Identifier, Requirement
 
 
 class Request(ABC):  # pylint: disable=too-few-public-methods
@@ -68,6 +69,37 @@ class Repository(ABC):
     def get(self, identifier: Identifier) -> ComputationRecord:
         """Get the computation record matching the given identifier from the repository if it exists."""
 
+    def get_many(self, identifiers: Iterable[Identifier]) -> Iterator[ComputationRecord]:
+        """Get the computation records matching the given identifiers from the repository in the given order."""
+        return (self.get(i) for i in identifiers)
+
+    def iter_records(self) -> Iterator[ComputationRecord]:
+        """Iterate over all computation records."""
+        return self.get_many(iter(self))
+
+    def find(self, requirements: Iterable[Requirement]) -> Iterator[Identifier]:
+        """Iterate over the identifiers of all computation records with a distribution satisfying any requirement."""
+        requirements = list(requirements)
+        return (
+            r.identifier
+            for r in self.iter_records()
+            if any(q.is_satisfied_by(d) for q in requirements for d in r.distributions)
+        )
+
+    def on_commit(self) -> None:
+        """Handle the commit of the unit of work in the calling thread.
+
+        Called by units of work after they committed. Repositories that do not persist added records immediately
+        persist the records added within the unit of work from now on. Does nothing by default.
+        """
+
+    def on_rollback(self) -> None:
+        """Handle the rollback of the unit of work in the calling thread.
+
+        Called by units of work after they rolled back. Repositories that do not persist added records immediately
+        discard the records added within the unit of work that was not committed. Does nothing by default.
+        """
+
     @abstractmethod
     def __iter__(self) -> Iterator[Identifier]:
         """Iterate over the identifiers of all computation records."""
@@ -89,13 +121,24 @@ R = TypeVar("R", bound=Repository)
 
 
 class UnitOfWork(ABC):
-    """Defines the interface for the unit of work."""
+    """Defines the interface for the unit of work.
+
+    Whether we are within the context of the unit of work is tracked per thread so that threads can enter it concurrently.
+    """
 
     _records: Repository
 
     def __init__(self) -> None:
         """Initialize the unit of work."""
-        self._in_context = False
+        self._local = threading.local()
+
+    @property
+    def _in_context(self) -> bool:
+        return cast(bool, getattr(self._local, "in_context", False))
+
+    @_in_context.setter
+    def _in_context(self, in_context: bool) -> None:
+        self._local.in_context = in_context
 
     @property
     def records(self) -> Repository:
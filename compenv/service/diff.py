@@ -4,7 +4,7 @@ from __future__ import annotations
 from collections.abc import Callable
 from dataclasses import dataclass
 
-from ..model.record import Identifier
+from ..model.record import DistributionDiff, Identifier
 from ..service import register_service_class
 from .abstract import Request, Response, Service, UnitOfWork
 
@@ -21,7 +21,12 @@ class DiffRequest(Request):
 class DiffResponse(Response):
     """Response returned by the diff service."""
 
-    differ: bool
+    diff: DistributionDiff
+
+    @property
+    def differ(self) -> bool:
+        """Return True if the computation records differ, False otherwise."""
+        return self.diff.differ
 
 
 @register_service_class
@@ -39,9 +44,8 @@ class DiffService(Service[DiffRequest, DiffResponse]):  # pylint: disable=too-fe
         self.uow = uow
 
     def _execute(self, request: DiffRequest) -> DiffResponse:
-        """Determine the diff of two computation records."""
+        """Determine the distributions added, removed and changed in the second computation record."""
         with self.uow:
-            rec1 = self.uow.records.get(request.identifier1)
-            rec2 = self.uow.records.get(request.identifier2)
+            rec1, rec2 = self.uow.records.get_many([request.identifier1, request.identifier2])
             self.uow.commit()
-        return DiffResponse(differ=rec1.distributions != rec2.distributions)
+        return DiffResponse(diff=rec1.diff(rec2))
@@ -0,0 +1,82 @@
+"""Contains the diff matrix service."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Optional
+
+from ..model.record import DiffMatrix, Distribution, Identifier, diff_matrix
+from ..service import register_service_class
+from .abstract import Request, Response, Service, UnitOfWork
+
+
+@dataclass(frozen=True)
+class DiffMatrixRequest(Request):
+    """Request expected by the diff matrix service.
+
+    All computation records are compared if no identifiers are given.
+    """
+
+    identifiers: Optional[tuple[Identifier, ...]] = None
+
+
+@dataclass(frozen=True)
+class Environment:
+    """Represents the computation records that ran with identical distributions."""
+
+    fingerprint: str
+    identifiers: tuple[Identifier, ...]
+
+    @property
+    def representative(self) -> Identifier:
+        """Return the identifier of the first computation record that ran in the environment."""
+        return self.identifiers[0]
+
+
+@dataclass(frozen=True)
+class DiffMatrixResponse(Response):
+    """Response returned by the diff matrix service.
+
+    The entry (i, j) of the matrix contains the differences of the j-th environment compared to the i-th one.
+    """
+
+    environments: tuple[Environment, ...]
+    matrix: DiffMatrix
+
+
+@register_service_class
+class DiffMatrixService(Service[DiffMatrixRequest, DiffMatrixResponse]):  # pylint: disable=too-few-public-methods
+    """A service used to group computation records by their environment and compare the distinct environments."""
+
+    name = "diff_matrix"
+
+    _request_cls = DiffMatrixRequest
+    _response_cls = DiffMatrixResponse
+
+    def __init__(self, *, output_port: Callable[[DiffMatrixResponse], None], uow: UnitOfWork) -> None:
+        """Initialize the service."""
+        super().__init__(output_port=output_port)
+        self.uow = uow
+
+    def _execute(self, request: DiffMatrixRequest) -> DiffMatrixResponse:
+        """Group the computation records by the fingerprint of their distributions and diff one record of each group.
+
+        The records are fetched in bulk and only the distributions of the first record of every group are kept. Only
+        the k distinct environments are compared with each other.
+        """
+        identifiers: dict[str, list[Identifier]] = {}
+        distributions: dict[str, frozenset[Distribution]] = {}
+        with self.uow:
+            if request.identifiers is None:
+                comp_recs = self.uow.records.iter_records()
+            else:
+                comp_recs = self.uow.records.get_many(request.identifiers)
+            for comp_rec in comp_recs:
+                fingerprint = comp_rec.fingerprint
+                identifiers.setdefault(fingerprint, []).append(comp_rec.identifier)
+                distributions.setdefault(fingerprint, comp_rec.distributions)
+            self.uow.commit()
+        return DiffMatrixResponse(
+            environments=tuple(Environment(f, tuple(i)) for f, i in identifiers.items()),
+            matrix=diff_matrix(list(distributions.values())),
+        )
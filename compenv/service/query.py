@@ -0,0 +1,45 @@
+"""Contains the query service."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from ..model.record import Identifier, Requirement
+from ..service import register_service_class
+from .abstract import Request, Response, Service, UnitOfWork
+
+
+@dataclass(frozen=True)
+class QueryRequest(Request):
+    """Request expected by the query service."""
+
+    requirements: tuple[Requirement, ...]
+
+
+@dataclass(frozen=True)
+class QueryResponse(Response):
+    """Response returned by the query service."""
+
+    identifiers: tuple[Identifier, ...]
+
+
+@register_service_class
+class QueryService(Service[QueryRequest, QueryResponse]):  # pylint: disable=too-few-public-methods
+    """A service used to find computation records that ran with distributions satisfying any of the requirements."""
+
+    name = "query"
+
+    _request_cls = QueryRequest
+    _response_cls = QueryResponse
+
+    def __init__(self, *, output_port: Callable[[QueryResponse], None], uow: UnitOfWork) -> None:
+        """Initialize the service."""
+        super().__init__(output_port=output_port)
+        self.uow = uow
+
+    def _execute(self, request: QueryRequest) -> QueryResponse:
+        """Find the identifiers of the matching computation records."""
+        with self.uow:
+            identifiers = tuple(self.uow.records.find(request.requirements))
+            self.uow.commit()
+        return QueryResponse(identifiers=identifiers)
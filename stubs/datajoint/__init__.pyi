@@ -1,7 +1,8 @@
+from . import blob
 from .schemas import Schema
 from .table import Table
 from .user_tables import Lookup, Part
 
 schema = Schema
 
-__all__ = ["Schema", "Table", "Lookup", "Part"]
+__all__ = ["Schema", "Table", "Lookup", "Part", "blob"]
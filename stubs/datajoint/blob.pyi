@@ -0,0 +1,3 @@
+from typing import Any
+
+def pack(obj: Any, compress: bool = ...) -> bytes: ...
@@ -1,4 +1,4 @@
-from typing import TypedDict
+from typing import Any, Sequence, TypedDict
 
 class ConnInfoDict(TypedDict):
     host: str
@@ -13,4 +13,7 @@ class Connection:
     def cancel_transaction(self) -> None: ...
     @property
     def in_transaction(self) -> bool: ...
+    @property
+    def is_connected(self) -> bool: ...
     def close(self) -> None: ...
+    def query(self, query: str, args: Sequence[Any] = ...) -> Any: ...
@@ -0,0 +1,10 @@
+class Attribute:
+    @property
+    def uuid(self) -> bool: ...
+    @property
+    def is_blob(self) -> bool: ...
+
+class Heading:
+    @property
+    def names(self) -> list[str]: ...
+    def __getitem__(self, name: str) -> Attribute: ...
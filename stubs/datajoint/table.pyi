@@ -1,4 +1,6 @@
-from typing import Any, Iterator, Mapping, Union
+from typing import Any, Iterable, Iterator, Mapping, Optional, Sequence, Union
+
+from .heading import Heading
 
 Entity = Mapping[str, Union[str, float, int]]
 
@@ -6,10 +8,20 @@ class Table:
     connection: Any
     database: str
     definition: str
-    def insert1(self, row: Entity) -> None: ...
+    primary_key: list[str]
+    full_table_name: str
+    heading: Heading
+    def insert1(self, row: Entity, skip_duplicates: bool = ...) -> None: ...
+    def insert(self, rows: Iterable[Entity], skip_duplicates: bool = ...) -> None: ...
+    def fetch(
+        self, as_dict: bool = ..., order_by: Optional[Sequence[str]] = ..., limit: Optional[int] = ...
+    ) -> list[Entity]: ...
+    def fetch1(self) -> Entity: ...
+    def proj(self, *attributes: str) -> Table: ...
     def delete_quick(self) -> None: ...
     def __contains__(self, other: object) -> bool: ...
-    def __and__(self, restriction: Entity) -> Table: ...
+    def __and__(self, restriction: Union[str, Entity, Sequence[Entity]]) -> Table: ...
+    def __mul__(self, other: Any) -> Table: ...
     def __iter__(self) -> Iterator[Entity]: ...
     def __len__(self) -> int: ...
 
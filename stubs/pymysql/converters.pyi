@@ -0,0 +1,3 @@
+from typing import Any
+
+def escape_item(val: Any, charset: str, mapping: Any = ...) -> str: ...
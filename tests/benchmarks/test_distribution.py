@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import timeit
+from typing import Callable, List
+
+import pytest
+
+from compenv.adapters.distribution import parse_distribution, read_distribution
+from compenv.model.record import Distribution
+
+pytestmark = pytest.mark.slow
+
+N_DISTRIBUTIONS = 1000
+N_REPEATS = 3
+
+LONG_DESCRIPTION = "\n".join(f"Line {i} of a long description that is part of the metadata body." for i in range(200))
+
+
+@pytest.fixture(scope="module")
+def site_packages(tmp_path_factory: pytest.TempPathFactory) -> List[str]:
+    site_packages = tmp_path_factory.mktemp("site-packages")
+    metadata_dirs = []
+    for i in range(N_DISTRIBUTIONS):
+        metadata_dir = site_packages / f"dist{i}-1.0.{i}.dist-info"
+        metadata_dir.mkdir()
+        headers = [
+            "Metadata-Version: 2.1",
+            f"Name: dist{i}",
+            f"Version: 1.0.{i}",
+            "Summary: A synthetic distribution",
+            *(f"Classifier: Programming Language :: Python :: 3.{j}" for j in range(8, 12)),
+            "Description-Content-Type: text/markdown",
+        ]
+        (metadata_dir / "METADATA").write_text("\n".join(headers) + "\n\n" + LONG_DESCRIPTION)
+        metadata_dirs.append(str(metadata_dir))
+    return metadata_dirs
+
+
+def _time(read: Callable[[str], Distribution], paths: List[str]) -> float:
+    return min(timeit.repeat(lambda: [read(p) for p in paths], number=1, repeat=N_REPEATS))
+
+
+def test_header_reader_is_faster_than_full_parser(site_packages: List[str]) -> None:
+    assert [read_distribution(p) for p in site_packages] == [parse_distribution(p) for p in site_packages]
+    full = _time(parse_distribution, site_packages)
+    headers_only = _time(read_distribution, site_packages)
+    print(f"full parser: {full:.4f}s, header reader: {headers_only:.4f}s, speedup: {full / headers_only:.1f}x")
+    assert headers_only < full
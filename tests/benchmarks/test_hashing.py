@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import timeit
+from typing import Callable, List
+
+import pytest
+
+from compenv.adapters.translator import blake2b, blake2b_many
+from compenv.model.record import Identifier
+from compenv.types import PrimaryKey
+
+pytestmark = pytest.mark.slow
+
+N_KEYS = 1_000_000
+N_REPEATS = 3
+
+
+def json_blake2b(primary: PrimaryKey) -> Identifier:
+    return Identifier(hashlib.blake2b(json.dumps(primary, sort_keys=True).encode()).hexdigest())
+
+
+@pytest.fixture(scope="module")
+def primaries() -> List[PrimaryKey]:
+    return [{"subject_id": i, "session": f"session{i % 7}", "trial": i * 0.5} for i in range(N_KEYS)]
+
+
+def _time(hash_many: Callable[[List[PrimaryKey]], List[Identifier]], primaries: List[PrimaryKey]) -> float:
+    return min(timeit.repeat(lambda: hash_many(primaries), number=1, repeat=N_REPEATS))
+
+
+def test_canonical_encoder_is_faster_than_json(primaries: List[PrimaryKey]) -> None:
+    assert blake2b_many(primaries) == [json_blake2b(p) for p in primaries]
+    json_based = _time(lambda ps: [json_blake2b(p) for p in ps], primaries)
+    single = _time(lambda ps: [blake2b(p) for p in ps], primaries)
+    batch = _time(blake2b_many, primaries)
+    print(
+        f"json: {json_based:.4f}s, canonical: {single:.4f}s ({json_based / single:.1f}x), "
+        f"batch: {batch:.4f}s ({json_based / batch:.1f}x)"
+    )
+    assert batch < json_based and single < json_based
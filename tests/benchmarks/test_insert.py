@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import timeit
+from typing import Any, Callable, List, Sequence
+
+import pytest
+from datajoint.heading import Heading, default_attribute_properties
+from datajoint.table import Table
+
+from compenv.infrastructure.table import insert_rows
+
+pytestmark = pytest.mark.slow
+
+N_DISTRIBUTIONS = 500
+N_RECORDS = 20
+N_REPEATS = 3
+
+ATTRIBUTES = ["record_id", "distribution_name", "distribution_version"]
+
+
+class RecordingConnection:
+    def __init__(self) -> None:
+        self.queries: List[str] = []
+
+    def query(self, query: str, args: Sequence[Any] = ()) -> None:
+        self.queries.append(query)
+
+
+class DistributionTable(Table):
+    database = "benchmark"
+    table_name = "__record__distribution"
+    connection = None
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.connection = RecordingConnection()
+        self._heading = Heading(
+            [
+                {**default_attribute_properties, "name": n, "type": "varchar(64)", "in_key": True, "string": True}
+                for n in ATTRIBUTES
+            ]
+        )
+
+
+@pytest.fixture(scope="module")
+def records() -> List[List[dict[str, str]]]:
+    return [
+        [
+            {"record_id": f"record{i}", "distribution_name": f"dist{j}", "distribution_version": f"1.0.{j}"}
+            for j in range(N_DISTRIBUTIONS)
+        ]
+        for i in range(N_RECORDS)
+    ]
+
+
+def _time(
+    insert: Callable[[DistributionTable, List[dict[str, str]]], None], records: List[List[dict[str, str]]]
+) -> float:
+    table = DistributionTable()
+    return min(timeit.repeat(lambda: [insert(table, r) for r in records], number=1, repeat=N_REPEATS))
+
+
+def test_raw_insert_is_faster_than_datajoint_insert(records: List[List[dict[str, str]]]) -> None:
+    datajoint_table, raw_table = DistributionTable(), DistributionTable()
+    datajoint_table.insert(records[0])
+    insert_rows(raw_table, records[0])
+    assert len(datajoint_table.connection.queries) == len(raw_table.connection.queries) == 1
+    datajoint = _time(lambda t, r: t.insert(r), records)
+    raw = _time(insert_rows, records)
+    print(f"datajoint insert: {datajoint:.4f}s, raw insert: {raw:.4f}s, speedup: {datajoint / raw:.1f}x")
+    assert raw < datajoint
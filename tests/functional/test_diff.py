@@ -146,4 +146,5 @@ def test_records_differ(manual_table_cls, computed_table_cls, capsys):
         computed_table_cls().populate()
     computed_table_cls().records.diff({"id": 0}, {"id": 1})
     captured = capsys.readouterr()
-    assert captured.out == "The computation records differ\n"
+    assert captured.out.startswith("The computation records differ\nAdded:\n")
+    assert "(0.1.3)" in captured.out
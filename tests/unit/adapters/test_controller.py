@@ -6,9 +6,11 @@ from typing import Any, Generic, List, Optional, Type, TypeVar
 import pytest
 
 from compenv.adapters.controller import DJController
-from compenv.model.record import Identifier
+from compenv.model.record import Identifier, Requirement
 from compenv.service.abstract import Request, Response
 from compenv.service.diff import DiffRequest
+from compenv.service.matrix import DiffMatrixRequest
+from compenv.service.query import QueryRequest
 from compenv.service.record import RecordRequest
 from compenv.types import PrimaryKey
 
@@ -60,11 +62,33 @@ def fake_diff_service() -> FakeService[DiffRequest]:
     return service
 
 
+@pytest.fixture
+def fake_query_service() -> FakeService[QueryRequest]:
+    service: FakeService[QueryRequest] = FakeService()
+    service.request_cls = QueryRequest
+    return service
+
+
+@pytest.fixture
+def fake_diff_matrix_service() -> FakeService[DiffMatrixRequest]:
+    service: FakeService[DiffMatrixRequest] = FakeService()
+    service.request_cls = DiffMatrixRequest
+    return service
+
+
 @pytest.fixture
 def fake_services(
-    fake_record_service: FakeService[RecordRequest], fake_diff_service: FakeService[DiffRequest]
+    fake_record_service: FakeService[RecordRequest],
+    fake_diff_service: FakeService[DiffRequest],
+    fake_query_service: FakeService[QueryRequest],
+    fake_diff_matrix_service: FakeService[DiffMatrixRequest],
 ) -> dict[str, FakeService[Any]]:
-    return {"record": fake_record_service, "diff": fake_diff_service}
+    return {
+        "record": fake_record_service,
+        "diff": fake_diff_service,
+        "query": fake_query_service,
+        "diff_matrix": fake_diff_matrix_service,
+    }
 
 
 @pytest.fixture
@@ -111,3 +135,29 @@ def test_diff_request_has_appropriate_identifiers(
     controller = DJController(fake_services, fake_translator)
     controller.diff(key1, key2)
     assert fake_services["diff"].request == DiffRequest(identifier1, identifier2)
+
+
+def test_query_request_has_parsed_requirements(
+    controller: DJController, fake_query_service: FakeService[QueryRequest]
+) -> None:
+    controller.where("numpy<1.24", "torch==2.1.0")
+    assert fake_query_service.request == QueryRequest(
+        (Requirement("numpy", "<", "1.24"), Requirement("torch", "==", "2.1.0"))
+    )
+
+
+def test_diff_matrix_request_has_appropriate_identifiers(
+    controller: DJController,
+    primary: PrimaryKey,
+    identifier: Identifier,
+    fake_diff_matrix_service: FakeService[DiffMatrixRequest],
+) -> None:
+    controller.diff_matrix([primary])
+    assert fake_diff_matrix_service.request == DiffMatrixRequest((identifier,))
+
+
+def test_diff_matrix_request_without_keys_has_no_identifiers(
+    controller: DJController, fake_diff_matrix_service: FakeService[DiffMatrixRequest]
+) -> None:
+    controller.diff_matrix()
+    assert fake_diff_matrix_service.request == DiffMatrixRequest(None)
@@ -1,11 +1,24 @@
 from __future__ import annotations
 
 import os
+import shutil
+from pathlib import Path
 from typing import Callable, Dict, Iterable, Iterator, List, Literal, Optional, Union
 
 import pytest
 
-from compenv.adapters.distribution import DistributionConverter
+from compenv.adapters.distribution import (
+    CACHE_DIR_VARIABLE,
+    DistributionConverter,
+    MetadataIndex,
+    PersistentSnapshotCache,
+    SnapshotCache,
+    default_persistent_cache,
+    parse_distribution,
+    path_fingerprint,
+    read_distribution,
+    read_headers,
+)
 from compenv.model.record import Distribution
 
 
@@ -135,3 +148,351 @@ def test_correct_distributions_returned(converter: DistributionConverter) -> Non
 
 def test_repr(converter: DistributionConverter) -> None:
     assert repr(converter) == "DistributionConverter()"
+
+
+class FakeFingerprint:
+    def __init__(self) -> None:
+        self.value = 0
+
+    def __call__(self) -> int:
+        return self.value
+
+
+class CountingGetDistributions:
+    def __init__(self, distributions: List[FakeDistribution]) -> None:
+        self.distributions = distributions
+        self.calls = 0
+
+    def __call__(self) -> Iterator[FakeDistribution]:
+        self.calls += 1
+        return iter(self.distributions)
+
+
+class TestSnapshotCaching:
+    @staticmethod
+    @pytest.fixture
+    def fake_fingerprint() -> FakeFingerprint:
+        return FakeFingerprint()
+
+    @staticmethod
+    @pytest.fixture
+    def counting_get_distributions(fake_distributions: List[FakeDistribution]) -> CountingGetDistributions:
+        return CountingGetDistributions(fake_distributions)
+
+    @staticmethod
+    @pytest.fixture
+    def caching_converter(
+        counting_get_distributions: CountingGetDistributions, fake_fingerprint: FakeFingerprint
+    ) -> DistributionConverter:
+        return DistributionConverter(
+            path_cls=FakePath,
+            get_distributions=counting_get_distributions,
+            get_fingerprint=fake_fingerprint,
+            cache=SnapshotCache(),
+        )
+
+    @staticmethod
+    def test_distributions_are_converted_once_if_fingerprint_is_unchanged(
+        caching_converter: DistributionConverter, counting_get_distributions: CountingGetDistributions
+    ) -> None:
+        caching_converter()
+        caching_converter()
+        assert counting_get_distributions.calls == 1
+
+    @staticmethod
+    def test_cached_snapshot_is_returned(caching_converter: DistributionConverter) -> None:
+        assert caching_converter() is caching_converter()
+
+    @staticmethod
+    def test_distributions_are_converted_again_if_fingerprint_changes(
+        caching_converter: DistributionConverter,
+        counting_get_distributions: CountingGetDistributions,
+        fake_fingerprint: FakeFingerprint,
+        fake_distributions: List[FakeDistribution],
+    ) -> None:
+        caching_converter()
+        fake_distributions.append(FakeDistribution(FakeMetadata("dist4", "4.0.0"), None))
+        fake_fingerprint.value += 1
+        assert Distribution("dist4", "4.0.0") in caching_converter()
+        assert counting_get_distributions.calls == 2
+
+    @staticmethod
+    def test_cache_is_shared_between_converters(
+        counting_get_distributions: CountingGetDistributions,
+        fake_fingerprint: FakeFingerprint,
+    ) -> None:
+        cache = SnapshotCache()
+        for _ in range(2):
+            DistributionConverter(
+                get_distributions=counting_get_distributions, get_fingerprint=fake_fingerprint, cache=cache
+            )()
+        assert counting_get_distributions.calls == 1
+
+
+class TestPathFingerprint:
+    @staticmethod
+    def test_fingerprint_is_stable(tmp_path: Path) -> None:
+        assert path_fingerprint([str(tmp_path)]) == path_fingerprint([str(tmp_path)])
+
+    @staticmethod
+    def test_fingerprint_changes_if_directory_content_changes(tmp_path: Path) -> None:
+        before = path_fingerprint([str(tmp_path)])
+        (tmp_path / "dist1-0.1.0.dist-info").mkdir()
+        os.utime(tmp_path, ns=(0, 0))
+        assert path_fingerprint([str(tmp_path)]) != before
+
+    @staticmethod
+    def test_missing_paths_are_included(tmp_path: Path) -> None:
+        missing = tmp_path / "missing"
+        assert path_fingerprint([str(missing)]) == ((str(missing), None),)
+
+
+def create_metadata_dir(site_packages: Path, name: str, version: str, suffix: str = ".dist-info") -> Path:
+    metadata_dir = site_packages / f"{name}-{version}{suffix}"
+    metadata_dir.mkdir()
+    metadata_file = "METADATA" if suffix == ".dist-info" else "PKG-INFO"
+    (metadata_dir / metadata_file).write_text(f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n\nDescription")
+    return metadata_dir
+
+
+def bump_mtime(path: Path) -> None:
+    mtime = path.stat().st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+
+class CountingRead:
+    def __init__(self) -> None:
+        self.paths: List[str] = []
+
+    def __call__(self, path: str) -> Distribution:
+        self.paths.append(path)
+        return read_distribution(path)
+
+
+class TestMetadataIndex:
+    @staticmethod
+    @pytest.fixture
+    def site_packages(tmp_path: Path) -> Path:
+        site_packages = tmp_path / "site-packages"
+        site_packages.mkdir()
+        create_metadata_dir(site_packages, "dist1", "0.1.0")
+        create_metadata_dir(site_packages, "dist2", "0.1.2", suffix=".egg-info")
+        (site_packages / "dist1").mkdir()
+        return site_packages
+
+    @staticmethod
+    @pytest.fixture
+    def counting_read() -> CountingRead:
+        return CountingRead()
+
+    @staticmethod
+    @pytest.fixture
+    def index(site_packages: Path, counting_read: CountingRead) -> MetadataIndex:
+        return MetadataIndex(get_paths=lambda: [str(site_packages), str(site_packages / "missing")], read=counting_read)
+
+    @staticmethod
+    def test_finds_distributions(index: MetadataIndex) -> None:
+        assert index() == frozenset({Distribution("dist1", "0.1.0"), Distribution("dist2", "0.1.2")})
+
+    @staticmethod
+    def test_unmodified_path_is_not_read_again(index: MetadataIndex, counting_read: CountingRead) -> None:
+        index()
+        index()
+        assert len(counting_read.paths) == 2
+
+    @staticmethod
+    def test_only_added_metadata_dir_is_read(
+        index: MetadataIndex, counting_read: CountingRead, site_packages: Path
+    ) -> None:
+        index()
+        counting_read.paths.clear()
+        added = create_metadata_dir(site_packages, "dist3", "1.2.3")
+        bump_mtime(site_packages)
+        assert Distribution("dist3", "1.2.3") in index()
+        assert counting_read.paths == [str(added)]
+
+    @staticmethod
+    def test_removed_metadata_dir_is_dropped(index: MetadataIndex, site_packages: Path) -> None:
+        index()
+        shutil.rmtree(site_packages / "dist1-0.1.0.dist-info")
+        bump_mtime(site_packages)
+        assert index() == frozenset({Distribution("dist2", "0.1.2")})
+
+    @staticmethod
+    def test_only_modified_metadata_dir_is_read(
+        index: MetadataIndex, counting_read: CountingRead, site_packages: Path
+    ) -> None:
+        index()
+        counting_read.paths.clear()
+        modified = site_packages / "dist1-0.1.0.dist-info"
+        (modified / "METADATA").write_text("Metadata-Version: 2.1\nName: dist1\nVersion: 0.1.1\n")
+        bump_mtime(modified)
+        bump_mtime(site_packages)
+        assert Distribution("dist1", "0.1.1") in index()
+        assert counting_read.paths == [str(modified)]
+
+    @staticmethod
+    def test_finds_distributions_of_eggs_on_path(site_packages: Path) -> None:
+        egg = site_packages / "foo-1.0-py3.11.egg"
+        (egg / "EGG-INFO").mkdir(parents=True)
+        (egg / "EGG-INFO" / "PKG-INFO").write_text("Metadata-Version: 1.1\nName: foo\nVersion: 1.0\n")
+        paths = [str(site_packages), str(egg)]
+        assert Distribution("foo", "1.0") in MetadataIndex(get_paths=lambda: paths)()
+
+    @staticmethod
+    def test_parallel_scan_finds_same_distributions(site_packages: Path, tmp_path: Path) -> None:
+        other_site_packages = tmp_path / "other-site-packages"
+        other_site_packages.mkdir()
+        for i in range(10):
+            create_metadata_dir(other_site_packages, f"other{i}", f"{i}.0.0")
+        paths = [str(site_packages), str(other_site_packages)]
+        assert MetadataIndex(get_paths=lambda: paths)(max_workers=4) == MetadataIndex(get_paths=lambda: paths)()
+
+    @staticmethod
+    def test_parallel_scan_reads_only_modified_metadata_dirs(
+        index: MetadataIndex, counting_read: CountingRead, site_packages: Path
+    ) -> None:
+        index(max_workers=4)
+        counting_read.paths.clear()
+        added = create_metadata_dir(site_packages, "dist3", "1.2.3")
+        bump_mtime(site_packages)
+        assert Distribution("dist3", "1.2.3") in index(max_workers=4)
+        assert counting_read.paths == [str(added)]
+
+    @staticmethod
+    @pytest.mark.parametrize("max_workers", [1, 4])
+    def test_converter_uses_index(index: MetadataIndex, max_workers: int) -> None:
+        converter = DistributionConverter(
+            get_fingerprint=lambda: 0, cache=SnapshotCache(), index=index, max_workers=max_workers
+        )
+        assert converter() == frozenset({Distribution("dist1", "0.1.0"), Distribution("dist2", "0.1.2")})
+
+
+class TestReadDistribution:
+    @staticmethod
+    @pytest.mark.parametrize(
+        "content",
+        [
+            "Metadata-Version: 2.1\nName: dist1\nVersion: 0.1.0\n\nName: other\n",
+            "Metadata-Version: 2.1\nSummary: A summary\n  spanning lines\nVersion: 0.1.0\nName: dist1\n",
+            "Name:dist1\r\nVersion:  0.1.0 \r\n\r\n",
+        ],
+    )
+    def test_reads_headers(tmp_path: Path, content: str) -> None:
+        metadata_file = tmp_path / "METADATA"
+        metadata_file.write_bytes(content.encode())
+        assert read_headers(str(metadata_file)) == Distribution("dist1", "0.1.0")
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "content",
+        [
+            "Metadata-Version: 2.1\nName: dist1\n\nVersion: 0.1.0\n",
+            "Metadata-Version: 2.1\nName: dist1\nVersion: 0.1.0\n  continued\n",
+            "Metadata-Version: 2.1\nnot a header\nName: dist1\nVersion: 0.1.0\n",
+        ],
+    )
+    def test_returns_none_if_headers_are_malformed(tmp_path: Path, content: str) -> None:
+        metadata_file = tmp_path / "METADATA"
+        metadata_file.write_text(content)
+        assert read_headers(str(metadata_file)) is None
+
+    @staticmethod
+    @pytest.mark.parametrize("suffix", [".dist-info", ".egg-info"])
+    def test_reads_metadata_dirs(tmp_path: Path, suffix: str) -> None:
+        metadata_dir = create_metadata_dir(tmp_path, "dist1", "0.1.0", suffix=suffix)
+        assert read_distribution(str(metadata_dir)) == Distribution("dist1", "0.1.0")
+
+    @staticmethod
+    def test_reads_egg_info_files(tmp_path: Path) -> None:
+        metadata_file = tmp_path / "dist1-0.1.0.egg-info"
+        metadata_file.write_text("Metadata-Version: 1.0\nName: dist1\nVersion: 0.1.0\n")
+        assert read_distribution(str(metadata_file)) == Distribution("dist1", "0.1.0")
+
+    @staticmethod
+    def test_falls_back_to_full_parser_if_headers_are_malformed(tmp_path: Path) -> None:
+        metadata_dir = tmp_path / "dist1-0.1.0.dist-info"
+        metadata_dir.mkdir()
+        (metadata_dir / "METADATA").write_text("Metadata-Version: 2.1\nName: dist1\nVersion: 0.1.0\n  0.1.1\n")
+        assert read_distribution(str(metadata_dir)) == parse_distribution(str(metadata_dir))
+
+
+class TestPersistentSnapshotCache:
+    @staticmethod
+    @pytest.fixture
+    def persistent_cache(tmp_path: Path) -> PersistentSnapshotCache:
+        return PersistentSnapshotCache(str(tmp_path / "cache"))
+
+    @staticmethod
+    def test_returns_none_if_snapshot_is_missing(persistent_cache: PersistentSnapshotCache) -> None:
+        assert persistent_cache.get(0) is None
+
+    @staticmethod
+    def test_returns_stored_snapshot(
+        persistent_cache: PersistentSnapshotCache, distributions: frozenset[Distribution]
+    ) -> None:
+        persistent_cache.put(0, distributions)
+        assert PersistentSnapshotCache(persistent_cache.directory).get(0) == distributions
+
+    @staticmethod
+    def test_snapshot_is_keyed_by_fingerprint(
+        persistent_cache: PersistentSnapshotCache, distributions: frozenset[Distribution]
+    ) -> None:
+        persistent_cache.put(0, distributions)
+        assert persistent_cache.get(1) is None
+
+    @staticmethod
+    def test_no_temporary_files_are_left_behind(
+        persistent_cache: PersistentSnapshotCache, distributions: frozenset[Distribution]
+    ) -> None:
+        persistent_cache.put(0, distributions)
+        assert [f.endswith(".json") for f in os.listdir(persistent_cache.directory)] == [True]
+
+    @staticmethod
+    def test_corrupt_snapshot_is_ignored(
+        persistent_cache: PersistentSnapshotCache, distributions: frozenset[Distribution]
+    ) -> None:
+        persistent_cache.put(0, distributions)
+        for file in os.listdir(persistent_cache.directory):
+            Path(persistent_cache.directory, file).write_text("{")
+        assert persistent_cache.get(0) is None
+
+    @staticmethod
+    def test_converter_loads_snapshot_instead_of_scanning(
+        persistent_cache: PersistentSnapshotCache, distributions: frozenset[Distribution], tmp_path: Path
+    ) -> None:
+        persistent_cache.put(0, distributions)
+        counting_read = CountingRead()
+        create_metadata_dir(tmp_path, "dist3", "1.2.3")
+        converter = DistributionConverter(
+            get_fingerprint=lambda: 0,
+            cache=SnapshotCache(),
+            index=MetadataIndex(get_paths=lambda: [str(tmp_path)], read=counting_read),
+            persistent_cache=persistent_cache,
+        )
+        assert converter() == distributions
+        assert not counting_read.paths
+
+    @staticmethod
+    def test_converter_stores_scanned_snapshot(persistent_cache: PersistentSnapshotCache, tmp_path: Path) -> None:
+        create_metadata_dir(tmp_path, "dist3", "1.2.3")
+        converter = DistributionConverter(
+            get_fingerprint=lambda: 0,
+            cache=SnapshotCache(),
+            index=MetadataIndex(get_paths=lambda: [str(tmp_path)]),
+            persistent_cache=persistent_cache,
+        )
+        converter()
+        assert persistent_cache.get(0) == frozenset({Distribution("dist3", "1.2.3")})
+
+    @staticmethod
+    def test_default_cache_is_configured_via_environment_variable(
+        monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    ) -> None:
+        monkeypatch.setenv(CACHE_DIR_VARIABLE, str(tmp_path))
+        assert repr(default_persistent_cache()) == f"PersistentSnapshotCache(directory={str(tmp_path)!r})"
+
+    @staticmethod
+    def test_default_cache_is_disabled_without_environment_variable(monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.delenv(CACHE_DIR_VARIABLE, raising=False)
+        assert default_persistent_cache() is None
@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+import threading
+
 import pytest
 
-from compenv.adapters.presenter import PrintingPresenter
+from compenv.adapters.presenter import CollectingPresenter, EnvironmentMatrix, PrintingPresenter
+from compenv.model.record import DiffMatrix, Distribution, DistributionDiff, Identifier, VersionChange
 from compenv.service.diff import DiffResponse
+from compenv.service.matrix import DiffMatrixResponse, Environment
+from compenv.service.query import QueryResponse
+from compenv.types import PrimaryKey
+
+from ..conftest import FakeTranslatorFactory
 
 
 class FakePrinter:
@@ -27,20 +35,71 @@ def presenter(fake_printer: FakePrinter) -> PrintingPresenter:
     return PrintingPresenter(fake_printer)
 
 
-@pytest.mark.parametrize(
-    "differ,expected",
-    [
-        (True, "The computation records differ"),
-        (False, "The computation records do not differ"),
-    ],
-)
-def test_information_in_diff_response_is_correctly_printed(
-    presenter: PrintingPresenter, fake_printer: FakePrinter, differ: bool, expected: str
-) -> None:
-    response = DiffResponse(differ=differ)
-    presenter.diff(response)
-    assert fake_printer.texts == [expected]
+def test_prints_that_records_do_not_differ(presenter: PrintingPresenter, fake_printer: FakePrinter) -> None:
+    presenter.diff(DiffResponse(diff=DistributionDiff()))
+    assert fake_printer.texts == ["The computation records do not differ"]
+
+
+def test_prints_diff_if_records_differ(presenter: PrintingPresenter, fake_printer: FakePrinter) -> None:
+    diff = DistributionDiff(
+        added=(Distribution("torch", "2.1.0"),),
+        removed=(Distribution("scipy", "1.11.0"),),
+        changed=(VersionChange("numpy", "1.24.0", "1.26.0"),),
+    )
+    presenter.diff(DiffResponse(diff=diff))
+    assert fake_printer.texts == [
+        "The computation records differ",
+        "Added:\n    torch (2.1.0)\nRemoved:\n    scipy (1.11.0)\nChanged:\n    numpy (1.24.0 -> 1.26.0)",
+    ]
 
 
 def test_repr(presenter: PrintingPresenter) -> None:
     assert repr(presenter) == "PrintingPresenter(print=FakePrinter())"
+
+
+class TestCollectingPresenter:
+    @staticmethod
+    def test_collects_primary_keys_of_queried_records(
+        fake_translator_factory: FakeTranslatorFactory, identifier: Identifier, primary: PrimaryKey
+    ) -> None:
+        collector = CollectingPresenter(fake_translator_factory())
+        collector.query(QueryResponse(identifiers=(identifier,)))
+        assert collector.primaries == [primary]
+
+    @staticmethod
+    def test_keeps_collected_primary_keys_per_thread(
+        fake_translator_factory: FakeTranslatorFactory, identifier: Identifier, primary: PrimaryKey
+    ) -> None:
+        other = Identifier("other")
+        collector = CollectingPresenter(fake_translator_factory({identifier: primary, other: {"a": 1, "b": 1}}))
+        collector.query(QueryResponse(identifiers=(identifier,)))
+        collected: list[list[PrimaryKey]] = []
+
+        def query() -> None:
+            collected.append(collector.primaries)
+            collector.query(QueryResponse(identifiers=(other,)))
+            collected.append(collector.primaries)
+
+        thread = threading.Thread(target=query)
+        thread.start()
+        thread.join()
+        assert collected == [[], [{"a": 1, "b": 1}]]
+        assert collector.primaries == [primary]
+
+    @staticmethod
+    def test_collects_primary_keys_of_grouped_records(fake_translator_factory: FakeTranslatorFactory) -> None:
+        identifiers = [Identifier(f"identifier{i}") for i in range(3)]
+        collector = CollectingPresenter(fake_translator_factory({i: {"a": n} for n, i in enumerate(identifiers)}))
+        matrix = DiffMatrix(((DistributionDiff(added=(Distribution("torch", "2.1.0"),)),), ()))
+        environments = (
+            Environment("fingerprint1", (identifiers[2], identifiers[0])),
+            Environment("fingerprint2", (identifiers[1],)),
+        )
+        collector.diff_matrix(DiffMatrixResponse(environments=environments, matrix=matrix))
+        assert collector.matrix == EnvironmentMatrix(environments=[[{"a": 2}, {"a": 0}], [{"a": 1}]], matrix=matrix)
+
+    @staticmethod
+    def test_repr(fake_translator_factory: FakeTranslatorFactory) -> None:
+        assert (
+            repr(CollectingPresenter(fake_translator_factory())) == "CollectingPresenter(translator=FakeTranslator())"
+        )
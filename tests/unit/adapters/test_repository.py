@@ -1,13 +1,25 @@
 from __future__ import annotations
 
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Sequence
+
 import pytest
 
 from compenv.adapters.entity import DJComputationRecord
-from compenv.adapters.repository import DJRepository
-from compenv.model.record import ComputationRecord, Identifier
+from compenv.adapters.repository import (
+    BufferedDJRepository,
+    DJRepository,
+    FailedRecord,
+    WriteBehindDJRepository,
+    flush_at_exit,
+)
+from compenv.infrastructure.connection import Connection
+from compenv.model.record import ComputationRecord, Distribution, Identifier, Requirement
+from compenv.service.abstract import Repository, UnitOfWork
 from compenv.types import PrimaryKey
 
-from ..conftest import FakeTranslatorFactory
+from ..conftest import FakeConnection, FakeTranslator, FakeTranslatorFactory
 from .conftest import FakeRecordTableFacade
 
 
@@ -34,6 +46,10 @@ class TestAdd:
     ) -> None:
         assert fake_table.get(primary) == dj_comp_rec
 
+    @staticmethod
+    def test_stores_identifier(fake_table: FakeRecordTableFacade, primary: PrimaryKey, identifier: Identifier) -> None:
+        assert fake_table.get(primary).identifier == identifier
+
 
 def test_raises_error_if_not_existing(repo: DJRepository, identifier: Identifier) -> None:
     with pytest.raises(KeyError, match="does not exist!"):
@@ -49,6 +65,153 @@ class TestGet:
         assert repo.get(identifier) == computation_record
 
 
+class TestGetMany:
+    @staticmethod
+    @pytest.mark.usefixtures("add_computation_record")
+    def test_gets_computation_records(
+        repo: DJRepository, computation_record: ComputationRecord, identifier: Identifier
+    ) -> None:
+        assert list(repo.get_many([identifier, identifier], chunk_size=1)) == [computation_record, computation_record]
+
+    @staticmethod
+    def test_raises_error_if_not_existing(repo: DJRepository, identifier: Identifier) -> None:
+        with pytest.raises(KeyError, match="does not exist!"):
+            list(repo.get_many([identifier]))
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 2])
+def test_iter_records(
+    fake_translator_factory: FakeTranslatorFactory,
+    fake_table: FakeRecordTableFacade,
+    computation_record: ComputationRecord,
+    identifier: Identifier,
+    primary: PrimaryKey,
+    prefetch: int,
+) -> None:
+    other = ComputationRecord(Identifier("other"), frozenset())
+    repo = DJRepository(fake_translator_factory({identifier: primary, other.identifier: {"a": 1, "b": 1}}), fake_table)
+    repo.add(computation_record)
+    repo.add(other)
+    assert list(repo.iter_records(batch_size=1, prefetch=prefetch)) == [computation_record, other]
+
+
+class ConnectionCheckingTable(FakeRecordTableFacade):
+    def __init__(self, connection: Connection) -> None:
+        super().__init__()
+        self.connection = connection
+        self.used: List[object] = []
+
+    def get_many(self, primaries: Iterable[PrimaryKey], chunk_size: int = 1000) -> Iterator[DJComputationRecord]:
+        self.used.append(self.connection.dj_connection)
+        return super().get_many(primaries, chunk_size)
+
+    def __iter__(self) -> Iterator[PrimaryKey]:
+        for primary in super().__iter__():
+            self.used.append(self.connection.dj_connection)
+            yield primary
+
+
+class TestIterRecordsWithConnection:
+    @staticmethod
+    @pytest.fixture
+    def connection(create_fake_connection: Callable[[], FakeConnection]) -> Connection:
+        return Connection(create_fake_connection)
+
+    @staticmethod
+    @pytest.fixture
+    def table(connection: Connection) -> ConnectionCheckingTable:
+        return ConnectionCheckingTable(connection)
+
+    @staticmethod
+    @pytest.fixture
+    def records(
+        fake_translator_factory: FakeTranslatorFactory,
+        table: ConnectionCheckingTable,
+        connection: Connection,
+        computation_record: ComputationRecord,
+        identifier: Identifier,
+        primary: PrimaryKey,
+    ) -> Callable[[int], List[ComputationRecord]]:
+        other = ComputationRecord(Identifier("other"), frozenset())
+        translator = fake_translator_factory({identifier: primary, other.identifier: {"a": 1, "b": 1}})
+        repo = DJRepository(translator, table, connection)
+        repo.add(computation_record)
+        repo.add(other)
+
+        def iterate(prefetch: int) -> List[ComputationRecord]:
+            with connection:
+                return list(repo.iter_records(batch_size=1, prefetch=prefetch))
+
+        return iterate
+
+    @staticmethod
+    @pytest.mark.parametrize("prefetch", [0, 1, 2])
+    def test_fetches_records_on_connection_of_iterating_thread(
+        records: Callable[[int], List[ComputationRecord]],
+        table: ConnectionCheckingTable,
+        computation_record: ComputationRecord,
+        prefetch: int,
+    ) -> None:
+        assert [r.identifier for r in records(prefetch)] == [computation_record.identifier, "other"]
+        assert len(set(map(id, table.used))) == 1
+
+    @staticmethod
+    def test_does_not_prefetch_without_connection(
+        fake_translator_factory: FakeTranslatorFactory,
+        table: ConnectionCheckingTable,
+        connection: Connection,
+        computation_record: ComputationRecord,
+    ) -> None:
+        repo = DJRepository(fake_translator_factory(), table)
+        repo.add(computation_record)
+        with connection:
+            assert list(repo.iter_records(prefetch=1)) == [computation_record]
+
+
+class TestFind:
+    @staticmethod
+    @pytest.fixture
+    def find_repo(
+        fake_translator_factory: FakeTranslatorFactory,
+        fake_table: FakeRecordTableFacade,
+        computation_record: ComputationRecord,
+        identifier: Identifier,
+        primary: PrimaryKey,
+    ) -> DJRepository:
+        other = ComputationRecord(Identifier("other"), frozenset([Distribution("dist1", "0.2.0")]))
+        repo = DJRepository(
+            fake_translator_factory({identifier: primary, other.identifier: {"a": 1, "b": 1}}), fake_table
+        )
+        repo.add(computation_record)
+        repo.add(other)
+        return repo
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "requirements,expected",
+        [
+            (["dist1"], ["identifier", "other"]),
+            (["dist1<0.2"], ["identifier"]),
+            (["dist1==0.2"], ["other"]),
+            (["dist1>0.2", "dist2>=0.1.1"], ["identifier"]),
+            (["dist3"], []),
+        ],
+    )
+    def test_finds_records_satisfying_any_requirement(
+        find_repo: DJRepository, requirements: list[str], expected: list[str]
+    ) -> None:
+        assert list(find_repo.find(Requirement.from_string(r) for r in requirements)) == expected
+
+    @staticmethod
+    @pytest.mark.parametrize("requirement", ["pyyaml", "PYYAML>=6", "typing-extensions", "Typing.Extensions==4.8"])
+    def test_finds_records_by_normalized_name(
+        repo: DJRepository, computation_record: ComputationRecord, requirement: str
+    ) -> None:
+        distributions = frozenset([Distribution("PyYAML", "6.0.1"), Distribution("typing_extensions", "4.8.0")])
+        repo.add(ComputationRecord(computation_record.identifier, distributions))
+        assert list(repo.find([Requirement.from_string(requirement)])) == [computation_record.identifier]
+
+
 def test_iteration(repo: DJRepository, computation_record: ComputationRecord) -> None:
     repo.add(computation_record)
     assert list(iter(repo)) == [computation_record.identifier]
@@ -60,4 +223,525 @@ def test_length(repo: DJRepository, computation_record: ComputationRecord) -> No
 
 
 def test_repr(repo: DJRepository) -> None:
-    assert repr(repo) == "DJRepository(translator=FakeTranslator(), table=FakeRecordTableFacade())"
+    assert repr(repo) == "DJRepository(translator=FakeTranslator(), table=FakeRecordTableFacade(), connection=None)"
+
+
+class FakeUnitOfWork(UnitOfWork):
+    def __init__(self, records: Repository) -> None:
+        super().__init__()
+        self._records = records
+        self.committed = False
+
+    def commit(self) -> None:
+        self.committed = True
+        self._records.on_commit()
+
+    def rollback(self) -> None:
+        self._records.on_rollback()
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__ + "()"
+
+
+def commit_records(repo: Repository, *comp_recs: ComputationRecord) -> None:
+    with FakeUnitOfWork(repo) as uow:
+        for comp_rec in comp_recs:
+            uow.records.add(comp_rec)
+        uow.commit()
+
+
+def wait_until(condition: Callable[[], bool]) -> bool:
+    deadline = time.monotonic() + 5
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FailingTable(FakeRecordTableFacade):
+    def __init__(self, failures: int) -> None:
+        super().__init__()
+        self.failures = failures
+
+    def add_many(self, master_entities: Sequence[DJComputationRecord]) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("Lost connection")
+        super().add_many(master_entities)
+
+
+class TestBufferedDJRepository:
+    @staticmethod
+    @pytest.fixture
+    def clock() -> FakeClock:
+        return FakeClock()
+
+    @staticmethod
+    @pytest.fixture
+    def translator(
+        fake_translator_factory: FakeTranslatorFactory, identifier: Identifier, primary: PrimaryKey
+    ) -> FakeTranslator:
+        return fake_translator_factory({identifier: primary, Identifier("other"): {"a": 1, "b": 1}})
+
+    @staticmethod
+    @pytest.fixture
+    def buffered_repo(
+        translator: FakeTranslator, fake_table: FakeRecordTableFacade, clock: FakeClock
+    ) -> BufferedDJRepository:
+        return BufferedDJRepository(translator, fake_table, max_records=2, max_seconds=10, clock=clock)
+
+    @staticmethod
+    @pytest.fixture
+    def other_computation_record(computation_record: ComputationRecord) -> ComputationRecord:
+        return ComputationRecord(Identifier("other"), computation_record.distributions)
+
+    @staticmethod
+    def test_buffers_records(
+        buffered_repo: BufferedDJRepository, fake_table: FakeRecordTableFacade, computation_record: ComputationRecord
+    ) -> None:
+        commit_records(buffered_repo, computation_record)
+        assert len(fake_table) == 0
+        assert buffered_repo.pending == 1
+
+    @staticmethod
+    def test_buffers_records_only_once_unit_of_work_commits(
+        buffered_repo: BufferedDJRepository, computation_record: ComputationRecord
+    ) -> None:
+        buffered_repo.add(computation_record)
+        assert buffered_repo.pending == 0
+        buffered_repo.on_commit()
+        assert buffered_repo.pending == 1
+
+    @staticmethod
+    def test_discards_records_of_rolled_back_unit_of_work(
+        buffered_repo: BufferedDJRepository, fake_table: FakeRecordTableFacade, computation_record: ComputationRecord
+    ) -> None:
+        with pytest.raises(RuntimeError):
+            with FakeUnitOfWork(buffered_repo) as uow:
+                uow.records.add(computation_record)
+                raise RuntimeError("make failed")
+        buffered_repo.on_commit()
+        buffered_repo.flush()
+        assert buffered_repo.pending == 0
+        assert len(fake_table) == 0
+
+    @staticmethod
+    def test_flushes_when_buffer_is_full(
+        buffered_repo: BufferedDJRepository,
+        fake_table: FakeRecordTableFacade,
+        computation_record: ComputationRecord,
+        other_computation_record: ComputationRecord,
+    ) -> None:
+        commit_records(buffered_repo, computation_record)
+        commit_records(buffered_repo, other_computation_record)
+        assert len(fake_table) == 2
+        assert buffered_repo.pending == 0
+
+    @staticmethod
+    def test_flushes_when_oldest_record_is_too_old(
+        buffered_repo: BufferedDJRepository,
+        fake_table: FakeRecordTableFacade,
+        clock: FakeClock,
+        computation_record: ComputationRecord,
+        other_computation_record: ComputationRecord,
+    ) -> None:
+        commit_records(buffered_repo, computation_record)
+        clock.now = 10
+        commit_records(buffered_repo, other_computation_record)
+        assert len(fake_table) == 2
+
+    @staticmethod
+    def test_flush_writes_buffered_records(
+        buffered_repo: BufferedDJRepository,
+        fake_table: FakeRecordTableFacade,
+        primary: PrimaryKey,
+        computation_record: ComputationRecord,
+        dj_comp_rec: DJComputationRecord,
+    ) -> None:
+        commit_records(buffered_repo, computation_record)
+        buffered_repo.flush()
+        assert fake_table.get(primary) == dj_comp_rec
+
+    @staticmethod
+    def test_raises_error_if_already_buffered(
+        buffered_repo: BufferedDJRepository, computation_record: ComputationRecord
+    ) -> None:
+        commit_records(buffered_repo, computation_record)
+        with pytest.raises(ValueError, match="already exists!"):
+            buffered_repo.add(computation_record)
+
+    @staticmethod
+    def test_raises_error_if_already_persisted(
+        buffered_repo: BufferedDJRepository,
+        fake_table: FakeRecordTableFacade,
+        computation_record: ComputationRecord,
+        dj_comp_rec: DJComputationRecord,
+    ) -> None:
+        fake_table.add(dj_comp_rec)
+        with pytest.raises(ValueError, match="already exists!"):
+            buffered_repo.add(computation_record)
+
+    @staticmethod
+    def test_flush_discards_records_that_were_persisted_meanwhile(
+        buffered_repo: BufferedDJRepository,
+        fake_table: FakeRecordTableFacade,
+        computation_record: ComputationRecord,
+        dj_comp_rec: DJComputationRecord,
+    ) -> None:
+        commit_records(buffered_repo, computation_record)
+        fake_table.add(dj_comp_rec)
+        with pytest.raises(ValueError, match="already exists!"):
+            buffered_repo.flush()
+        assert buffered_repo.pending == 0
+
+    @staticmethod
+    def test_failing_flush_keeps_records_buffered(
+        translator: FakeTranslator, computation_record: ComputationRecord, identifier: Identifier
+    ) -> None:
+        table = FailingTable(failures=1)
+        repo = BufferedDJRepository(translator, table)
+        commit_records(repo, computation_record)
+        with pytest.raises(RuntimeError):
+            repo.flush()
+        assert repo.pending == 1
+        repo.flush()
+        assert list(table) == [translator.to_external(identifier)]
+
+    @staticmethod
+    def test_rolled_back_flush_buffers_records_again(
+        buffered_repo: BufferedDJRepository, computation_record: ComputationRecord, identifier: Identifier
+    ) -> None:
+        commit_records(buffered_repo, computation_record)
+        with FakeUnitOfWork(buffered_repo):
+            buffered_repo.flush()
+            assert buffered_repo.pending == 0
+        assert buffered_repo.pending == 1
+        assert buffered_repo.get(identifier) == computation_record
+
+    @staticmethod
+    def test_failing_flush_of_full_buffer_does_not_fail_committing_unit_of_work(
+        translator: FakeTranslator,
+        computation_record: ComputationRecord,
+        other_computation_record: ComputationRecord,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        repo = BufferedDJRepository(translator, FailingTable(failures=1), max_records=2)
+        commit_records(repo, computation_record, other_computation_record)
+        assert repo.pending == 2
+        assert "Failed to flush buffered records" in caplog.text
+
+    @staticmethod
+    def test_gets_buffered_record(
+        buffered_repo: BufferedDJRepository, computation_record: ComputationRecord, identifier: Identifier
+    ) -> None:
+        commit_records(buffered_repo, computation_record)
+        assert buffered_repo.get(identifier) == computation_record
+
+    @staticmethod
+    def test_get_many_includes_buffered_records(
+        buffered_repo: BufferedDJRepository,
+        computation_record: ComputationRecord,
+        other_computation_record: ComputationRecord,
+    ) -> None:
+        commit_records(buffered_repo, computation_record)
+        buffered_repo.flush()
+        commit_records(buffered_repo, other_computation_record)
+        identifiers = [other_computation_record.identifier, computation_record.identifier]
+        assert list(buffered_repo.get_many(identifiers)) == [other_computation_record, computation_record]
+
+    @staticmethod
+    def test_iteration_includes_buffered_records(
+        buffered_repo: BufferedDJRepository,
+        computation_record: ComputationRecord,
+        other_computation_record: ComputationRecord,
+    ) -> None:
+        commit_records(buffered_repo, computation_record)
+        buffered_repo.flush()
+        commit_records(buffered_repo, other_computation_record)
+        assert list(iter(buffered_repo)) == [computation_record.identifier, other_computation_record.identifier]
+        assert len(buffered_repo) == 2
+
+    @staticmethod
+    def test_find_includes_buffered_records(
+        buffered_repo: BufferedDJRepository,
+        computation_record: ComputationRecord,
+        other_computation_record: ComputationRecord,
+    ) -> None:
+        commit_records(buffered_repo, computation_record)
+        buffered_repo.flush()
+        commit_records(buffered_repo, other_computation_record)
+        identifiers = [computation_record.identifier, other_computation_record.identifier]
+        assert list(buffered_repo.find([Requirement("dist1")])) == identifiers
+
+    @staticmethod
+    @pytest.fixture
+    def connection(create_fake_connection: Callable[[], FakeConnection]) -> Connection:
+        return Connection(create_fake_connection)
+
+    @staticmethod
+    def test_flushes_full_buffer_in_own_unit_of_work(
+        translator: FakeTranslator,
+        fake_table: FakeRecordTableFacade,
+        connection: Connection,
+        computation_record: ComputationRecord,
+    ) -> None:
+        repo = BufferedDJRepository(translator, fake_table, connection, max_records=1)
+        commit_records(repo, computation_record)
+        assert wait_until(lambda: len(fake_table) == 1 and repo.pending == 0)
+
+    @staticmethod
+    def test_flushes_on_timeout_without_further_records(
+        translator: FakeTranslator,
+        fake_table: FakeRecordTableFacade,
+        connection: Connection,
+        computation_record: ComputationRecord,
+    ) -> None:
+        repo = BufferedDJRepository(translator, fake_table, connection, max_records=2, max_seconds=0.01)
+        commit_records(repo, computation_record)
+        assert wait_until(lambda: len(fake_table) == 1 and repo.pending == 0)
+
+    @staticmethod
+    def test_logs_errors_of_background_flush_and_keeps_records(
+        translator: FakeTranslator,
+        connection: Connection,
+        computation_record: ComputationRecord,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        table = FailingTable(failures=1)
+        repo = BufferedDJRepository(translator, table, connection, max_records=2, max_seconds=0.01)
+        commit_records(repo, computation_record)
+        assert wait_until(lambda: "Failed to flush buffered records" in caplog.text)
+        assert wait_until(lambda: len(table) == 1 and repo.pending == 0)
+
+    @staticmethod
+    def test_flush_at_exit_commits_buffered_records(
+        buffered_repo: BufferedDJRepository, fake_table: FakeRecordTableFacade, computation_record: ComputationRecord
+    ) -> None:
+        uow = FakeUnitOfWork(buffered_repo)
+        commit_records(buffered_repo, computation_record)
+        flush_at_exit(uow, buffered_repo)
+        assert len(fake_table) == 1
+        assert uow.committed
+
+    @staticmethod
+    def test_max_records_must_be_positive(
+        fake_translator_factory: FakeTranslatorFactory, fake_table: FakeRecordTableFacade
+    ) -> None:
+        with pytest.raises(ValueError, match="at least one"):
+            BufferedDJRepository(fake_translator_factory(), fake_table, max_records=0)
+
+    @staticmethod
+    def test_repr(buffered_repo: BufferedDJRepository) -> None:
+        assert repr(buffered_repo) == (
+            "BufferedDJRepository(translator=FakeTranslator(), table=FakeRecordTableFacade(), "
+            "connection=None, max_records=2, max_seconds=10)"
+        )
+
+
+class BlockingUnitOfWork(FakeUnitOfWork):
+    def __init__(self, records: Repository) -> None:
+        super().__init__(records)
+        self.release = threading.Event()
+
+    def __enter__(self) -> BlockingUnitOfWork:
+        self.release.wait()
+        return super().__enter__()
+
+
+class TestWriteBehindDJRepository:
+    @staticmethod
+    @pytest.fixture
+    def translator(
+        fake_translator_factory: FakeTranslatorFactory, identifier: Identifier, primary: PrimaryKey
+    ) -> FakeTranslator:
+        return fake_translator_factory(
+            {identifier: primary, Identifier("other"): {"a": 1, "b": 1}, Identifier("third"): {"a": 2, "b": 2}}
+        )
+
+    @staticmethod
+    @pytest.fixture
+    def writer(translator: FakeTranslator, fake_table: FakeRecordTableFacade) -> BlockingUnitOfWork:
+        return BlockingUnitOfWork(DJRepository(translator, fake_table))
+
+    @staticmethod
+    @pytest.fixture
+    def write_behind_repo(
+        translator: FakeTranslator, fake_table: FakeRecordTableFacade, writer: BlockingUnitOfWork
+    ) -> Iterator[WriteBehindDJRepository]:
+        repo = WriteBehindDJRepository(translator, fake_table, writer, max_pending=1)
+        yield repo
+        writer.release.set()
+        repo.close()
+
+    @staticmethod
+    @pytest.fixture
+    def other_computation_record(computation_record: ComputationRecord) -> ComputationRecord:
+        return ComputationRecord(Identifier("other"), computation_record.distributions)
+
+    @staticmethod
+    def test_writes_records_in_background(
+        write_behind_repo: WriteBehindDJRepository,
+        writer: BlockingUnitOfWork,
+        fake_table: FakeRecordTableFacade,
+        primary: PrimaryKey,
+        computation_record: ComputationRecord,
+        dj_comp_rec: DJComputationRecord,
+    ) -> None:
+        commit_records(write_behind_repo, computation_record)
+        assert len(fake_table) == 0
+        writer.release.set()
+        write_behind_repo.flush()
+        assert fake_table.get(primary) == dj_comp_rec
+        assert writer.committed
+        assert write_behind_repo.pending == 0
+
+    @staticmethod
+    def test_writes_records_whose_primary_key_was_evicted_from_translator(
+        fake_table: FakeRecordTableFacade,
+        identifier: Identifier,
+        primary: PrimaryKey,
+        computation_record: ComputationRecord,
+        dj_comp_rec: DJComputationRecord,
+    ) -> None:
+        internal_to_external = {identifier: primary}
+        translator = FakeTranslator(internal_to_external)
+        writer = BlockingUnitOfWork(DJRepository(translator, fake_table))
+        repo = WriteBehindDJRepository(translator, fake_table, writer)
+        commit_records(repo, computation_record)
+        internal_to_external.clear()
+        assert repo.get(identifier) == computation_record
+        writer.release.set()
+        repo.close()
+        assert fake_table.get(primary) == dj_comp_rec
+        assert not repo.failed
+
+    @staticmethod
+    def test_gets_queued_record(
+        write_behind_repo: WriteBehindDJRepository, computation_record: ComputationRecord, identifier: Identifier
+    ) -> None:
+        commit_records(write_behind_repo, computation_record)
+        assert write_behind_repo.get(identifier) == computation_record
+        assert list(iter(write_behind_repo)) == [identifier]
+        assert len(write_behind_repo) == 1
+
+    @staticmethod
+    def test_get_many_includes_queued_records(
+        write_behind_repo: WriteBehindDJRepository, computation_record: ComputationRecord, identifier: Identifier
+    ) -> None:
+        commit_records(write_behind_repo, computation_record)
+        assert list(write_behind_repo.get_many([identifier])) == [computation_record]
+
+    @staticmethod
+    def test_find_includes_queued_records(
+        write_behind_repo: WriteBehindDJRepository, computation_record: ComputationRecord, identifier: Identifier
+    ) -> None:
+        commit_records(write_behind_repo, computation_record)
+        assert list(write_behind_repo.find([Requirement("dist1")])) == [identifier]
+        assert not list(write_behind_repo.find([Requirement("dist3")]))
+
+    @staticmethod
+    def test_raises_error_if_already_queued(
+        write_behind_repo: WriteBehindDJRepository, computation_record: ComputationRecord
+    ) -> None:
+        commit_records(write_behind_repo, computation_record)
+        with pytest.raises(ValueError, match="already exists!"):
+            write_behind_repo.add(computation_record)
+
+    @staticmethod
+    def test_queues_records_only_once_unit_of_work_commits(
+        write_behind_repo: WriteBehindDJRepository, computation_record: ComputationRecord
+    ) -> None:
+        write_behind_repo.add(computation_record)
+        assert write_behind_repo.pending == 0
+        write_behind_repo.on_commit()
+        assert write_behind_repo.pending == 1
+
+    @staticmethod
+    def test_discards_records_of_make_that_fails_after_recording(
+        write_behind_repo: WriteBehindDJRepository,
+        writer: BlockingUnitOfWork,
+        fake_table: FakeRecordTableFacade,
+        computation_record: ComputationRecord,
+    ) -> None:
+        with pytest.raises(RuntimeError):
+            with FakeUnitOfWork(write_behind_repo) as uow:
+                uow.records.add(computation_record)
+                raise RuntimeError("make failed")
+        write_behind_repo.on_commit()
+        writer.release.set()
+        write_behind_repo.flush()
+        assert write_behind_repo.pending == 0
+        assert len(fake_table) == 0
+        assert not writer.committed
+
+    @staticmethod
+    def test_blocks_while_queue_is_full(
+        write_behind_repo: WriteBehindDJRepository,
+        writer: BlockingUnitOfWork,
+        computation_record: ComputationRecord,
+        other_computation_record: ComputationRecord,
+    ) -> None:
+        commit_records(write_behind_repo, computation_record)
+        commit_records(write_behind_repo, other_computation_record)
+        third = ComputationRecord(Identifier("third"), computation_record.distributions)
+        adding = threading.Thread(target=commit_records, args=(write_behind_repo, third))
+        adding.start()
+        adding.join(timeout=0.1)
+        assert adding.is_alive()
+        writer.release.set()
+        adding.join()
+        write_behind_repo.flush()
+        assert write_behind_repo.pending == 0
+
+    @staticmethod
+    def test_collects_records_that_failed_to_persist(
+        write_behind_repo: WriteBehindDJRepository,
+        writer: BlockingUnitOfWork,
+        fake_table: FakeRecordTableFacade,
+        computation_record: ComputationRecord,
+        dj_comp_rec: DJComputationRecord,
+        identifier: Identifier,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        fake_table.add(dj_comp_rec)
+        commit_records(write_behind_repo, computation_record)
+        writer.release.set()
+        write_behind_repo.flush()
+        assert [f.identifier for f in write_behind_repo.failed] == [identifier]
+        assert isinstance(write_behind_repo.failed[0], FailedRecord)
+        assert f"Failed to persist record with identifier '{identifier}'" in caplog.text
+
+    @staticmethod
+    def test_close_writes_queued_records(
+        write_behind_repo: WriteBehindDJRepository,
+        writer: BlockingUnitOfWork,
+        fake_table: FakeRecordTableFacade,
+        computation_record: ComputationRecord,
+    ) -> None:
+        commit_records(write_behind_repo, computation_record)
+        writer.release.set()
+        write_behind_repo.close()
+        assert len(fake_table) == 1
+
+    @staticmethod
+    def test_max_pending_must_be_positive(
+        translator: FakeTranslator, fake_table: FakeRecordTableFacade, writer: BlockingUnitOfWork
+    ) -> None:
+        with pytest.raises(ValueError, match="at least one"):
+            WriteBehindDJRepository(translator, fake_table, writer, max_pending=0)
+
+    @staticmethod
+    def test_repr(write_behind_repo: WriteBehindDJRepository) -> None:
+        assert repr(write_behind_repo) == (
+            "WriteBehindDJRepository(translator=FakeTranslator(), table=FakeRecordTableFacade(), "
+            "writer=BlockingUnitOfWork(), connection=None, max_pending=1)"
+        )
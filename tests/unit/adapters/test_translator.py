@@ -1,9 +1,24 @@
+import hashlib
+import json
+from typing import Dict, Iterable, Iterator, List, Sequence
+
 import pytest
 
-from compenv.adapters.translator import DJTranslator, blake2b
+from compenv.adapters.abstract import AbstractConnection, AbstractTransaction
+from compenv.adapters.entity import DJComputationRecord
+from compenv.adapters.translator import (
+    DJTranslator,
+    TableLookup,
+    TranslatorStats,
+    blake2b,
+    blake2b_many,
+    canonical_json,
+)
 from compenv.model.record import Identifier
 from compenv.types import PrimaryKey
 
+from .conftest import FakeRecordTableFacade
+
 
 class TestDJTranslator:
     @staticmethod
@@ -32,6 +47,197 @@ class TestDJTranslator:
         assert translator.to_external(identifier) == orig_primary
 
 
+class FakeFallback:
+    def __init__(self, primaries: List[PrimaryKey]) -> None:
+        self.primaries = primaries
+        self.calls: List[Sequence[Identifier]] = []
+
+    def __call__(self, identifiers: Sequence[Identifier]) -> Dict[Identifier, PrimaryKey]:
+        self.calls.append(identifiers)
+        return {blake2b(p): p for p in self.primaries if blake2b(p) in identifiers}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}()"
+
+
+class TestDJTranslatorCache:
+    @staticmethod
+    @pytest.fixture
+    def primaries() -> List[PrimaryKey]:
+        return [{"a": i} for i in range(3)]
+
+    @staticmethod
+    @pytest.fixture
+    def fallback(primaries: List[PrimaryKey]) -> FakeFallback:
+        return FakeFallback(primaries)
+
+    @staticmethod
+    @pytest.fixture
+    def translator(fallback: FakeFallback) -> DJTranslator:
+        return DJTranslator(blake2b, capacity=2, fallback=fallback)
+
+    @staticmethod
+    def test_evicts_least_recently_used_primary_key(primaries: List[PrimaryKey]) -> None:
+        translator = DJTranslator(blake2b, capacity=2)
+        identifiers = [translator.to_internal(p) for p in primaries[:2]]
+        translator.to_external(identifiers[0])
+        translator.to_internal(primaries[2])
+        assert translator.to_external(identifiers[0]) == primaries[0]
+        with pytest.raises(KeyError):
+            translator.to_external(identifiers[1])
+
+    @staticmethod
+    def test_looks_up_evicted_primary_key_using_fallback(
+        translator: DJTranslator, fallback: FakeFallback, primaries: List[PrimaryKey]
+    ) -> None:
+        identifiers = [translator.to_internal(p) for p in primaries]
+        assert translator.to_external(identifiers[0]) == primaries[0] and fallback.calls == [[identifiers[0]]]
+
+    @staticmethod
+    def test_caches_primary_key_looked_up_using_fallback(
+        translator: DJTranslator, fallback: FakeFallback, primaries: List[PrimaryKey]
+    ) -> None:
+        identifiers = [translator.to_internal(p) for p in primaries]
+        translator.to_external(identifiers[0])
+        translator.to_external(identifiers[0])
+        assert len(fallback.calls) == 1
+
+    @staticmethod
+    def test_translates_many_identifiers_in_order(translator: DJTranslator, primaries: List[PrimaryKey]) -> None:
+        identifiers = [translator.to_internal(p) for p in primaries]
+        assert translator.to_external_many(reversed(identifiers)) == list(reversed(primaries))
+
+    @staticmethod
+    def test_looks_up_all_missing_identifiers_in_one_call(fallback: FakeFallback, primaries: List[PrimaryKey]) -> None:
+        translator = DJTranslator(blake2b, capacity=1, fallback=fallback)
+        identifiers = [translator.to_internal(p) for p in primaries]
+        translator.to_external_many([*identifiers, identifiers[0]])
+        assert fallback.calls == [identifiers[:2]]
+
+    @staticmethod
+    def test_translates_identifiers_unknown_to_the_process(fallback: FakeFallback, primaries: List[PrimaryKey]) -> None:
+        translator = DJTranslator(blake2b, fallback=fallback)
+        assert translator.to_external_many([blake2b(p) for p in primaries]) == primaries
+
+    @staticmethod
+    def test_raises_key_error_if_fallback_does_not_find_primary_key(translator: DJTranslator) -> None:
+        with pytest.raises(KeyError):
+            translator.to_external(Identifier("unknown"))
+
+    @staticmethod
+    def test_stats(translator: DJTranslator, primaries: List[PrimaryKey]) -> None:
+        identifiers = [translator.to_internal(p) for p in primaries]
+        translator.to_external(identifiers[2])
+        translator.to_external(identifiers[0])
+        assert translator.stats == TranslatorStats(hits=1, misses=1, evictions=2)
+
+    @staticmethod
+    def test_hit_rate(translator: DJTranslator, primaries: List[PrimaryKey]) -> None:
+        identifier = translator.to_internal(primaries[0])
+        for _ in range(3):
+            translator.to_external(identifier)
+        with pytest.raises(KeyError):
+            translator.to_external(Identifier("unknown"))
+        assert translator.stats.hit_rate == 0.75
+
+    @staticmethod
+    def test_hit_rate_is_zero_without_lookups() -> None:
+        assert TranslatorStats().hit_rate == 0.0
+
+    @staticmethod
+    def test_raises_error_if_capacity_is_invalid() -> None:
+        with pytest.raises(ValueError, match="capacity must be"):
+            DJTranslator(blake2b, capacity=0)
+
+    @staticmethod
+    def test_repr(translator: DJTranslator) -> None:
+        assert repr(translator).startswith("DJTranslator(to_identifier=<function blake2b") and repr(
+            translator
+        ).endswith("capacity=2, fallback=FakeFallback())")
+
+
+class FakeConnection(AbstractConnection):
+    def __init__(self) -> None:
+        self.opened = 0
+        self._is_open = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._is_open
+
+    def open(self) -> None:
+        self.opened += 1
+        self._is_open = True
+
+    def close(self) -> None:
+        self._is_open = False
+
+    @property
+    def transaction(self) -> AbstractTransaction:
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}()"
+
+
+class IdentifierTable(FakeRecordTableFacade):
+    def __init__(self, primaries: Dict[Identifier, PrimaryKey]) -> None:
+        super().__init__()
+        self.primaries = primaries
+
+    def get_primaries(self, identifiers: Iterable[Identifier], chunk_size: int = 1000) -> Dict[Identifier, PrimaryKey]:
+        return {i: self.primaries[i] for i in identifiers if i in self.primaries}
+
+    def __iter__(self) -> Iterator[PrimaryKey]:
+        raise AssertionError("Table was scanned!")
+
+
+class TestTableLookup:
+    @staticmethod
+    @pytest.fixture
+    def connection() -> FakeConnection:
+        return FakeConnection()
+
+    @staticmethod
+    @pytest.fixture
+    def lookup(fake_table: FakeRecordTableFacade, connection: FakeConnection, primary: PrimaryKey) -> TableLookup:
+        fake_table.add(DJComputationRecord(primary={"a": 1, "b": 1}, distributions=frozenset()))
+        fake_table.add(DJComputationRecord(primary=primary, distributions=frozenset()))
+        return TableLookup(fake_table, connection, blake2b)
+
+    @staticmethod
+    def test_finds_primary_keys_by_scanning_table(lookup: TableLookup, primary: PrimaryKey) -> None:
+        assert lookup([blake2b(primary)]) == {blake2b(primary): primary}
+
+    @staticmethod
+    def test_omits_missing_primary_keys(lookup: TableLookup, primary: PrimaryKey) -> None:
+        assert lookup([blake2b(primary), Identifier("unknown")]) == {blake2b(primary): primary}
+
+    @staticmethod
+    def test_does_not_scan_table_if_all_identifiers_are_stored(connection: FakeConnection, primary: PrimaryKey) -> None:
+        lookup = TableLookup(IdentifierTable({blake2b(primary): primary}), connection, blake2b)
+        assert lookup([blake2b(primary)]) == {blake2b(primary): primary}
+
+    @staticmethod
+    def test_opens_and_closes_connection_if_it_is_closed(
+        lookup: TableLookup, connection: FakeConnection, primary: PrimaryKey
+    ) -> None:
+        lookup([blake2b(primary)])
+        assert connection.opened == 1 and not connection.is_open
+
+    @staticmethod
+    def test_uses_open_connection(lookup: TableLookup, connection: FakeConnection, primary: PrimaryKey) -> None:
+        connection.open()
+        lookup([blake2b(primary)])
+        assert connection.opened == 1 and connection.is_open
+
+    @staticmethod
+    def test_repr(lookup: TableLookup) -> None:
+        assert repr(lookup).startswith(
+            "TableLookup(table=FakeRecordTableFacade(), connection=FakeConnection(), to_identifier=<function blake2b"
+        )
+
+
 class TestBlake2b:
     @staticmethod
     def test_same_primary_key_produces_same_output(primary: PrimaryKey) -> None:
@@ -42,6 +248,31 @@ class TestBlake2b:
         other_primary_key: PrimaryKey = {"a": 0, "b": 2}
         assert blake2b(primary) != blake2b(other_primary_key)
 
+    @staticmethod
+    @pytest.mark.parametrize(
+        "primary",
+        [
+            {},
+            {"a": 0, "b": "text"},
+            {"b": -1.5, "a": 10**30, "c": 1e300},
+            {"name": 'quote " backslash \\ newline \n', "ümlaut": "ü"},
+            {"a": True, "b": None},
+            {"a": float("nan")},
+        ],
+    )
+    def test_encodes_like_json(primary: PrimaryKey) -> None:
+        assert canonical_json(primary) == json.dumps(primary, sort_keys=True)
+
+    @staticmethod
+    def test_identifier_matches_json_based_identifier(primary: PrimaryKey) -> None:
+        expected = hashlib.blake2b(json.dumps(primary, sort_keys=True).encode()).hexdigest()
+        assert blake2b(primary) == expected
+
+    @staticmethod
+    def test_many_produces_same_output(primary: PrimaryKey) -> None:
+        primaries: List[PrimaryKey] = [primary, {"b": 1, "a": 0}, {"c": "x"}]
+        assert blake2b_many(primaries) == [blake2b(p) for p in primaries]
+
     @staticmethod
     def test_order_invariant(primary: PrimaryKey) -> None:
         different_order_primary_key: PrimaryKey = {"b": 1, "a": 0}
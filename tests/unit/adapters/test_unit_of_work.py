@@ -18,6 +18,10 @@ class FakeConnection(AbstractConnection):
     def transaction(self) -> FakeTransaction:
         return self._transaction
 
+    @property
+    def is_open(self) -> bool:
+        return self.is_connected
+
     def open(self) -> None:
         self.is_connected = True
 
@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import ast
+import dataclasses
+import re
+import uuid
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -7,19 +11,23 @@ from typing import (
     ClassVar,
     Dict,
     FrozenSet,
+    Iterable,
     Iterator,
     Mapping,
     MutableMapping,
     Optional,
     Protocol,
+    Sequence,
     Type,
     TypeVar,
     Union,
     cast,
 )
 
+import numpy
 import pytest
 from datajoint.errors import DuplicateError
+from datajoint.user_tables import Part
 
 from compenv.adapters.entity import DJComputationRecord, DJDistribution
 from compenv.infrastructure.types import Connection, ConnInfoDict, Table
@@ -119,6 +127,9 @@ class FakeTranslator:
     def to_external(self, identifier: Identifier) -> PrimaryKey:
         return self._internal_to_external[identifier]
 
+    def to_external_many(self, identifiers: Iterable[Identifier]) -> list[PrimaryKey]:
+        return [self.to_external(i) for i in identifiers]
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}()"
 
@@ -144,6 +155,7 @@ class FakeConnection:
         self.committed = False
         self.is_connected = True
         self.conn_info: ConnInfoDict = {"host": "myhost", "user": "myuser", "passwd": "mypasswd"}
+        self.queries: list[tuple[str, list[Any]]] = []
 
     def start_transaction(self) -> None:
         self._in_transaction = True
@@ -162,6 +174,9 @@ class FakeConnection:
     def close(self) -> None:
         self.is_connected = False
 
+    def query(self, query: str, args: Sequence[Any] = ()) -> None:
+        self.queries.append((query, list(args)))
+
     def __repr__(self) -> str:
         return "FakeConnection()"
 
@@ -180,27 +195,57 @@ def fake_connection(create_fake_connection: Callable[[], FakeConnection]) -> Fak
     return create_fake_connection()
 
 
+def _rows_equal(row: Entity, other: Entity) -> bool:
+    return row.keys() == other.keys() and all(
+        numpy.array_equal(v, other[k]) if isinstance(v, numpy.ndarray) else v == other[k] for k, v in row.items()
+    )
+
+
+@dataclasses.dataclass
+class FakeAttribute:
+    uuid: bool
+    is_blob: bool
+
+
+@dataclasses.dataclass
+class FakeHeading:
+    names: list[str]
+    types: Mapping[str, type] = dataclasses.field(default_factory=dict)
+
+    def __getitem__(self, name: str) -> FakeAttribute:
+        return FakeAttribute(uuid=self.types[name] is uuid.UUID, is_blob=self.types[name] is numpy.ndarray)
+
+
 class FakeTable:
-    attrs: ClassVar[Mapping[str, Union[Type[int], Type[str]]]]
+    attrs: ClassVar[Mapping[str, type]]
+    primary_key: ClassVar[list[str]]
+    full_table_name: ClassVar[str]
     connection: Connection
     database: str
     definition: str
     _data: ClassVar[list[Entity]]
-    _restriction: ClassVar[Entity]
+    _restriction: ClassVar[Optional[list[Entity]]]
+
+    _after: ClassVar[Optional[tuple[list[str], tuple[Any, ...]]]]
 
     @classmethod
     def _restricted_data(cls) -> list[Entity]:
-        if not cls._restriction:
-            return cls._data
-        return [d for d in cls._data if all(i in d.items() for i in cls._restriction.items())]
+        data = cls._data
+        if cls._restriction is not None:
+            restriction = cls._restriction
+            data = [d for d in data if any(all(i in d.items() for i in r.items()) for r in restriction)]
+        if cls._after is not None:
+            names, values = cls._after
+            data = [d for d in data if tuple(d[n] for n in names) > values]
+        return data
 
     @classmethod
-    def insert(cls, entities: Iterator[Entity]) -> None:
+    def insert(cls, entities: Iterable[Entity], skip_duplicates: bool = False) -> None:
         for entity in entities:
-            cls.insert1(entity)
+            cls.insert1(entity, skip_duplicates=skip_duplicates)
 
     @classmethod
-    def insert1(cls, entity: Entity) -> None:
+    def insert1(cls, entity: Entity, skip_duplicates: bool = False) -> None:
         cls._check_attr_names(entity)
 
         for attr_name, attr_value in entity.items():
@@ -210,7 +255,9 @@ class FakeTable:
                     f"for attribute with name {attr_name}, got '{type(attr_value)}'!"
                 )
 
-        if entity in cls._data:
+        if any(_rows_equal(entity, d) for d in cls._data):
+            if skip_duplicates:
+                return
             raise DuplicateError
 
         cls._data.append(dict(entity))
@@ -221,10 +268,15 @@ class FakeTable:
             del cls._data[cls._data.index(entity)]
 
     @classmethod
-    def fetch(cls, as_dict: bool = False) -> list[Entity]:
+    def fetch(
+        cls, as_dict: bool = False, order_by: Optional[Sequence[str]] = None, limit: Optional[int] = None
+    ) -> list[Entity]:
         if as_dict is not True:
             raise ValueError("'as_dict' must be set to 'True' when fetching!")
-        return cls._restricted_data()
+        data = cls._restricted_data()
+        if order_by is not None:
+            data = sorted(data, key=lambda d: tuple(d[n] for n in order_by))
+        return data[:limit]
 
     @classmethod
     def fetch1(cls) -> Entity:
@@ -233,15 +285,53 @@ class FakeTable:
 
         return cls._restricted_data()[0]
 
+    @property
+    def heading(self) -> FakeHeading:
+        return FakeHeading(list(self.attrs), self.attrs)
+
     @classmethod
-    def __and__(cls, restriction: Entity) -> Type[FakeTable]:
-        cls._check_attr_names(restriction)
-        cls._restriction = dict(restriction)
-        return cls
+    def proj(cls, *attributes: str) -> FakeTable:
+        names = [*cls.primary_key, *attributes]
+        projected = cast(Type[FakeTable], type(cls.__name__, (FakeTable,), {}))
+        projected.attrs = {n: t for n, t in cls.attrs.items() if n in names}
+        projected.primary_key = cls.primary_key
+        projected._data = [{n: v for n, v in d.items() if n in names} for d in cls._restricted_data()]
+        return projected()
+
+    @classmethod
+    def __and__(cls, restriction: Union[str, Entity, Sequence[Entity]]) -> FakeTable:
+        if isinstance(restriction, str):
+            match = re.fullmatch(r"\((.+)\) > \((.+)\)", restriction)
+            if not match:
+                raise ValueError(f"Unsupported restriction '{restriction}'!")
+            names = [n.strip("` ") for n in match.group(1).split(",")]
+            cls._after = (names, ast.literal_eval("(" + match.group(2) + ",)"))
+            return cls()
+        restrictions = [restriction] if isinstance(restriction, Mapping) else list(restriction)
+        for restriction in restrictions:
+            cls._check_attr_names(restriction)
+        cls._restriction = [dict(r) for r in restrictions]
+        cls._after = None
+        return cls()
+
+    @classmethod
+    def __mul__(cls, other: FakeTable) -> FakeTable:
+        joined = cast(Type[FakeTable], type(cls.__name__, (FakeTable,), {}))
+        joined.attrs = {**cls.attrs, **other.attrs}
+        common = cls.attrs.keys() & other.attrs.keys()
+        joined._data = [
+            {**d, **o}
+            for d in cls._restricted_data()
+            for o in other._restricted_data()
+            if all(d[n] == o[n] for n in common)
+        ]
+        return joined()
 
     @classmethod
     def __contains__(cls, item: object) -> bool:
-        return item in cls._restricted_data()
+        if not isinstance(item, Mapping):
+            return False
+        return any(all(i in d.items() for i in item.items()) for d in cls._restricted_data())
 
     @classmethod
     def __eq__(cls, other: object) -> bool:
@@ -263,8 +353,10 @@ class FakeTable:
         return f"{cls.__name__}()"
 
     def __init_subclass__(cls) -> None:
+        cls.full_table_name = f"`schema`.`{cls.__name__}`"
         cls._data = []
-        cls._restriction = {}
+        cls._restriction = None
+        cls._after = None
 
     @classmethod
     def _check_attr_names(cls, attr_names: Mapping[str, Any]) -> None:
@@ -310,6 +402,9 @@ class FakeSchema:
         self.decorated_tables[cls.__name__] = cls
         cls.database = self.database
         cls.connection = self.connection
+        for attr in vars(cls).values():
+            if isinstance(attr, type) and issubclass(attr, Part):
+                attr.connection = self.connection
         return cls
 
     def spawn_missing_classes(self, context: MutableMapping[str, object]) -> None:
@@ -1,9 +1,17 @@
-from typing import Optional
+import threading
+from typing import List, Optional
 from unittest.mock import MagicMock
 
 import pytest
 
-from compenv.infrastructure.connection import Connection, DJConnectionFactory
+from compenv.infrastructure.connection import (
+    Connection,
+    ConnectionPool,
+    DJConnectionFactory,
+    JoinedConnection,
+    PooledConnection,
+    PoolStats,
+)
 
 from ..conftest import FakeConnection
 
@@ -11,6 +19,7 @@ from ..conftest import FakeConnection
 class FakeConnectionFactory:
     def __init__(self) -> None:
         self._fake_connection: Optional[FakeConnection] = None
+        self.created: List[FakeConnection] = []
 
     @property
     def fake_connection(self) -> FakeConnection:
@@ -20,6 +29,7 @@ class FakeConnectionFactory:
 
     def __call__(self) -> FakeConnection:
         self._fake_connection = FakeConnection()
+        self.created.append(self._fake_connection)
         return self.fake_connection
 
     def __repr__(self) -> str:
@@ -80,11 +90,270 @@ class TestConnectionFacade:
         with connection:
             assert connection.dj_connection
 
+    @staticmethod
+    def test_threads_use_their_own_connection(connection: Connection) -> None:
+        dj_connections: List[object] = []
+        opened, closed = threading.Event(), threading.Event()
+
+        def use_connection() -> None:
+            with connection:
+                dj_connections.append(connection.dj_connection)
+                opened.set()
+                closed.wait()
+
+        thread = threading.Thread(target=use_connection)
+        thread.start()
+        opened.wait()
+        with connection:
+            dj_connections.append(connection.dj_connection)
+            closed.set()
+            thread.join()
+            assert connection.dj_connection is dj_connections[1]
+        assert dj_connections[0] is not dj_connections[1]
+
+    @staticmethod
+    def test_shared_function_uses_connection_of_sharing_thread_in_other_thread(connection: Connection) -> None:
+        dj_connections: List[object] = []
+
+        def use_connection() -> None:
+            dj_connections.append(connection.dj_connection)
+
+        with connection:
+            thread = threading.Thread(target=connection.shared(use_connection))
+            thread.start()
+            thread.join()
+            assert dj_connections == [connection.dj_connection]
+
+    @staticmethod
+    def test_shared_connection_is_released_after_call(connection: Connection) -> None:
+        with connection:
+            shared = connection.shared(lambda: connection.is_open)
+        assert shared() and not connection.is_open
+
+    @staticmethod
+    def test_can_not_share_if_not_connected(connection: Connection) -> None:
+        with pytest.raises(RuntimeError, match="Not connected"):
+            connection.shared(lambda: None)
+
     @staticmethod
     def test_repr(connection: Connection) -> None:
         assert repr(connection) == "Connection(factory=FakeConnectionFactory())"
 
 
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestConnectionPool:
+    @staticmethod
+    @pytest.fixture
+    def clock() -> FakeClock:
+        return FakeClock()
+
+    @staticmethod
+    @pytest.fixture
+    def pool(fake_connection_factory: FakeConnectionFactory, clock: FakeClock) -> ConnectionPool:
+        return ConnectionPool(fake_connection_factory, max_size=2, idle_timeout=10, clock=clock)
+
+    @staticmethod
+    def test_reuses_released_connection(pool: ConnectionPool) -> None:
+        first = pool.acquire()
+        pool.release(first)
+        assert pool.acquire() is first
+        assert pool.stats == PoolStats(checkouts=2, handshakes=1, discarded=0)
+        assert pool.stats.saved_handshakes == 1
+
+    @staticmethod
+    def test_opens_new_connection_if_all_are_checked_out(
+        pool: ConnectionPool, fake_connection_factory: FakeConnectionFactory
+    ) -> None:
+        assert pool.acquire() is not pool.acquire()
+        assert len(fake_connection_factory.created) == 2
+
+    @staticmethod
+    def test_replaces_dead_connection(pool: ConnectionPool, fake_connection_factory: FakeConnectionFactory) -> None:
+        first = pool.acquire()
+        pool.release(first)
+        fake_connection_factory.created[0].is_connected = False
+        assert pool.acquire() is not first
+        assert pool.stats.discarded == 1
+
+    @staticmethod
+    def test_closes_connections_idle_for_too_long(
+        pool: ConnectionPool, fake_connection_factory: FakeConnectionFactory, clock: FakeClock
+    ) -> None:
+        pool.release(pool.acquire())
+        clock.now = 11
+        pool.acquire()
+        assert not fake_connection_factory.created[0].is_connected
+        assert len(fake_connection_factory.created) == 2
+
+    @staticmethod
+    def test_keeps_min_size_idle_connections(fake_connection_factory: FakeConnectionFactory, clock: FakeClock) -> None:
+        pool = ConnectionPool(fake_connection_factory, min_size=1, idle_timeout=10, clock=clock)
+        first = pool.acquire()
+        pool.release(first)
+        clock.now = 11
+        assert pool.acquire() is first
+
+    @staticmethod
+    def test_first_checkout_opens_min_size_connections(fake_connection_factory: FakeConnectionFactory) -> None:
+        pool = ConnectionPool(fake_connection_factory, min_size=2, max_size=3)
+        first = pool.acquire()
+        assert len(fake_connection_factory.created) == 2
+        assert pool.acquire() is not first
+        assert len(fake_connection_factory.created) == 2
+        assert pool.stats == PoolStats(checkouts=2, handshakes=2, discarded=0)
+
+    @staticmethod
+    def test_closes_expired_connections_without_holding_lock(clock: FakeClock) -> None:
+        unlocked: List[bool] = []
+
+        class LockCheckingConnection(FakeConnection):
+            def close(self) -> None:
+                def check() -> None:
+                    acquired = pool._condition.acquire(timeout=1)  # pylint: disable=protected-access
+                    unlocked.append(acquired)
+                    if acquired:
+                        pool._condition.release()  # pylint: disable=protected-access
+
+                thread = threading.Thread(target=check)
+                thread.start()
+                thread.join()
+                super().close()
+
+        pool = ConnectionPool(LockCheckingConnection, idle_timeout=10, clock=clock)
+        pool.release(pool.acquire())
+        clock.now = 11
+        pool.release(pool.acquire())
+        assert unlocked == [True]
+
+    @staticmethod
+    def test_cancels_transaction_on_release(pool: ConnectionPool) -> None:
+        dj_connection = pool.acquire()
+        dj_connection.start_transaction()
+        pool.release(dj_connection)
+        assert not dj_connection.in_transaction
+
+    @staticmethod
+    def test_blocks_while_max_size_connections_are_checked_out(pool: ConnectionPool) -> None:
+        first = pool.acquire()
+        pool.acquire()
+        acquired = threading.Event()
+
+        def acquire() -> None:
+            pool.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        assert not acquired.wait(0.05)
+        pool.release(first)
+        thread.join()
+        assert acquired.is_set()
+
+    @staticmethod
+    def test_close_closes_idle_connections(pool: ConnectionPool) -> None:
+        dj_connection = pool.acquire()
+        pool.release(dj_connection)
+        pool.close()
+        assert not dj_connection.is_connected
+
+    @staticmethod
+    @pytest.mark.parametrize("min_size,max_size", [(0, 0), (-1, 1), (2, 1)])
+    def test_raises_error_if_sizes_are_invalid(
+        fake_connection_factory: FakeConnectionFactory, min_size: int, max_size: int
+    ) -> None:
+        with pytest.raises(ValueError, match="must be"):
+            ConnectionPool(fake_connection_factory, min_size=min_size, max_size=max_size)
+
+    @staticmethod
+    def test_repr(pool: ConnectionPool) -> None:
+        assert repr(pool) == (
+            "ConnectionPool(factory=FakeConnectionFactory(), min_size=0, max_size=2, idle_timeout=10)"
+        )
+
+
+class TestPooledConnection:
+    @staticmethod
+    @pytest.fixture
+    def pool_connection(fake_connection_factory: FakeConnectionFactory) -> PooledConnection:
+        return PooledConnection(ConnectionPool(fake_connection_factory))
+
+    @staticmethod
+    def test_reuses_connection_across_contexts(pool_connection: PooledConnection) -> None:
+        with pool_connection:
+            first = pool_connection.dj_connection
+        with pool_connection:
+            assert pool_connection.dj_connection is first
+        assert pool_connection.pool.stats.saved_handshakes == 1
+
+    @staticmethod
+    def test_accessing_dj_connection_after_closing_raises_error(pool_connection: PooledConnection) -> None:
+        with pool_connection:
+            pass
+        with pytest.raises(RuntimeError, match="Not connected"):
+            pool_connection.dj_connection
+
+    @staticmethod
+    def test_repr(pool_connection: PooledConnection) -> None:
+        assert repr(pool_connection) == (
+            "PooledConnection(pool=ConnectionPool(factory=FakeConnectionFactory(), min_size=0, max_size=4, "
+            "idle_timeout=300.0))"
+        )
+
+
+class TestJoinedConnection:
+    @staticmethod
+    @pytest.fixture
+    def connection(fake_connection: FakeConnection) -> JoinedConnection:
+        return JoinedConnection(lambda: fake_connection)
+
+    @staticmethod
+    def test_uses_connection_of_factory(connection: JoinedConnection, fake_connection: FakeConnection) -> None:
+        with connection:
+            assert connection.dj_connection is fake_connection
+
+    @staticmethod
+    def test_does_not_close_connection(connection: JoinedConnection, fake_connection: FakeConnection) -> None:
+        with connection:
+            pass
+        assert fake_connection.is_connected
+
+    @staticmethod
+    def test_joins_transaction_in_progress(connection: JoinedConnection, fake_connection: FakeConnection) -> None:
+        fake_connection.start_transaction()
+        with connection:
+            connection.transaction.start()
+            connection.transaction.commit()
+        assert fake_connection.in_transaction
+        assert not fake_connection.committed
+
+    @staticmethod
+    def test_does_not_roll_back_joined_transaction(
+        connection: JoinedConnection, fake_connection: FakeConnection
+    ) -> None:
+        fake_connection.start_transaction()
+        with connection:
+            connection.transaction.start()
+            connection.transaction.rollback()
+        assert fake_connection.in_transaction
+
+    @staticmethod
+    def test_starts_own_transaction_if_none_is_in_progress(
+        connection: JoinedConnection, fake_connection: FakeConnection
+    ) -> None:
+        with connection:
+            connection.transaction.start()
+            assert fake_connection.in_transaction
+            connection.transaction.commit()
+        assert fake_connection.committed
+
+
 class TestConnectionFactory:
     @staticmethod
     @pytest.fixture
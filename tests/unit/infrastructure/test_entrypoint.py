@@ -75,15 +75,24 @@ class TestReplacedConnectionTable:
     ) -> None:
         fake_autopopulated_table.connection = create_fake_connection()
         temp_connection = create_fake_connection()
-        with replaced_connection_table(fake_autopopulated_table(), temp_connection):
-            assert fake_autopopulated_table.connection is temp_connection
+        with replaced_connection_table(fake_autopopulated_table(), temp_connection) as replaced:
+            assert replaced.connection is temp_connection
 
     @staticmethod
-    def test_original_connection_is_restored(
+    def test_connection_of_table_class_is_not_replaced(
         fake_autopopulated_table: Type[FakeAutopopulatedTable], create_fake_connection: Callable[[], FakeConnection]
     ) -> None:
         original_connection = create_fake_connection()
         fake_autopopulated_table.connection = original_connection
         with replaced_connection_table(fake_autopopulated_table(), create_fake_connection()):
-            pass
-        assert fake_autopopulated_table.connection is original_connection
+            assert fake_autopopulated_table.connection is original_connection
+
+    @staticmethod
+    def test_connection_of_table_is_not_replaced(
+        fake_autopopulated_table: Type[FakeAutopopulatedTable], create_fake_connection: Callable[[], FakeConnection]
+    ) -> None:
+        original_connection = create_fake_connection()
+        fake_autopopulated_table.connection = original_connection
+        table = fake_autopopulated_table()
+        with replaced_connection_table(table, create_fake_connection()):
+            assert table.connection is original_connection
@@ -1,16 +1,38 @@
 from __future__ import annotations
 
 import dataclasses
-from typing import TYPE_CHECKING, Type
+import datetime
+import threading
+import uuid
+from typing import TYPE_CHECKING, Any, Callable, List, Sequence, Type, cast
 
+import numpy
 import pytest
+from datajoint import blob
+from datajoint.errors import DuplicateError
 from datajoint.user_tables import Lookup, Part
 
 from compenv.adapters.abstract import PartEntity
-from compenv.adapters.entity import DJComputationRecord
-from compenv.infrastructure.table import Table, TableFactory
+from compenv.adapters.entity import DJComputationRecord, DJDistribution, DJDistributionBlob, DJInternedDistribution
+from compenv.infrastructure.table import (
+    BlobTable,
+    BlobTableFactory,
+    InternedTable,
+    InternedTableFactory,
+    SnapshotTable,
+    SnapshotTableFactory,
+    Table,
+    TableFactory,
+    _after,
+    decode_distributions,
+    distribution_id,
+    encode_distributions,
+    insert_rows,
+    snapshot_hash,
+)
+from compenv.model.record import Identifier
 
-from ..conftest import FakeSchema, FakeTable
+from ..conftest import FakeConnection, FakeHeading, FakeSchema, FakeTable
 
 if TYPE_CHECKING:
     from datajoint.table import Entity
@@ -19,8 +41,10 @@ if TYPE_CHECKING:
 class FakeFactory:
     def __init__(self, table: FakeTable) -> None:
         self.table = table
+        self.n_calls = 0
 
     def __call__(self) -> FakeTable:
+        self.n_calls += 1
         return self.table
 
     def __repr__(self) -> str:
@@ -33,6 +57,7 @@ class TestTable:
     def fake_tbl() -> FakeTable:
         class FakeRecordTable(FakeTable):
             attrs = {"a": int, "b": int}
+            primary_key = ["a", "b"]
 
             class Module(FakeTable):
                 attrs = {"a": int, "b": int, "module_file": str, "module_is_active": str}
@@ -93,6 +118,21 @@ class TestTable:
         table.add(dj_comp_rec)
         assert table.get(dj_comp_rec.primary) == dj_comp_rec
 
+    @staticmethod
+    def test_get_queries_only_part_tables_if_record_has_parts(
+        table: Table, dj_comp_rec: DJComputationRecord, fake_factory: FakeFactory
+    ) -> None:
+        table.add(dj_comp_rec)
+        fake_factory.n_calls = 0
+        table.get(dj_comp_rec.primary)
+        assert fake_factory.n_calls == len(DJComputationRecord.parts)
+
+    @staticmethod
+    def test_get_dj_computation_record_without_parts(table: Table, primary: Entity) -> None:
+        dj_comp_rec = DJComputationRecord(primary=primary, distributions=frozenset())
+        table.add(dj_comp_rec)
+        assert table.get(primary) == dj_comp_rec
+
     @staticmethod
     def test_length(table: Table, dj_comp_rec: DJComputationRecord) -> None:
         table.add(dj_comp_rec)
@@ -103,22 +143,701 @@ class TestTable:
         table.add(dj_comp_rec)
         assert list(iter(table)) == list(iter(fake_tbl))
 
+    @staticmethod
+    def test_add_many_inserts_all_records(table: Table, dj_comp_rec: DJComputationRecord) -> None:
+        other = DJComputationRecord(primary={"a": 1, "b": 1}, distributions=frozenset())
+        table.add_many([dj_comp_rec, other])
+        assert [table.get(r.primary) for r in (dj_comp_rec, other)] == [dj_comp_rec, other]
+
+    @staticmethod
+    def test_add_many_raises_error_if_one_record_already_exists(table: Table, dj_comp_rec: DJComputationRecord) -> None:
+        table.add(dj_comp_rec)
+        other = DJComputationRecord(primary={"a": 1, "b": 1}, distributions=frozenset())
+        with pytest.raises(ValueError, match="One of the computation records .* already exists!"):
+            table.add_many([other, dj_comp_rec])
+
     @staticmethod
     def test_repr(table: Table) -> None:
-        assert repr(table) == "Table(factory=FakeFactory())"
+        assert repr(table) == "Table(factory=FakeFactory(), fast_insert=False)"
+
+
+class DuplicateRaisingConnection(FakeConnection):
+    def query(self, query: str, args: Sequence[Any] = ()) -> None:
+        raise DuplicateError
+
+
+class TestInsertRows:
+    @staticmethod
+    @pytest.fixture
+    def fake_tbl(fake_connection: FakeConnection) -> FakeTable:
+        class FakeRecordTable(FakeTable):
+            attrs = {"a": int, "b": int, "blob": numpy.ndarray, "uuid": uuid.UUID, "date": datetime.date, "text": str}
+            primary_key = ["a", "b"]
+
+            class Distribution(FakeTable):
+                attrs = {"a": int, "b": int, "distribution_name": str, "distribution_version": str}
+
+        FakeRecordTable.connection = fake_connection
+        FakeRecordTable.Distribution.connection = fake_connection
+        return FakeRecordTable()
+
+    @staticmethod
+    def test_emits_one_multi_row_insert(fake_tbl: FakeTable, fake_connection: FakeConnection) -> None:
+        insert_rows(fake_tbl, [{"a": 0, "b": 1}, {"a": 1, "b": 1}])
+        assert fake_connection.queries == [
+            ("INSERT INTO `schema`.`FakeRecordTable`(`a`,`b`) VALUES (%s,%s),(%s,%s)", [0, 1, 1, 1])
+        ]
+
+    @staticmethod
+    def test_skips_duplicates(fake_tbl: FakeTable, fake_connection: FakeConnection) -> None:
+        insert_rows(fake_tbl, [{"a": 0, "b": 1}], skip_duplicates=True)
+        assert fake_connection.queries[0][0].endswith(" ON DUPLICATE KEY UPDATE `a`=`a`")
+
+    @staticmethod
+    def test_packs_blobs(fake_tbl: FakeTable, fake_connection: FakeConnection) -> None:
+        content = numpy.frombuffer(b"content", dtype=numpy.uint8)
+        insert_rows(fake_tbl, cast("List[Entity]", [{"a": 0, "blob": content}]))
+        assert fake_connection.queries[0][1] == [0, blob.pack(content)]
+
+    @staticmethod
+    def test_converts_uuids_to_bytes(fake_tbl: FakeTable, fake_connection: FakeConnection) -> None:
+        value = uuid.UUID(int=5)
+        insert_rows(fake_tbl, cast("List[Entity]", [{"a": 0, "uuid": value}, {"a": 1, "uuid": str(value)}]))
+        assert fake_connection.queries[0][1] == [0, value.bytes, 1, value.bytes]
+
+    @staticmethod
+    def test_converts_dates_to_iso_strings(fake_tbl: FakeTable, fake_connection: FakeConnection) -> None:
+        insert_rows(fake_tbl, cast("List[Entity]", [{"a": 0, "date": datetime.date(2024, 1, 31)}]))
+        assert fake_connection.queries[0][1] == [0, "2024-01-31"]
+
+    @staticmethod
+    def test_converts_numpy_scalars(fake_tbl: FakeTable, fake_connection: FakeConnection) -> None:
+        insert_rows(fake_tbl, cast("List[Entity]", [{"a": numpy.int64(3), "b": 1}]))
+        assert fake_connection.queries[0][1] == [3, 1]
+        assert type(fake_connection.queries[0][1][0]) is int
+
+    @staticmethod
+    def test_inserts_default_for_missing_values(fake_tbl: FakeTable, fake_connection: FakeConnection) -> None:
+        insert_rows(fake_tbl, cast("List[Entity]", [{"a": 0, "text": None}, {"a": 1, "text": "value"}]))
+        assert fake_connection.queries == [
+            ("INSERT INTO `schema`.`FakeRecordTable`(`a`,`text`) VALUES (%s,DEFAULT),(%s,%s)", [0, 1, "value"])
+        ]
+
+    @staticmethod
+    def test_does_nothing_without_rows(fake_tbl: FakeTable, fake_connection: FakeConnection) -> None:
+        insert_rows(fake_tbl, [])
+        assert not fake_connection.queries
+
+    @staticmethod
+    def test_fast_table_inserts_with_one_query_per_table(
+        fake_tbl: FakeTable, fake_connection: FakeConnection, dj_comp_rec: DJComputationRecord
+    ) -> None:
+        Table(FakeFactory(fake_tbl), fast_insert=True).add(dj_comp_rec)
+        assert [q.split("(")[0] for q, _ in fake_connection.queries] == [
+            "INSERT INTO `schema`.`FakeRecordTable`",
+            "INSERT INTO `schema`.`Distribution`",
+        ]
+
+    @staticmethod
+    def test_fast_table_raises_error_if_record_already_exists(
+        fake_tbl: FakeTable, dj_comp_rec: DJComputationRecord
+    ) -> None:
+        fake_tbl.__class__.connection = DuplicateRaisingConnection()
+        with pytest.raises(ValueError, match="already exists!"):
+            Table(FakeFactory(fake_tbl), fast_insert=True).add(dj_comp_rec)
+
+
+class FakeSnapshotFactory(FakeFactory):
+    def __init__(self, table: FakeTable, snapshot_table: FakeTable) -> None:
+        super().__init__(table)
+        self.snapshot_table = snapshot_table
+
+    def snapshots(self) -> FakeTable:
+        return self.snapshot_table
+
+
+class TestSnapshotTable:
+    @staticmethod
+    @pytest.fixture
+    def fake_record_tbl() -> FakeTable:
+        class FakeRecordTable(FakeTable):
+            attrs = {"a": int, "b": int, "snapshot_hash": str}
+            primary_key = ["a", "b"]
+
+        return FakeRecordTable()
+
+    @staticmethod
+    @pytest.fixture
+    def fake_snapshot_tbl() -> FakeTable:
+        class FakeSnapshotTable(FakeTable):
+            attrs = {"snapshot_hash": str}
+
+            class Distribution(FakeTable):
+                attrs = {"snapshot_hash": str, "distribution_name": str, "distribution_version": str}
+
+        return FakeSnapshotTable()
+
+    @staticmethod
+    @pytest.fixture
+    def table(fake_record_tbl: FakeTable, fake_snapshot_tbl: FakeTable) -> SnapshotTable:
+        return SnapshotTable(FakeSnapshotFactory(fake_record_tbl, fake_snapshot_tbl))
+
+    @staticmethod
+    @pytest.fixture
+    def other_dj_comp_rec(dj_comp_rec: DJComputationRecord) -> DJComputationRecord:
+        return DJComputationRecord(primary={"a": 1, "b": 1}, distributions=dj_comp_rec.distributions)
+
+    @staticmethod
+    def test_get_dj_computation_record(table: SnapshotTable, dj_comp_rec: DJComputationRecord) -> None:
+        table.add(dj_comp_rec)
+        assert table.get(dj_comp_rec.primary) == dj_comp_rec
+
+    @staticmethod
+    def test_get_dj_computation_record_with_empty_snapshot(table: SnapshotTable, primary: Entity) -> None:
+        dj_comp_rec = DJComputationRecord(primary=primary, distributions=frozenset())
+        table.add(dj_comp_rec)
+        assert table.get(primary) == dj_comp_rec
+
+    @staticmethod
+    def test_record_references_snapshot(
+        table: SnapshotTable, dj_comp_rec: DJComputationRecord, fake_record_tbl: FakeTable
+    ) -> None:
+        table.add(dj_comp_rec)
+        assert fake_record_tbl.fetch1() == {**dj_comp_rec.primary, "snapshot_hash": snapshot_hash(dj_comp_rec)}
+
+    @staticmethod
+    def test_snapshot_is_stored_once(
+        table: SnapshotTable,
+        dj_comp_rec: DJComputationRecord,
+        other_dj_comp_rec: DJComputationRecord,
+        fake_snapshot_tbl: FakeTable,
+    ) -> None:
+        table.add(dj_comp_rec)
+        table.add(other_dj_comp_rec)
+        assert len(fake_snapshot_tbl) == 1
+        assert len(getattr(fake_snapshot_tbl, "Distribution")()) == len(dj_comp_rec.distributions)
+
+    @staticmethod
+    def test_snapshot_stored_by_other_process_is_reused(
+        table: SnapshotTable,
+        fake_record_tbl: FakeTable,
+        fake_snapshot_tbl: FakeTable,
+        dj_comp_rec: DJComputationRecord,
+        other_dj_comp_rec: DJComputationRecord,
+    ) -> None:
+        table.add(dj_comp_rec)
+        other_table = SnapshotTable(FakeSnapshotFactory(fake_record_tbl, fake_snapshot_tbl))
+        other_table.add(other_dj_comp_rec)
+        assert other_table.get(other_dj_comp_rec.primary) == other_dj_comp_rec
+
+    @staticmethod
+    def test_add_many_stores_shared_snapshot_once(
+        table: SnapshotTable,
+        dj_comp_rec: DJComputationRecord,
+        other_dj_comp_rec: DJComputationRecord,
+        fake_snapshot_tbl: FakeTable,
+    ) -> None:
+        table.add_many([dj_comp_rec, other_dj_comp_rec])
+        assert len(fake_snapshot_tbl) == 1
+        assert table.get(other_dj_comp_rec.primary) == other_dj_comp_rec
+
+    @staticmethod
+    def test_insert_raises_error_if_record_already_exists(
+        table: SnapshotTable, dj_comp_rec: DJComputationRecord
+    ) -> None:
+        table.add(dj_comp_rec)
+        with pytest.raises(ValueError, match="already exists!"):
+            table.add(dj_comp_rec)
+
+    @staticmethod
+    def test_get_raises_error_if_record_does_not_exist(table: SnapshotTable, primary: Entity) -> None:
+        with pytest.raises(KeyError, match="does not exist!"):
+            _ = table.get(primary)
+
+    @staticmethod
+    def test_iteration_yields_primary_keys(
+        table: SnapshotTable, dj_comp_rec: DJComputationRecord, other_dj_comp_rec: DJComputationRecord
+    ) -> None:
+        table.add(dj_comp_rec)
+        table.add(other_dj_comp_rec)
+        assert list(iter(table)) == [dj_comp_rec.primary, other_dj_comp_rec.primary]
+
+
+class TestSnapshotHash:
+    @staticmethod
+    def test_does_not_depend_on_primary_key(dj_comp_rec: DJComputationRecord) -> None:
+        other = DJComputationRecord(primary={"c": 3}, distributions=dj_comp_rec.distributions)
+        assert snapshot_hash(dj_comp_rec) == snapshot_hash(other)
+
+    @staticmethod
+    def test_depends_on_parts(dj_comp_rec: DJComputationRecord) -> None:
+        other = DJComputationRecord(primary=dj_comp_rec.primary, distributions=frozenset())
+        assert snapshot_hash(dj_comp_rec) != snapshot_hash(other)
+
+
+class FakeInternedFactory(FakeFactory):
+    def __init__(self, table: FakeTable, lookup_table: FakeTable) -> None:
+        super().__init__(table)
+        self.lookup_table = lookup_table
+        self.n_lookups = 0
+
+    def distribution_ids(self) -> FakeTable:
+        self.n_lookups += 1
+        return self.lookup_table
+
+
+class TestInternedTable:
+    @staticmethod
+    @pytest.fixture
+    def fake_record_tbl() -> FakeTable:
+        class FakeRecordTable(FakeTable):
+            attrs = {"a": int, "b": int}
+            primary_key = ["a", "b"]
+
+            class Distribution(FakeTable):
+                attrs = {"a": int, "b": int, "distribution_id": int}
+
+        return FakeRecordTable()
+
+    @staticmethod
+    @pytest.fixture
+    def fake_lookup_tbl() -> FakeTable:
+        class FakeLookupTable(FakeTable):
+            attrs = {"distribution_id": int, "distribution_name": str, "distribution_version": str}
+
+        return FakeLookupTable()
+
+    @staticmethod
+    @pytest.fixture
+    def fake_interned_factory(fake_record_tbl: FakeTable, fake_lookup_tbl: FakeTable) -> FakeInternedFactory:
+        return FakeInternedFactory(fake_record_tbl, fake_lookup_tbl)
+
+    @staticmethod
+    @pytest.fixture
+    def table(fake_interned_factory: FakeInternedFactory) -> InternedTable:
+        return InternedTable(fake_interned_factory)
+
+    @staticmethod
+    @pytest.fixture
+    def other_dj_comp_rec(dj_comp_rec: DJComputationRecord) -> DJComputationRecord:
+        return DJComputationRecord(primary={"a": 1, "b": 1}, distributions=dj_comp_rec.distributions)
+
+    @staticmethod
+    def test_get_dj_computation_record(table: InternedTable, dj_comp_rec: DJComputationRecord) -> None:
+        table.add(dj_comp_rec)
+        assert table.get(dj_comp_rec.primary) == dj_comp_rec
+
+    @staticmethod
+    def test_get_dj_computation_record_without_distributions(table: InternedTable, primary: Entity) -> None:
+        dj_comp_rec = DJComputationRecord(primary=primary, distributions=frozenset())
+        table.add(dj_comp_rec)
+        assert table.get(primary) == dj_comp_rec
+
+    @staticmethod
+    def test_part_rows_reference_distribution_ids(
+        table: InternedTable, dj_comp_rec: DJComputationRecord, fake_record_tbl: FakeTable
+    ) -> None:
+        table.add(dj_comp_rec)
+        assert sorted(r["distribution_id"] for r in getattr(fake_record_tbl, "Distribution").fetch(as_dict=True)) == (
+            sorted(distribution_id(d) for d in dj_comp_rec.distributions)
+        )
+
+    @staticmethod
+    def test_distributions_are_stored_once(
+        table: InternedTable,
+        dj_comp_rec: DJComputationRecord,
+        other_dj_comp_rec: DJComputationRecord,
+        fake_lookup_tbl: FakeTable,
+    ) -> None:
+        table.add(dj_comp_rec)
+        table.add(other_dj_comp_rec)
+        assert len(fake_lookup_tbl) == len(dj_comp_rec.distributions)
+
+    @staticmethod
+    def test_known_distributions_are_not_looked_up(
+        table: InternedTable,
+        fake_interned_factory: FakeInternedFactory,
+        dj_comp_rec: DJComputationRecord,
+        other_dj_comp_rec: DJComputationRecord,
+    ) -> None:
+        table.add(dj_comp_rec)
+        table.add(other_dj_comp_rec)
+        fake_interned_factory.n_lookups = 0
+        table.add(DJComputationRecord({"a": 2, "b": 2}, dj_comp_rec.distributions))
+        table.get(other_dj_comp_rec.primary)
+        assert fake_interned_factory.n_lookups == 0
+
+    @staticmethod
+    def test_distributions_added_by_other_process_are_resolved(
+        table: InternedTable,
+        fake_interned_factory: FakeInternedFactory,
+        dj_comp_rec: DJComputationRecord,
+    ) -> None:
+        InternedTable(fake_interned_factory).add(dj_comp_rec)
+        assert table.get(dj_comp_rec.primary) == dj_comp_rec
+
+    @staticmethod
+    def test_add_many_stores_shared_distributions_once(
+        table: InternedTable,
+        dj_comp_rec: DJComputationRecord,
+        other_dj_comp_rec: DJComputationRecord,
+        fake_lookup_tbl: FakeTable,
+    ) -> None:
+        table.add_many([dj_comp_rec, other_dj_comp_rec])
+        assert len(fake_lookup_tbl) == len(dj_comp_rec.distributions)
+        assert table.get(other_dj_comp_rec.primary) == other_dj_comp_rec
+
+    @staticmethod
+    def test_insert_raises_error_if_record_already_exists(
+        table: InternedTable, dj_comp_rec: DJComputationRecord
+    ) -> None:
+        table.add(dj_comp_rec)
+        with pytest.raises(ValueError, match="already exists!"):
+            table.add(dj_comp_rec)
+
+    @staticmethod
+    def test_get_raises_error_if_record_does_not_exist(table: InternedTable, primary: Entity) -> None:
+        with pytest.raises(KeyError, match="does not exist!"):
+            _ = table.get(primary)
+
+
+class TestBlobTable:
+    @staticmethod
+    @pytest.fixture
+    def fake_record_tbl() -> FakeTable:
+        class FakeRecordTable(FakeTable):
+            attrs = {"a": int, "b": int}
+            primary_key = ["a", "b"]
+
+            class Distribution(FakeTable):
+                attrs = {"a": int, "b": int, "distribution_name": str, "distribution_version": str}
+                primary_key = ["a", "b", "distribution_name", "distribution_version"]
+
+            class DistributionBlob(FakeTable):
+                attrs = {"a": int, "b": int, "distributions": numpy.ndarray}
+                primary_key = ["a", "b"]
+
+        return FakeRecordTable()
+
+    @staticmethod
+    @pytest.fixture
+    def table(fake_record_tbl: FakeTable) -> BlobTable:
+        return BlobTable(FakeFactory(fake_record_tbl))
+
+    @staticmethod
+    def test_get_dj_computation_record(table: BlobTable, dj_comp_rec: DJComputationRecord) -> None:
+        table.add(dj_comp_rec)
+        assert table.get(dj_comp_rec.primary) == dj_comp_rec
+
+    @staticmethod
+    def test_stores_distributions_in_single_blob_part_row(
+        table: BlobTable, dj_comp_rec: DJComputationRecord, fake_record_tbl: FakeTable
+    ) -> None:
+        table.add(dj_comp_rec)
+        assert fake_record_tbl.fetch1() == dj_comp_rec.primary
+        row = getattr(fake_record_tbl, "DistributionBlob")().fetch1()
+        assert {k: v for k, v in row.items() if k != "distributions"} == dj_comp_rec.primary
+        assert cast(numpy.ndarray, row["distributions"]).tobytes() == encode_distributions(dj_comp_rec.distributions)
+        assert len(getattr(fake_record_tbl, "Distribution")()) == 0
+
+    @staticmethod
+    def test_reads_records_stored_in_part_tables(
+        table: BlobTable, dj_comp_rec: DJComputationRecord, fake_record_tbl: FakeTable
+    ) -> None:
+        Table(FakeFactory(fake_record_tbl)).add(dj_comp_rec)
+        assert table.get(dj_comp_rec.primary) == dj_comp_rec
+
+    @staticmethod
+    def test_switching_from_parts_layout_keeps_old_records(
+        table: BlobTable, dj_comp_recs: list[DJComputationRecord], fake_record_tbl: FakeTable
+    ) -> None:
+        Table(FakeFactory(fake_record_tbl)).add_many(dj_comp_recs[:2])
+        table.add(dj_comp_recs[2])
+        assert list(table.get_many(e.primary for e in dj_comp_recs)) == dj_comp_recs
+        assert list(table.find([{"distribution_name": "dist1"}], lambda _: True)) == [
+            {"a": 0, "b": 1},
+            {"a": 2, "b": 2},
+        ]
+        with pytest.raises(ValueError, match="already exists!"):
+            table.add(dj_comp_recs[0])
+
+    @staticmethod
+    def test_insert_raises_error_if_record_already_exists(table: BlobTable, dj_comp_rec: DJComputationRecord) -> None:
+        table.add(dj_comp_rec)
+        with pytest.raises(ValueError, match="already exists!"):
+            table.add(dj_comp_rec)
+
+    @staticmethod
+    def test_get_raises_error_if_record_does_not_exist(table: BlobTable, primary: Entity) -> None:
+        with pytest.raises(KeyError, match="does not exist!"):
+            _ = table.get(primary)
+
+    @staticmethod
+    def test_iteration_yields_primary_keys(table: BlobTable, dj_comp_rec: DJComputationRecord) -> None:
+        table.add(dj_comp_rec)
+        assert list(iter(table)) == [dj_comp_rec.primary]
+
+
+class TestEncodeDistributions:
+    @staticmethod
+    def test_round_trip(dj_dists: frozenset[DJDistribution]) -> None:
+        assert decode_distributions(encode_distributions(dj_dists)) == dj_dists
+
+    @staticmethod
+    def test_does_not_depend_on_order(dj_dists: frozenset[DJDistribution]) -> None:
+        assert encode_distributions(sorted(dj_dists, key=str)) == encode_distributions(
+            sorted(dj_dists, key=str, reverse=True)
+        )
+
+
+class TestAfter:
+    @staticmethod
+    def test_compares_row_constructors() -> None:
+        heading = FakeHeading(["a", "b"], {"a": int, "b": str})
+        assert _after(heading, ["a", "b"], {"a": 1, "b": "it's"}) == "(`a`,`b`) > (1,'it\\'s')"
+
+    @staticmethod
+    def test_compares_uuids_as_binary() -> None:
+        value = uuid.UUID(bytes=b"abcdefghijklmnop")
+        for key in (value, str(value)):
+            condition = _after(FakeHeading(["a"], {"a": uuid.UUID}), ["a"], cast("Entity", {"a": key}))
+            assert condition == "(`a`) > (_binary X'6162636465666768696a6b6c6d6e6f70')"
+
+    @staticmethod
+    def test_converts_numpy_scalars() -> None:
+        heading = FakeHeading(["a", "b"], {"a": int, "b": float})
+        condition = _after(heading, ["a", "b"], cast("Entity", {"a": numpy.int64(3), "b": numpy.float64(1.5)}))
+        assert condition == "(`a`,`b`) > (3,1.5e0)"
+
+    @staticmethod
+    def test_compares_dates_as_iso_strings() -> None:
+        heading = FakeHeading(["a"], {"a": datetime.date})
+        assert _after(heading, ["a"], cast("Entity", {"a": datetime.date(2024, 1, 31)})) == "(`a`) > ('2024-01-31')"
+
+
+@pytest.fixture(params=["parts", "snapshot", "interned", "blob"])
+def layout_table(request: pytest.FixtureRequest) -> Table:
+    class FakeRecordTable(FakeTable):
+        attrs = {"a": int, "b": int, "snapshot_hash": str, "record_identifier": str}
+        primary_key = ["a", "b"]
+
+        class DistributionBlob(FakeTable):
+            attrs = {"a": int, "b": int, "distributions": numpy.ndarray}
+            primary_key = ["a", "b"]
+
+        class Distribution(FakeTable):
+            attrs = {
+                "a": int,
+                "b": int,
+                "distribution_name": str,
+                "distribution_version": str,
+                "distribution_id": int,
+            }
+            primary_key = (
+                ["a", "b", "distribution_id"]
+                if request.param == "interned"
+                else ["a", "b", "distribution_name", "distribution_version"]
+            )
+
+    class FakeSnapshotTable(FakeTable):
+        attrs = {"snapshot_hash": str}
+
+        class Distribution(FakeTable):
+            attrs = {"snapshot_hash": str, "distribution_name": str, "distribution_version": str}
+            primary_key = ["snapshot_hash", "distribution_name", "distribution_version"]
+
+    class FakeLookupTable(FakeTable):
+        attrs = {"distribution_id": int, "distribution_name": str, "distribution_version": str}
+        primary_key = ["distribution_id"]
+
+    tables: dict[str, Callable[[], Table]] = {
+        "parts": lambda: Table(FakeFactory(FakeRecordTable())),
+        "snapshot": lambda: SnapshotTable(FakeSnapshotFactory(FakeRecordTable(), FakeSnapshotTable())),
+        "interned": lambda: InternedTable(FakeInternedFactory(FakeRecordTable(), FakeLookupTable())),
+        "blob": lambda: BlobTable(FakeFactory(FakeRecordTable())),
+    }
+    return tables[request.param]()
+
+
+@pytest.fixture
+def dj_comp_recs(dj_comp_rec: DJComputationRecord) -> list[DJComputationRecord]:
+    return [
+        dj_comp_rec,
+        DJComputationRecord(primary={"a": 1, "b": 1}, distributions=frozenset()),
+        DJComputationRecord(primary={"a": 2, "b": 2}, distributions=frozenset([DJDistribution("dist1", "0.1.0")])),
+    ]
+
+
+class TestGetMany:
+    @staticmethod
+    @pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+    def test_gets_records_in_requested_order(
+        layout_table: Table, dj_comp_recs: list[DJComputationRecord], chunk_size: int
+    ) -> None:
+        layout_table.add_many(dj_comp_recs)
+        primaries = [r.primary for r in reversed(dj_comp_recs)]
+        assert list(layout_table.get_many(primaries, chunk_size=chunk_size)) == list(reversed(dj_comp_recs))
+
+    @staticmethod
+    def test_raises_error_if_record_does_not_exist(
+        layout_table: Table, dj_comp_recs: list[DJComputationRecord]
+    ) -> None:
+        layout_table.add_many(dj_comp_recs)
+        with pytest.raises(KeyError, match="do not exist!"):
+            list(layout_table.get_many([dj_comp_recs[0].primary, {"a": 3, "b": 3}]))
+
+    @staticmethod
+    @pytest.mark.parametrize("page_size", [1, 2, 3, 1000])
+    def test_iterates_primary_keys_in_pages(
+        layout_table: Table, dj_comp_recs: list[DJComputationRecord], page_size: int
+    ) -> None:
+        layout_table.add_many(list(reversed(dj_comp_recs)))
+        assert list(layout_table.iter_primaries(page_size=page_size)) == [r.primary for r in dj_comp_recs]
+
+    @staticmethod
+    @pytest.mark.parametrize("page_size", [1, 1000])
+    def test_iterates_primary_keys_matching_restriction(
+        layout_table: Table, dj_comp_recs: list[DJComputationRecord], page_size: int
+    ) -> None:
+        layout_table.add_many(dj_comp_recs)
+        primaries = [dj_comp_recs[2].primary, dj_comp_recs[0].primary]
+        assert list(layout_table.iter_primaries(page_size=page_size, restriction=primaries)) == list(
+            reversed(primaries)
+        )
+
+
+def test_iterates_numpy_primary_keys_in_pages() -> None:
+    class FakeRecordTable(FakeTable):
+        attrs = {"a": float}
+        primary_key = ["a"]
+
+    fake_tbl = FakeRecordTable()
+    fake_tbl.insert({"a": numpy.float64(v)} for v in (0.5, 1.5, 2.5))
+    assert list(Table(FakeFactory(fake_tbl)).iter_primaries(page_size=1)) == [{"a": 0.5}, {"a": 1.5}, {"a": 2.5}]
+
+
+class TestGetPrimaries:
+    @staticmethod
+    @pytest.mark.parametrize("chunk_size", [1, 1000])
+    def test_looks_up_primary_keys_by_identifier(
+        layout_table: Table, dj_comp_recs: list[DJComputationRecord], chunk_size: int
+    ) -> None:
+        layout_table.add_many(
+            [dataclasses.replace(r, identifier=Identifier(f"identifier{i}")) for i, r in enumerate(dj_comp_recs)]
+        )
+        identifiers = [Identifier("identifier2"), Identifier("identifier0")]
+        assert layout_table.get_primaries(identifiers, chunk_size=chunk_size) == {
+            Identifier("identifier2"): dj_comp_recs[2].primary,
+            Identifier("identifier0"): dj_comp_recs[0].primary,
+        }
+
+    @staticmethod
+    def test_omits_records_added_without_identifier(
+        layout_table: Table, dj_comp_recs: list[DJComputationRecord]
+    ) -> None:
+        layout_table.add_many(dj_comp_recs)
+        assert layout_table.get_primaries([Identifier("identifier0")]) == {}
+
+    @staticmethod
+    def test_returns_nothing_if_table_has_no_identifier_column(dj_comp_rec: DJComputationRecord) -> None:
+        class FakeRecordTable(FakeTable):
+            attrs = {"a": int, "b": int}
+            primary_key = ["a", "b"]
+
+            class Distribution(FakeTable):
+                attrs = {"a": int, "b": int, "distribution_name": str, "distribution_version": str}
+
+        table = Table(FakeFactory(FakeRecordTable()))
+        table.add(dataclasses.replace(dj_comp_rec, identifier=Identifier("identifier")))
+        assert table.get_primaries([Identifier("identifier")]) == {}
+
+
+class TestFind:
+    @staticmethod
+    @pytest.fixture
+    def add_dj_comp_recs(layout_table: Table, dj_comp_recs: list[DJComputationRecord]) -> None:
+        layout_table.add_many(dj_comp_recs)
+
+    @staticmethod
+    @pytest.mark.usefixtures("add_dj_comp_recs")
+    @pytest.mark.parametrize("page_size", [1, 2, 1000])
+    def test_finds_records_with_matching_distribution(layout_table: Table, page_size: int) -> None:
+        primaries = layout_table.find([{"distribution_name": "dist1"}], lambda _: True, page_size=page_size)
+        assert list(primaries) == [{"a": 0, "b": 1}, {"a": 2, "b": 2}]
+
+    @staticmethod
+    @pytest.mark.usefixtures("add_dj_comp_recs")
+    def test_only_passes_restricted_distributions_to_predicate(layout_table: Table) -> None:
+        seen: list[DJDistribution] = []
+
+        def predicate(distribution: DJDistribution) -> bool:
+            seen.append(distribution)
+            return distribution.distribution_version == "0.1.0"
+
+        assert list(layout_table.find([{"distribution_name": "dist1"}], predicate)) == [
+            {"a": 0, "b": 1},
+            {"a": 2, "b": 2},
+        ]
+        assert {d.distribution_name for d in seen} == {"dist1"}
+
+    @staticmethod
+    @pytest.mark.usefixtures("add_dj_comp_recs")
+    def test_yields_each_record_once(layout_table: Table) -> None:
+        restrictions = [{"distribution_name": "dist1"}, {"distribution_name": "dist2"}]
+        assert list(layout_table.find(restrictions, lambda _: True)) == [{"a": 0, "b": 1}, {"a": 2, "b": 2}]
+
+    @staticmethod
+    @pytest.mark.usefixtures("add_dj_comp_recs")
+    def test_finds_nothing_without_restrictions(layout_table: Table) -> None:
+        assert not list(layout_table.find([], lambda _: True))
+
+
+class TestDistributionId:
+    @staticmethod
+    def test_is_deterministic() -> None:
+        assert distribution_id(DJDistribution("dist1", "0.1.0")) == distribution_id(DJDistribution("dist1", "0.1.0"))
+
+    @staticmethod
+    @pytest.mark.parametrize("other", [DJDistribution("dist1", "0.1.1"), DJDistribution("dist10", ".1.0")])
+    def test_depends_on_name_and_version(other: DJDistribution) -> None:
+        assert distribution_id(DJDistribution("dist1", "0.1.0")) != distribution_id(other)
+
+    @staticmethod
+    def test_fits_into_signed_64_bit_integer() -> None:
+        assert -(2**63) <= distribution_id(DJDistribution("dist1", "0.1.0")) < 2**63
 
 
 class FakeSchemaFactory:
     def __init__(self, fake_schema: FakeSchema) -> None:
         self.fake_schema = fake_schema
+        self.n_calls = 0
+
+    @property
+    def connection(self) -> FakeConnection:
+        return self.fake_schema.connection
 
     def __call__(self) -> FakeSchema:
+        self.n_calls += 1
         return self.fake_schema
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(fake_schema={repr(self.fake_schema)})"
 
 
+class ThreadLocalSchemaFactory(FakeSchemaFactory):
+    def __init__(self, fake_schema: FakeSchema) -> None:
+        super().__init__(fake_schema)
+        self._local = threading.local()
+
+    @property
+    def connection(self) -> FakeConnection:
+        return cast(FakeConnection, getattr(self._local, "connection", self.fake_schema.connection))
+
+    @connection.setter
+    def connection(self, connection: FakeConnection) -> None:
+        self._local.connection = connection
+
+
 @pytest.fixture
 def fake_schema_factory(fake_schema: FakeSchema) -> FakeSchemaFactory:
     return FakeSchemaFactory(fake_schema)
@@ -147,6 +866,71 @@ class TestFactory:
     def test_if_instance_is_instance_of_class(produce_instance: Lookup, fake_schema: FakeSchema) -> None:
         assert isinstance(produce_instance, fake_schema.decorated_tables["FakeTableRecord"])
 
+    @staticmethod
+    def test_record_table_is_declared_once(factory: TableFactory, fake_schema_factory: FakeSchemaFactory) -> None:
+        factory()
+        factory()
+        assert fake_schema_factory.n_calls == 1
+
+    @staticmethod
+    def test_reconnect_to_same_server_rebinds_declared_table(
+        factory: TableFactory, fake_schema_factory: FakeSchemaFactory, fake_schema: FakeSchema
+    ) -> None:
+        factory()
+        fake_schema.connection = FakeConnection()
+        instance = factory()
+        assert fake_schema_factory.n_calls == 1
+        assert instance.connection is fake_schema.connection
+        assert getattr(instance, "Distribution").connection is fake_schema.connection
+
+    @staticmethod
+    def test_rebinding_does_not_affect_previously_produced_tables(
+        factory: TableFactory, fake_schema: FakeSchema
+    ) -> None:
+        original_connection = fake_schema.connection
+        instance = factory()
+        fake_schema.connection = FakeConnection()
+        factory()
+        assert instance.connection is original_connection
+        assert getattr(instance, "Distribution").connection is original_connection
+
+    @staticmethod
+    def test_tables_produced_in_other_thread_use_its_connection(fake_schema: FakeSchema) -> None:
+        schema_factory = ThreadLocalSchemaFactory(fake_schema)
+        factory = TableFactory(schema_factory, parent="FakeTable")
+        instance = factory()
+        connections: List[FakeConnection] = []
+
+        def produce() -> None:
+            schema_factory.connection = FakeConnection()
+            other = factory()
+            connections.extend([schema_factory.connection, other.connection, getattr(other, "Distribution").connection])
+
+        thread = threading.Thread(target=produce)
+        thread.start()
+        thread.join()
+        assert connections[0] is connections[1] is connections[2]
+        assert instance.connection is fake_schema.connection is not connections[0]
+        assert getattr(instance, "Distribution").connection is fake_schema.connection
+        assert factory().connection is fake_schema.connection and schema_factory.n_calls == 1
+
+    @staticmethod
+    def test_connect_to_other_server_declares_table_again(
+        factory: TableFactory, fake_schema_factory: FakeSchemaFactory, fake_schema: FakeSchema
+    ) -> None:
+        factory()
+        fake_schema.connection = FakeConnection()
+        fake_schema.connection.conn_info = {"host": "otherhost", "user": "myuser", "passwd": "mypasswd"}
+        factory()
+        assert fake_schema_factory.n_calls == 2
+
+    @staticmethod
+    def test_invalidate_declares_table_again(factory: TableFactory, fake_schema_factory: FakeSchemaFactory) -> None:
+        factory()
+        factory.invalidate()
+        factory()
+        assert fake_schema_factory.n_calls == 2
+
     @staticmethod
     def test_repr(factory: TableFactory) -> None:
         assert (
@@ -168,7 +952,9 @@ class TestFactoryMasterClass:
 
     @staticmethod
     def test_class_has_correct_definition(fake_schema: FakeSchema) -> None:
-        assert fake_schema.decorated_tables["FakeTableRecord"].definition == "-> FakeTable"
+        assert fake_schema.decorated_tables["FakeTableRecord"].definition == (
+            "-> FakeTable\n---" + DJComputationRecord.identifier_definition
+        )
 
 
 @pytest.mark.parametrize("part", PartEntity.__subclasses__())
@@ -185,3 +971,120 @@ class TestFactoryPartClasses:
     @staticmethod
     def test_part_classes_have_correct_definitions(fake_schema: FakeSchema, part: Type[PartEntity]) -> None:
         assert getattr(fake_schema.decorated_tables["FakeTableRecord"], part.__name__).definition == part.definition
+
+
+@pytest.fixture
+def snapshot_factory(fake_schema_factory: FakeSchemaFactory, fake_table: Type[FakeTable]) -> SnapshotTableFactory:
+    return SnapshotTableFactory(fake_schema_factory, parent=fake_table.__name__)
+
+
+@pytest.mark.usefixtures("fake_schema")
+class TestSnapshotFactory:
+    @staticmethod
+    def test_snapshot_table_has_correct_definition(
+        snapshot_factory: SnapshotTableFactory, fake_schema: FakeSchema
+    ) -> None:
+        snapshot_factory()
+        assert fake_schema.decorated_tables["FakeTableSnapshot"].definition == "snapshot_hash: char(32)"
+
+    @staticmethod
+    @pytest.mark.parametrize("part", PartEntity.__subclasses__())
+    def test_snapshot_table_has_part_classes(
+        snapshot_factory: SnapshotTableFactory, fake_schema: FakeSchema, part: Type[PartEntity]
+    ) -> None:
+        snapshot_factory()
+        assert issubclass(getattr(fake_schema.decorated_tables["FakeTableSnapshot"], part.__name__), Part)
+
+    @staticmethod
+    def test_record_table_references_snapshot_table(
+        snapshot_factory: SnapshotTableFactory, fake_schema: FakeSchema
+    ) -> None:
+        snapshot_factory()
+        assert fake_schema.decorated_tables["FakeTableSnapshotRecord"].definition == (
+            "-> FakeTable\n---\n-> FakeTableSnapshot" + DJComputationRecord.identifier_definition
+        )
+        assert fake_schema.context["FakeTableSnapshot"] is fake_schema.decorated_tables["FakeTableSnapshot"]
+
+    @staticmethod
+    @pytest.mark.parametrize("part", PartEntity.__subclasses__())
+    def test_record_table_has_no_part_classes(
+        snapshot_factory: SnapshotTableFactory, fake_schema: FakeSchema, part: Type[PartEntity]
+    ) -> None:
+        snapshot_factory()
+        assert not hasattr(fake_schema.decorated_tables["FakeTableSnapshotRecord"], part.__name__)
+
+
+@pytest.fixture
+def interned_factory(fake_schema_factory: FakeSchemaFactory, fake_table: Type[FakeTable]) -> InternedTableFactory:
+    return InternedTableFactory(fake_schema_factory, parent=fake_table.__name__)
+
+
+@pytest.mark.usefixtures("fake_schema")
+class TestInternedFactory:
+    @staticmethod
+    def test_lookup_table_has_correct_definition(
+        interned_factory: InternedTableFactory, fake_schema: FakeSchema
+    ) -> None:
+        interned_factory()
+        assert fake_schema.decorated_tables["InternedDistribution"].definition == DJInternedDistribution.definition
+
+    @staticmethod
+    def test_distribution_part_references_lookup_table(
+        interned_factory: InternedTableFactory, fake_schema: FakeSchema
+    ) -> None:
+        interned_factory()
+        part = getattr(fake_schema.decorated_tables["FakeTableInternedRecord"], "Distribution")
+        assert part.definition == DJDistribution.interned_definition
+        assert fake_schema.context["InternedDistribution"] is fake_schema.decorated_tables["InternedDistribution"]
+
+
+@pytest.mark.usefixtures("fake_schema")
+@pytest.mark.parametrize(
+    "factory_cls,record_table",
+    [(SnapshotTableFactory, "FakeTableSnapshotRecord"), (InternedTableFactory, "FakeTableInternedRecord")],
+)
+def test_switching_layout_declares_separate_record_table(
+    factory: TableFactory,
+    fake_schema_factory: FakeSchemaFactory,
+    fake_schema: FakeSchema,
+    factory_cls: Type[TableFactory],
+    record_table: str,
+) -> None:
+    factory()
+    factory_cls(fake_schema_factory, parent="FakeTable")()
+    assert fake_schema.decorated_tables["FakeTableRecord"].definition == (
+        "-> FakeTable\n---" + DJComputationRecord.identifier_definition
+    )
+    assert record_table in fake_schema.decorated_tables
+    assert fake_schema.decorated_tables[record_table] is not fake_schema.decorated_tables["FakeTableRecord"]
+
+
+@pytest.mark.usefixtures("fake_schema")
+class TestBlobFactory:
+    @staticmethod
+    @pytest.fixture
+    def blob_factory(fake_schema_factory: FakeSchemaFactory, fake_table: Type[FakeTable]) -> BlobTableFactory:
+        return BlobTableFactory(fake_schema_factory, parent=fake_table.__name__)
+
+    @staticmethod
+    def test_record_table_is_declared_as_in_parts_layout(
+        blob_factory: BlobTableFactory, fake_schema: FakeSchema
+    ) -> None:
+        blob_factory()
+        assert fake_schema.decorated_tables["FakeTableRecord"].definition == (
+            "-> FakeTable\n---" + DJComputationRecord.identifier_definition
+        )
+
+    @staticmethod
+    def test_record_table_has_blob_part(blob_factory: BlobTableFactory, fake_schema: FakeSchema) -> None:
+        blob_factory()
+        part = getattr(fake_schema.decorated_tables["FakeTableRecord"], "DistributionBlob")
+        assert part.definition == DJDistributionBlob.definition
+
+    @staticmethod
+    @pytest.mark.parametrize("part", PartEntity.__subclasses__())
+    def test_record_table_has_part_classes(
+        blob_factory: BlobTableFactory, fake_schema: FakeSchema, part: Type[PartEntity]
+    ) -> None:
+        blob_factory()
+        assert getattr(fake_schema.decorated_tables["FakeTableRecord"], part.__name__).definition == part.definition
@@ -2,7 +2,20 @@ import textwrap
 
 import pytest
 
-from compenv.model.record import ComputationRecord, Distribution
+from compenv.model.record import (
+    ComputationRecord,
+    DiffMatrix,
+    Distribution,
+    DistributionDiff,
+    Identifier,
+    Requirement,
+    VersionChange,
+    diff_distributions,
+    diff_matrix,
+    fingerprint,
+    normalize_name,
+    version_key,
+)
 
 
 class TestComputationRecord:
@@ -37,3 +50,226 @@ class TestDistribution:
             """
         ).strip()
         assert str(dist) == expected
+
+
+class TestRequirement:
+    @staticmethod
+    @pytest.mark.parametrize(
+        "string,requirement",
+        [
+            ("numpy", Requirement("numpy")),
+            ("torch==2.1.0", Requirement("torch", "==", "2.1.0")),
+            (" numpy < 1.24 ", Requirement("numpy", "<", "1.24")),
+        ],
+    )
+    def test_from_string(string: str, requirement: Requirement) -> None:
+        assert Requirement.from_string(string) == requirement
+
+    @staticmethod
+    def test_from_string_raises_error_if_invalid() -> None:
+        with pytest.raises(ValueError, match="Invalid requirement"):
+            Requirement.from_string("numpy~1.24")
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "requirement,version,satisfied",
+        [
+            ("numpy", "1.0", True),
+            ("numpy<1.24", "1.9.3", True),
+            ("numpy<1.24", "1.24.0", False),
+            ("numpy>=1.24", "1.24", True),
+            ("numpy==1.24", "1.24.0", True),
+            ("numpy!=1.24", "1.25", True),
+            ("numpy==2.1.0", "2.1.0+cu121", True),
+            ("numpy<=2.1.0", "2.1.0+cu121", True),
+            ("numpy>2.1.0", "2.1.0+cu121", False),
+            ("numpy==2.1.0+cu118", "2.1.0+cu121", False),
+            ("numpy==2.1.0+cu121", "2.1.0+cu121", True),
+            ("numpy<1.24", "1.24.0rc1", False),
+            ("numpy<1.24", "1.24.0.dev0", False),
+            ("numpy<1.24", "1.23.1rc1", True),
+            ("numpy<1.24rc2", "1.24rc1", True),
+            ("numpy<=1.24", "1.24.0rc1", True),
+            ("numpy>1.24", "1.24.post1", False),
+            ("numpy>1.24", "1.24.1.post1", True),
+            ("numpy>1.24.post1", "1.24.post2", True),
+            ("numpy>=1.24", "1.24.post1", True),
+            ("numpy>=1.24rc1", "1.24.0b2", False),
+        ],
+    )
+    def test_is_satisfied_by(requirement: str, version: str, satisfied: bool) -> None:
+        distribution = Distribution("numpy", version)
+        assert Requirement.from_string(requirement).is_satisfied_by(distribution) is satisfied
+
+    @staticmethod
+    def test_is_not_satisfied_by_other_distribution() -> None:
+        assert not Requirement.from_string("numpy").is_satisfied_by(Distribution("torch", "2.1.0"))
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "requirement,name", [("pyyaml", "PyYAML"), ("PyYAML", "pyyaml"), ("typing-extensions", "Typing_Extensions")]
+    )
+    def test_names_are_normalized(requirement: str, name: str) -> None:
+        assert Requirement.from_string(requirement).is_satisfied_by(Distribution(name, "6.0"))
+
+    @staticmethod
+    def test_str() -> None:
+        assert str(Requirement.from_string("numpy < 1.24")) == "numpy<1.24"
+
+
+class TestVersionKey:
+    @staticmethod
+    def test_orders_versions_as_specified_by_pep_440() -> None:
+        versions = [
+            "0.9",
+            "1.0.dev1",
+            "1.0a1.dev1",
+            "1.0a1",
+            "1.0b2",
+            "1.0rc1",
+            "1.0",
+            "1.0+abc",
+            "1.0+5",
+            "1.0.post1.dev1",
+            "1.0.post1",
+            "1.1",
+            "1!0.1",
+        ]
+        assert sorted(reversed(versions), key=version_key) == versions
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "version,other", [("1.24", "1.24.0"), ("1.0-1", "1.0.post1"), ("1.0alpha1", "1.0a1"), ("v1.0", "1.0")]
+    )
+    def test_equivalent_versions_are_equal(version: str, other: str) -> None:
+        assert version_key(version) == version_key(other)
+
+    @staticmethod
+    def test_invalid_versions_come_first() -> None:
+        assert sorted(["1.0", "1.0-foo-bar", "0.1"], key=version_key) == ["1.0-foo-bar", "0.1", "1.0"]
+
+
+@pytest.mark.parametrize("name", ["Typing_Extensions", "typing.extensions", "typing--extensions"])
+def test_normalize_name(name: str) -> None:
+    assert normalize_name(name) == "typing-extensions"
+
+
+class TestDiffDistributions:
+    @staticmethod
+    def test_no_differences() -> None:
+        distributions = [Distribution("numpy", "1.24.0"), Distribution("scipy", "1.11.0")]
+        diff = diff_distributions(distributions, reversed(distributions))
+        assert diff == DistributionDiff() and not diff.differ
+
+    @staticmethod
+    def test_added_removed_and_changed() -> None:
+        distributions1 = [
+            Distribution("numpy", "1.24.0"),
+            Distribution("scipy", "1.11.0"),
+            Distribution("attrs", "23.1"),
+        ]
+        distributions2 = [
+            Distribution("torch", "2.1.0"),
+            Distribution("numpy", "1.26.0"),
+            Distribution("attrs", "23.1"),
+        ]
+        assert diff_distributions(distributions1, distributions2) == DistributionDiff(
+            added=(Distribution("torch", "2.1.0"),),
+            removed=(Distribution("scipy", "1.11.0"),),
+            changed=(VersionChange("numpy", "1.24.0", "1.26.0"),),
+        )
+
+    @staticmethod
+    def test_distributions_only_in_one_collection_are_sorted_by_name() -> None:
+        distributions = [Distribution("b", "1"), Distribution("c", "1"), Distribution("a", "1")]
+        assert diff_distributions([], distributions).added == tuple(sorted(distributions, key=lambda d: d.name))
+
+    @staticmethod
+    def test_multiple_versions_of_same_distribution_are_added_or_removed() -> None:
+        distributions1 = [Distribution("numpy", "1.24.0"), Distribution("numpy", "1.25.0")]
+        distributions2 = [Distribution("numpy", "1.25.0"), Distribution("numpy", "1.26.0")]
+        assert diff_distributions(distributions1, distributions2) == DistributionDiff(
+            added=(Distribution("numpy", "1.26.0"),), removed=(Distribution("numpy", "1.24.0"),)
+        )
+
+    @staticmethod
+    def test_computation_record_diff(computation_record: ComputationRecord) -> None:
+        other = ComputationRecord(Identifier("other"), frozenset())
+        assert computation_record.diff(other).removed == tuple(
+            sorted(computation_record.distributions, key=lambda d: (d.name, d.version))
+        )
+
+    @staticmethod
+    def test_str() -> None:
+        diff = DistributionDiff(
+            added=(Distribution("torch", "2.1.0"),), changed=(VersionChange("np", "1.24.0", "1.26.0"),)
+        )
+        assert str(diff) == "Added:\n    torch (2.1.0)\nChanged:\n    np    (1.24.0 -> 1.26.0)"
+
+    @staticmethod
+    def test_inverted_swaps_records() -> None:
+        distributions1 = [Distribution("numpy", "1.24.0"), Distribution("scipy", "1.11.0")]
+        distributions2 = [Distribution("numpy", "1.26.0"), Distribution("torch", "2.1.0")]
+        assert diff_distributions(distributions1, distributions2).inverted() == diff_distributions(
+            distributions2, distributions1
+        )
+
+
+class TestFingerprint:
+    @staticmethod
+    def test_does_not_depend_on_order() -> None:
+        distributions = [Distribution("numpy", "1.24.0"), Distribution("scipy", "1.11.0")]
+        assert fingerprint(distributions) == fingerprint(reversed(distributions))
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "distributions",
+        [
+            [Distribution("numpy", "1.26.0")],
+            [Distribution("numpy", "1.24.0"), Distribution("torch", "2.1.0")],
+            [],
+        ],
+    )
+    def test_differs_if_distributions_differ(distributions: list[Distribution]) -> None:
+        assert fingerprint(distributions) != fingerprint([Distribution("numpy", "1.24.0")])
+
+    @staticmethod
+    def test_computation_record_fingerprint(computation_record: ComputationRecord) -> None:
+        other = ComputationRecord(Identifier("other"), computation_record.distributions)
+        assert computation_record.fingerprint == other.fingerprint == fingerprint(computation_record.distributions)
+
+
+class TestDiffMatrix:
+    @staticmethod
+    @pytest.fixture
+    def distributions() -> list[list[Distribution]]:
+        return [
+            [Distribution("numpy", "1.24.0")],
+            [Distribution("numpy", "1.26.0")],
+            [Distribution("numpy", "1.26.0"), Distribution("torch", "2.1.0")],
+        ]
+
+    @staticmethod
+    def test_stores_diffs_to_following_collections_only(distributions: list[list[Distribution]]) -> None:
+        assert [len(row) for row in diff_matrix(distributions).diffs] == [2, 1, 0]
+
+    @staticmethod
+    @pytest.mark.parametrize("index1,index2", [(0, 1), (0, 2), (1, 2), (2, 0), (2, 1), (1, 1)])
+    def test_diff_matches_diff_of_distributions(
+        distributions: list[list[Distribution]], index1: int, index2: int
+    ) -> None:
+        assert diff_matrix(distributions).diff(index1, index2) == diff_distributions(
+            distributions[index1], distributions[index2]
+        )
+
+    @staticmethod
+    @pytest.mark.parametrize("index1,index2", [(0, 3), (-1, 0)])
+    def test_raises_error_if_entry_does_not_exist(
+        distributions: list[list[Distribution]], index1: int, index2: int
+    ) -> None:
+        with pytest.raises(IndexError, match="has no entry"):
+            diff_matrix(distributions).diff(index1, index2)
+
+    @staticmethod
+    def test_empty() -> None:
+        assert diff_matrix([]) == DiffMatrix() and len(DiffMatrix()) == 0
@@ -1,14 +1,15 @@
 from __future__ import annotations
 
 import dataclasses
+import threading
 from collections.abc import Mapping
 
 import pytest
 
 from compenv.service.abstract import Service
 
-from ..conftest import FakeOutputPort
-from .conftest import FakeRequest, FakeResponse, FakeService
+from ..conftest import FakeOutputPort, FakeRepository
+from .conftest import FakeRequest, FakeResponse, FakeService, FakeUnitOfWork
 
 
 @pytest.fixture
@@ -46,3 +47,29 @@ def test_missing_class_variable_raises_error(missing: str, class_attributes: Map
     class_attributes = {name: attr for name, attr in class_attributes.items() if name != missing}
     with pytest.raises(RuntimeError):
         type("MyService", (Service,), class_attributes)
+
+
+class TestUnitOfWork:
+    @staticmethod
+    def test_records_are_not_available_outside_of_context(fake_uow: FakeUnitOfWork) -> None:
+        with pytest.raises(RuntimeError, match="outside of context"):
+            fake_uow.records
+
+    @staticmethod
+    def test_exiting_in_other_thread_does_not_affect_context(
+        fake_uow: FakeUnitOfWork, fake_repository: FakeRepository
+    ) -> None:
+        entered, exited = threading.Event(), threading.Event()
+
+        def use_uow() -> None:
+            with fake_uow:
+                entered.set()
+                exited.wait()
+
+        thread = threading.Thread(target=use_uow)
+        thread.start()
+        entered.wait()
+        with fake_uow:
+            exited.set()
+            thread.join()
+            assert fake_uow.records is fake_repository
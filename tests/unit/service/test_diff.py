@@ -2,7 +2,7 @@ from typing import Protocol
 
 import pytest
 
-from compenv.model.record import ComputationRecord, Distribution, Identifier
+from compenv.model.record import ComputationRecord, Distribution, DistributionDiff, Identifier, VersionChange
 from compenv.service.diff import DiffRequest, DiffResponse, DiffService
 
 from ..conftest import FakeOutputPort
@@ -34,22 +34,16 @@ def diff_runner(fake_uow: FakeUnitOfWork, fake_output_port: FakeOutputPort) -> D
     return run
 
 
-@pytest.mark.parametrize(
-    "version1,version2,differ",
-    [
-        ("1.16.4", "1.16.4", False),
-        ("1.16.4", "1.16.5", True),
-    ],
-)
-def test_diff_behvaior_of_computation_records(
-    diff_runner: DiffRunner,
-    version1: str,
-    version2: str,
-    differ: bool,
-    fake_output_port: FakeOutputPort,
-) -> None:
-    diff_runner(version1, version2)
-    assert fake_output_port.responses == [DiffResponse(differ=differ)]
+def test_records_do_not_differ(diff_runner: DiffRunner, fake_output_port: FakeOutputPort) -> None:
+    diff_runner("1.16.4", "1.16.4")
+    assert fake_output_port.responses == [DiffResponse(diff=DistributionDiff())]
+
+
+def test_records_differ_in_version(diff_runner: DiffRunner, fake_output_port: FakeOutputPort) -> None:
+    diff_runner("1.16.4", "1.16.5")
+    assert fake_output_port.responses == [
+        DiffResponse(diff=DistributionDiff(changed=(VersionChange("numpy", "1.16.4", "1.16.5"),)))
+    ]
 
 
 def test_unit_of_work_is_committed(diff_runner: DiffRunner, fake_uow: FakeUnitOfWork) -> None:
@@ -0,0 +1,70 @@
+from typing import Iterable, List, Optional, Protocol
+
+import pytest
+
+from compenv.model.record import ComputationRecord, Distribution, Identifier, diff_matrix
+from compenv.service.matrix import DiffMatrixRequest, DiffMatrixResponse, DiffMatrixService, Environment
+
+from ..conftest import FakeOutputPort
+from .conftest import FakeUnitOfWork
+
+VERSIONS = {"identifier1": "1.24.0", "identifier2": "1.26.0", "identifier3": "1.24.0", "identifier4": "1.26.0"}
+
+
+class MatrixRunner(Protocol):
+    def __call__(self, identifiers: Optional[Iterable[str]] = None) -> DiffMatrixResponse:
+        ...
+
+
+@pytest.fixture
+def matrix_runner(fake_uow: FakeUnitOfWork, fake_output_port: FakeOutputPort) -> MatrixRunner:
+    with fake_uow:
+        for identifier, version in VERSIONS.items():
+            fake_uow.records.add(
+                ComputationRecord(Identifier(identifier), frozenset((Distribution("numpy", version),)))
+            )
+
+    def run(identifiers: Optional[Iterable[str]] = None) -> DiffMatrixResponse:
+        service = DiffMatrixService(output_port=fake_output_port, uow=fake_uow)
+        service(DiffMatrixRequest(None if identifiers is None else tuple(Identifier(i) for i in identifiers)))
+        response = fake_output_port.responses[-1]
+        assert isinstance(response, DiffMatrixResponse)
+        return response
+
+    return run
+
+
+def _identifiers(response: DiffMatrixResponse) -> List[List[str]]:
+    return [list(e.identifiers) for e in response.environments]
+
+
+def test_groups_records_with_identical_distributions(matrix_runner: MatrixRunner) -> None:
+    assert _identifiers(matrix_runner()) == [["identifier1", "identifier3"], ["identifier2", "identifier4"]]
+
+
+def test_groups_only_requested_records(matrix_runner: MatrixRunner) -> None:
+    assert _identifiers(matrix_runner(["identifier4", "identifier1", "identifier2"])) == [
+        ["identifier4", "identifier2"],
+        ["identifier1"],
+    ]
+
+
+def test_environments_have_fingerprint_of_their_records(matrix_runner: MatrixRunner) -> None:
+    environment = matrix_runner(["identifier1"]).environments[0]
+    expected = ComputationRecord(Identifier("identifier1"), frozenset((Distribution("numpy", "1.24.0"),)))
+    assert environment == Environment(expected.fingerprint, (Identifier("identifier1"),))
+    assert environment.representative == "identifier1"
+
+
+def test_matrix_compares_environments(matrix_runner: MatrixRunner) -> None:
+    assert matrix_runner().matrix == diff_matrix([[Distribution("numpy", "1.24.0")], [Distribution("numpy", "1.26.0")]])
+
+
+def test_no_records(matrix_runner: MatrixRunner) -> None:
+    response = matrix_runner([])
+    assert not response.environments and len(response.matrix) == 0
+
+
+def test_unit_of_work_is_committed(matrix_runner: MatrixRunner, fake_uow: FakeUnitOfWork) -> None:
+    matrix_runner()
+    assert fake_uow.committed
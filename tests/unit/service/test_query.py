@@ -0,0 +1,42 @@
+import pytest
+
+from compenv.model.record import ComputationRecord, Distribution, Identifier, Requirement
+from compenv.service.query import QueryRequest, QueryResponse, QueryService
+
+from ..conftest import FakeOutputPort
+from .conftest import FakeUnitOfWork
+
+
+@pytest.fixture
+def query_service(fake_uow: FakeUnitOfWork, fake_output_port: FakeOutputPort) -> QueryService:
+    records = [
+        ComputationRecord(Identifier("identifier1"), frozenset([Distribution("numpy", "1.23.5")])),
+        ComputationRecord(Identifier("identifier2"), frozenset([Distribution("numpy", "1.24.0")])),
+        ComputationRecord(Identifier("identifier3"), frozenset([Distribution("torch", "2.1.0")])),
+    ]
+    with fake_uow:
+        for record in records:
+            fake_uow.records.add(record)
+    return QueryService(output_port=fake_output_port, uow=fake_uow)
+
+
+@pytest.mark.parametrize(
+    "requirements,expected",
+    [
+        (("numpy<1.24",), ("identifier1",)),
+        (("numpy<1.24", "torch==2.1.0"), ("identifier1", "identifier3")),
+        (("numpy>=1.24",), ("identifier2",)),
+        (("scipy",), ()),
+    ],
+)
+def test_responds_with_identifiers_of_matching_records(
+    query_service: QueryService, fake_output_port: FakeOutputPort, requirements: tuple[str, ...], expected: tuple[str]
+) -> None:
+    query_service(QueryRequest(tuple(Requirement.from_string(r) for r in requirements)))
+    assert fake_output_port.responses == [QueryResponse(identifiers=tuple(Identifier(i) for i in expected))]
+
+
+def test_unit_of_work_is_committed(query_service: QueryService, fake_uow: FakeUnitOfWork) -> None:
+    fake_uow.committed = False
+    query_service(QueryRequest((Requirement("numpy"),)))
+    assert fake_uow.committed
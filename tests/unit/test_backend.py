@@ -0,0 +1,70 @@
+import threading
+import time
+from typing import List, cast
+
+import pytest
+
+from compenv.backend import DJBackend, LazyBackend, create_dj_backend
+from compenv.infrastructure.types import ConnectionFactory, Schema
+
+
+class FakeCreate:
+    def __init__(self) -> None:
+        self.calls: List[DJBackend] = []
+
+    def __call__(self) -> DJBackend:
+        time.sleep(0.01)
+        backend = cast(DJBackend, object())
+        self.calls.append(backend)
+        return backend
+
+
+class TestLazyBackend:
+    @staticmethod
+    def test_does_not_create_backend_on_initialization() -> None:
+        create = FakeCreate()
+        lazy = LazyBackend(create)
+        assert not create.calls and not lazy.created
+
+    @staticmethod
+    def test_creates_backend_on_first_call() -> None:
+        create = FakeCreate()
+        lazy = LazyBackend(create)
+        assert lazy() is create.calls[0] and lazy.created
+
+    @staticmethod
+    def test_creates_backend_only_once() -> None:
+        create = FakeCreate()
+        lazy = LazyBackend(create)
+        lazy()
+        lazy()
+        assert len(create.calls) == 1
+
+    @staticmethod
+    def test_creates_backend_only_once_across_threads() -> None:
+        create = FakeCreate()
+        lazy = LazyBackend(create)
+        backends: List[DJBackend] = []
+        threads = [threading.Thread(target=lambda: backends.append(lazy())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(create.calls) == 1 and all(b is create.calls[0] for b in backends)
+
+    @staticmethod
+    def test_repr() -> None:
+        create = FakeCreate()
+        assert repr(LazyBackend(create)) == f"LazyBackend(create={create!r})"
+
+
+@pytest.mark.parametrize("buffer_records,write_behind", [(1, 0), (0, 1)])
+def test_shared_connection_can_not_be_combined_with_deferred_writes(buffer_records: int, write_behind: int) -> None:
+    with pytest.raises(ValueError, match="can not be combined"):
+        create_dj_backend(
+            cast(Schema, object()),
+            "Table",
+            buffer_records=buffer_records,
+            write_behind=write_behind,
+            shared_connection=cast(ConnectionFactory, object()),
+        )